@@ -122,9 +122,10 @@ def check_project_structure():
     print("📋 Verificando estrutura do projeto...")
     
     required_files = [
-        "api/delivery_api.py",
-        "reports/excel_generator.py", 
-        "data/sample_data.py",
+        "zeca/api/delivery_api.py",
+        "zeca/reports/excel_generator.py",
+        "zeca/data/sample_data.py",
+        "pyproject.toml",
         "requirements.txt"
     ]
     
@@ -150,14 +151,21 @@ def show_usage_instructions():
     print("=" * 50)
     print("📋 Como usar:")
     print()
+    print("0. 📦 Instalar os comandos do pacote zeca:")
+    print("   pip install -e .")
+    print("   (sem instalar: python -m zeca api|report|data|loadtest)")
+    print()
     print("1. 🔗 Iniciar a API:")
-    print("   python api/delivery_api.py")
+    print("   zeca-api")
     print()
     print("2. 📊 Gerar relatório (em outro terminal):")
-    print("   python reports/excel_generator.py")
+    print("   zeca-report")
     print()
     print("3. 🧪 Executar testes:")
-    print("   python tests/test_api.py")
+    print("   python -m pytest tests/")
+    print()
+    print("4. 📈 Teste de carga:")
+    print("   zeca-loadtest")
     print()
     print("🔗 Endpoints da API:")
     print("   GET /api/entregas - Todas as entregas")
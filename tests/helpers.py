@@ -0,0 +1,43 @@
+"""
+Apoio aos Testes - Sistema Zeca Delivery
+========================================
+
+App da API para os testes: criada no próprio processo com `create_app`,
+isolada das variáveis de ambiente (sem snapshot, log de eventos, tenants
+nem limites de requisições).
+
+Uso:
+    from helpers import make_app, default_store
+    app = make_app()
+    client = app.test_client()
+
+Autor: Demonstração do artigo Zeca Delivery
+"""
+
+import sys
+import os
+
+# Adicionar diretórios ao path para importar módulos
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from zeca.api.delivery_api import create_app
+from zeca.data.sample_data import ENTREGAS_MOCK
+
+CONFIG_TESTE = {
+    "TESTING": True,
+    "SNAPSHOT_PATH": None,
+    "EVENT_LOG_PATH": None,
+    "TENANTS": "",
+    "RATE_LIMIT_RPS": 0,
+    "MAX_CONCORRENTES": 0,
+}
+
+
+def make_app(entregas=ENTREGAS_MOCK, **config):
+    """App nova com CONFIG_TESTE mais `config`"""
+    return create_app(dict(CONFIG_TESTE, **config), entregas)
+
+
+def default_store(app):
+    """Armazenamento da partição padrão da app"""
+    return app.extensions["zeca_tenants"].default.store
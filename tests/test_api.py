@@ -3,6 +3,8 @@ Testes Unitários - Sistema Zeca Delivery
 =======================================
 
 Testes para validar o funcionamento da API e componentes do sistema.
+A API é criada no próprio processo (`create_app`) e acessada pelo cliente
+de teste do Flask: não é preciso iniciar o servidor.
 
 Para executar:
     python -m pytest tests/
@@ -11,16 +13,16 @@ Para executar:
 """
 
 import unittest
-import requests
-import json
+from unittest import mock
 import sys
 import os
 
 # Adicionar diretórios ao path para importar módulos
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'data'))
 
-from data.sample_data import ENTREGAS_MOCK, get_sample_stats
+from helpers import make_app
+from zeca.data.sample_data import ENTREGAS_MOCK, get_sample_stats, compute_stats, compare_stats
+
 
 class TestZecaDeliveryAPI(unittest.TestCase):
     """Testes para a API de entregas"""
@@ -28,28 +30,15 @@ class TestZecaDeliveryAPI(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         """Configuração inicial dos testes"""
-        cls.base_url = "http://localhost:5000"
-        cls.timeout = 5
-        
-        # Verificar se API está rodando
-        try:
-            response = requests.get(f"{cls.base_url}/api/health", timeout=cls.timeout)
-            if response.status_code != 200:
-                raise Exception("API não está respondendo")
-        except Exception as e:
-            print(f"\n❌ ERRO: API não está rodando em {cls.base_url}")
-            print("💡 Para executar os testes:")
-            print("   1. Abra um terminal: python api/delivery_api.py")
-            print("   2. Em outro terminal: python tests/test_api.py")
-            raise unittest.SkipTest(f"API não disponível: {e}")
+        cls.client = make_app().test_client()
     
     def test_health_check(self):
         """Testa o health check da API"""
-        response = requests.get(f"{self.base_url}/api/health", timeout=self.timeout)
+        response = self.client.get('/api/health')
         
         self.assertEqual(response.status_code, 200)
         
-        data = response.json()
+        data = response.get_json()
         self.assertEqual(data['status'], 'healthy')
         self.assertEqual(data['service'], 'delivery-api')
         self.assertIn('timestamp', data)
@@ -57,11 +46,11 @@ class TestZecaDeliveryAPI(unittest.TestCase):
     
     def test_get_all_deliveries(self):
         """Testa busca de todas as entregas"""
-        response = requests.get(f"{self.base_url}/api/entregas", timeout=self.timeout)
+        response = self.client.get('/api/entregas')
         
         self.assertEqual(response.status_code, 200)
         
-        data = response.json()
+        data = response.get_json()
         self.assertEqual(data['status'], 'success')
         self.assertIn('total', data)
         self.assertIn('data', data)
@@ -76,11 +65,11 @@ class TestZecaDeliveryAPI(unittest.TestCase):
     
     def test_get_pending_deliveries(self):
         """Testa busca de entregas pendentes"""
-        response = requests.get(f"{self.base_url}/api/entregas/pendentes", timeout=self.timeout)
+        response = self.client.get('/api/entregas/pendentes')
         
         self.assertEqual(response.status_code, 200)
         
-        data = response.json()
+        data = response.get_json()
         self.assertEqual(data['status'], 'success')
         
         # Verificar se todas as entregas retornadas são pendentes
@@ -93,11 +82,11 @@ class TestZecaDeliveryAPI(unittest.TestCase):
         
         for status in statuses:
             with self.subTest(status=status):
-                response = requests.get(f"{self.base_url}/api/entregas/status/{status}", timeout=self.timeout)
+                response = self.client.get(f'/api/entregas/status/{status}')
                 
                 self.assertEqual(response.status_code, 200)
                 
-                data = response.json()
+                data = response.get_json()
                 self.assertEqual(data['status'], 'success')
                 
                 # Verificar se todas as entregas têm o status correto
@@ -106,21 +95,21 @@ class TestZecaDeliveryAPI(unittest.TestCase):
     
     def test_invalid_status(self):
         """Testa status inválido"""
-        response = requests.get(f"{self.base_url}/api/entregas/status/invalido", timeout=self.timeout)
+        response = self.client.get('/api/entregas/status/invalido')
         
         self.assertEqual(response.status_code, 400)
         
-        data = response.json()
+        data = response.get_json()
         self.assertEqual(data['status'], 'error')
         self.assertIn('Status inválido', data['message'])
     
     def test_get_statistics(self):
         """Testa endpoint de estatísticas"""
-        response = requests.get(f"{self.base_url}/api/stats", timeout=self.timeout)
+        response = self.client.get('/api/stats')
         
         self.assertEqual(response.status_code, 200)
         
-        data = response.json()
+        data = response.get_json()
         self.assertEqual(data['status'], 'success')
         
         stats = data['data']
@@ -134,13 +123,81 @@ class TestZecaDeliveryAPI(unittest.TestCase):
         self.assertIsInstance(stats['taxa_entrega'], (int, float))
         self.assertIsInstance(stats['distribuicao_status'], dict)
     
+    def test_route_batches(self):
+        """Testa agrupamento de pendentes em lotes"""
+        response = self.client.get('/api/rotas/lotes', query_string={"max_tamanho": 2})
+        
+        self.assertEqual(response.status_code, 200)
+        
+        data = response.get_json()
+        self.assertEqual(data['status'], 'success')
+        for lote in data['data']:
+            self.assertLessEqual(lote['total'], 2)
+            for entrega in lote['entregas']:
+                self.assertEqual(entrega['status'], 'pendente')
+    
+    def test_route_batches_optimized(self):
+        """Testa ordenação de paradas dentro dos lotes"""
+        response = self.client.get('/api/rotas/lotes', query_string={"otimizar": 1})
+        
+        self.assertEqual(response.status_code, 200)
+        
+        for lote in response.get_json()['data']:
+            self.assertIn('rota', lote)
+            self.assertEqual(lote['rota']['ordem'], [e['id'] for e in lote['entregas']])
+    
+    def test_route_budget_capped(self):
+        """Testa que o orcamento_ms pedido é limitado ao teto configurado"""
+        client = make_app(ORCAMENTO_MS_MAX=30).test_client()
+        with mock.patch('zeca.api.delivery_api.optimize_route',
+                        side_effect=lambda entregas, orcamento_ms: {
+                            "ordem": [e['id'] for e in entregas], "orcamento_ms": orcamento_ms}):
+            response = client.get('/api/rotas/lotes',
+                                  query_string={"otimizar": 1, "orcamento_ms": 60000})
+        
+        self.assertEqual(response.status_code, 200)
+        lotes = response.get_json()['data']
+        self.assertTrue(lotes)
+        for lote in lotes:
+            self.assertEqual(lote['rota']['orcamento_ms'], 30)
+    
+    def test_route_batches_invalid_parameter(self):
+        """Testa parâmetro inválido no agrupamento em lotes"""
+        response = self.client.get('/api/rotas/lotes', query_string={"max_tamanho": "muitos"})
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()['status'], 'error')
+    
+    def test_health_probes(self):
+        """Testa as sondas de liveness e readiness"""
+        live = self.client.get('/api/health/live')
+        ready = self.client.get('/api/health/ready')
+        
+        self.assertEqual(live.status_code, 200)
+        self.assertIn(ready.status_code, (200, 503))
+        data = ready.get_json()
+        self.assertIn(data['status'], ('ready', 'not_ready'))
+        self.assertTrue(data['backend']['disponivel'])
+        self.assertGreater(data['backend']['total_entregas'], 0)
+        self.assertIn('latencia_p99_ms', data)
+    
+    def test_metrics_endpoint(self):
+        """Testa exportação de métricas no formato do Prometheus"""
+        self.client.get('/api/entregas')
+        response = self.client.get('/api/metrics')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('text/plain', response.headers['Content-Type'])
+        self.assertIn('zeca_http_requests_total{route="/api/entregas"', response.get_data(as_text=True))
+        self.assertIn('zeca_http_request_duration_seconds_bucket', response.get_data(as_text=True))
+    
     def test_not_found_endpoint(self):
         """Testa endpoint não existente"""
-        response = requests.get(f"{self.base_url}/api/inexistente", timeout=self.timeout)
+        response = self.client.get('/api/inexistente')
         
         self.assertEqual(response.status_code, 404)
         
-        data = response.json()
+        data = response.get_json()
         self.assertEqual(data['status'], 'error')
         self.assertIn('não encontrado', data['message'].lower())
     
@@ -154,11 +211,11 @@ class TestZecaDeliveryAPI(unittest.TestCase):
         
         for endpoint in endpoints:
             with self.subTest(endpoint=endpoint):
-                response = requests.get(f"{self.base_url}{endpoint}", timeout=self.timeout)
+                response = self.client.get(endpoint)
                 
                 self.assertEqual(response.status_code, 200)
                 
-                data = response.json()
+                data = response.get_json()
                 # Verificar campos obrigatórios na resposta
                 self.assertIn('status', data)
                 self.assertIn('timestamp', data)
@@ -234,16 +291,15 @@ class TestSystemIntegration(unittest.TestCase):
     
     def setUp(self):
         """Configuração para cada teste"""
-        self.base_url = "http://localhost:5000"
-        self.timeout = 10
+        self.client = make_app().test_client()
     
     def test_api_data_consistency(self):
         """Testa consistência entre API e dados mockados"""
         # Buscar dados da API
-        response = requests.get(f"{self.base_url}/api/entregas", timeout=self.timeout)
+        response = self.client.get('/api/entregas')
         self.assertEqual(response.status_code, 200)
         
-        api_data = response.json()['data']
+        api_data = response.get_json()['data']
         
         # Comparar com dados mockados
         self.assertEqual(len(api_data), len(ENTREGAS_MOCK))
@@ -256,10 +312,10 @@ class TestSystemIntegration(unittest.TestCase):
     def test_statistics_calculation(self):
         """Testa se estatísticas da API batem com cálculo local"""
         # Estatísticas da API
-        response = requests.get(f"{self.base_url}/api/stats", timeout=self.timeout)
+        response = self.client.get('/api/stats')
         self.assertEqual(response.status_code, 200)
         
-        api_stats = response.json()['data']
+        api_stats = response.get_json()['data']
         
         # Estatísticas locais
         local_stats = get_sample_stats()
@@ -268,6 +324,14 @@ class TestSystemIntegration(unittest.TestCase):
         self.assertEqual(api_stats['total_entregas'], local_stats['total_entregas'])
         self.assertAlmostEqual(api_stats['valor_total'], local_stats['valor_total'], places=2)
         self.assertAlmostEqual(api_stats['taxa_entrega'], local_stats['taxa_entrega'], places=1)
+    
+    def test_fused_statistics_match_api(self):
+        """Testa se estatísticas calculadas sobre /api/entregas batem com /api/stats"""
+        entregas = self.client.get('/api/entregas').get_json()['data']
+        api_stats = self.client.get('/api/stats').get_json()['data']
+        
+        self.assertEqual(compare_stats(compute_stats(entregas), api_stats), [])
+        self.assertIn('distribuicao_prioridade', api_stats)
 
 
 def run_tests():
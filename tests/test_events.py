@@ -0,0 +1,273 @@
+"""
+Testes do Log de Eventos - Sistema Zeca Delivery
+================================================
+
+Testes para o log de eventos das entregas (commit em grupo, índice por
+entrega, releitura e compactação), para a reconstrução do armazenamento
+na inicialização e para os endpoints de status e histórico.
+
+Para executar:
+    python -m pytest tests/
+"""
+
+import unittest
+import tempfile
+import threading
+from datetime import datetime
+import sys
+import os
+
+# Adicionar diretórios ao path para importar módulos
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from helpers import default_store, make_app
+from zeca.data.events import EventLog, time_in_status
+from zeca.data.sample_data import ENTREGAS_MOCK
+from zeca.data.store import DeliveryStore
+from zeca.api.persistence import SnapshotWriter, load_store
+
+
+class TestEventLog(unittest.TestCase):
+    """Testes para o arquivo de eventos"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "eventos.jsonl")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_history_by_id(self):
+        """Histórico lido pelas posições indexadas, sem os dados completos"""
+        log = EventLog(self.path, sync=False)
+        log.append(101, "criada", status="pendente", dados={"id": 101})
+        log.append(102, "criada", status="pendente", dados={"id": 102})
+        log.append(101, "status", status="em_transito", anterior="pendente")
+
+        history = log.history(101)
+        self.assertEqual([e["seq"] for e in history], [1, 3])
+        self.assertEqual(history[1]["status"], "em_transito")
+        self.assertNotIn("dados", history[0])
+        self.assertEqual(log.history(999), [])
+        log.close()
+
+    def test_group_commit(self):
+        """Gravações simultâneas dividem os commits"""
+        log = EventLog(self.path)
+        barrier = threading.Barrier(8)
+
+        def worker(n):
+            barrier.wait()
+            for i in range(20):
+                log.append(n * 100 + i, "criada", status="pendente")
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(log.durable_seq, 160)
+        self.assertLess(log.commits, 160)
+        self.assertEqual(len(list(log.events())), 160)
+        log.close()
+
+    def test_reopen_discards_incomplete_tail(self):
+        """Ao reabrir, o índice é remontado e uma linha incompleta é descartada"""
+        log = EventLog(self.path, sync=False)
+        log.append(101, "criada", status="pendente")
+        log.append(101, "status", status="entregue", anterior="pendente")
+        log.close()
+        with open(self.path, "ab") as f:
+            f.write(b'{"seq":3,"id":101')
+
+        log = EventLog(self.path, sync=False)
+        self.assertEqual(log.last_seq, 2)
+        self.assertEqual(len(log.history(101)), 2)
+        self.assertEqual(log.append(101, "status", status="cancelado", anterior="entregue"), 3)
+        self.assertEqual([e["seq"] for e in log.events(after_seq=1)], [2, 3])
+        log.close()
+
+    def test_invalid_event_type(self):
+        """Tipo de evento desconhecido gera ValueError"""
+        log = EventLog(self.path, sync=False)
+        with self.assertRaises(ValueError):
+            log.submit(101, "apagada")
+        log.close()
+
+    def test_compact_drops_data_up_to_seq(self):
+        """Compactação remove os dados já cobertos pelo snapshot e mantém o histórico"""
+        log = EventLog(self.path, sync=False)
+        log.append(101, "criada", status="pendente", dados=dict(ENTREGAS_MOCK[0]))
+        log.append(102, "criada", status="pendente", dados=dict(ENTREGAS_MOCK[1]))
+
+        info = log.compact(1)
+        self.assertLess(info["bytes_depois"], info["bytes_antes"])
+        events = list(log.events())
+        self.assertNotIn("dados", events[0])
+        self.assertIn("dados", events[1])
+        self.assertEqual(len(log.history(101)), 1)
+        self.assertEqual(log.append(101, "status", status="entregue", anterior="pendente"), 3)
+        log.close()
+
+    def test_time_in_status(self):
+        """Tempo em cada status, com o status atual contando até agora"""
+        events = [
+            {"ts": "2025-08-04T18:00:00", "status": "pendente"},
+            {"ts": "2025-08-04T18:30:00", "status": "em_transito"},
+            {"ts": "2025-08-04T18:50:00", "status": "entregue"},
+        ]
+        durations = time_in_status(events, now=datetime(2025, 8, 4, 19, 0))
+        self.assertEqual(durations, {"pendente": 1800.0, "em_transito": 1200.0, "entregue": 600.0})
+        self.assertEqual(time_in_status([]), {})
+
+
+class TestEventStore(unittest.TestCase):
+    """Testes para o armazenamento com log de eventos"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.log_path = os.path.join(self.tmp.name, "eventos.jsonl")
+        self.snap_path = os.path.join(self.tmp.name, "entregas.snap")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_writes_emit_events(self):
+        """Inclusões e mudanças de status viram eventos"""
+        store = DeliveryStore(events=EventLog(self.log_path, sync=False))
+        store.add_many(ENTREGAS_MOCK)
+        updated = store.update_status(101, "em_transito")
+        self.assertEqual(updated.status, "em_transito")
+        self.assertEqual(store.get(101).status, "em_transito")
+
+        # Mesmo status: nada muda nem é registrado
+        store.update_status(101, "em_transito")
+        self.assertEqual(store.events.last_seq, 6)
+        self.assertEqual([e["tipo"] for e in store.events.history(101)], ["criada", "status"])
+
+        with self.assertRaises(ValueError):
+            store.update_status(101, "perdida")
+        with self.assertRaises(KeyError):
+            store.update_status(999, "entregue")
+        store.events.close()
+
+    def test_replay_rebuilds_store(self):
+        """Sem snapshot, o log inteiro reconstrói as entregas"""
+        store = load_store(None, ENTREGAS_MOCK, EventLog(self.log_path, sync=False))
+        store.update_status(102, "entregue")
+        store.add(dict(ENTREGAS_MOCK[0], id=1000))
+        store.events.close()
+
+        reopened = load_store(None, ENTREGAS_MOCK, EventLog(self.log_path, sync=False))
+        self.assertEqual(len(reopened), 6)
+        self.assertEqual(reopened.get(102).status, "entregue")
+        self.assertEqual(reopened.all(), store.all())
+        reopened.events.close()
+
+    def test_store_not_blocked_by_compaction(self):
+        """Leituras e mudanças de status continuam enquanto o log é compactado"""
+        copying, release = threading.Event(), threading.Event()
+
+        class SlowLog(EventLog):
+            def _copy_compacted(self, *args):
+                copying.set()
+                release.wait(5)
+                return super()._copy_compacted(*args)
+
+        store = DeliveryStore(events=SlowLog(self.log_path, sync=False))
+        store.add_many(ENTREGAS_MOCK)
+        compaction = threading.Thread(target=store.events.compact, args=(5,))
+        compaction.start()
+        try:
+            self.assertTrue(copying.wait(5))
+            writer = threading.Thread(target=store.update_status, args=(102, "cancelado"))
+            writer.start()
+            writer.join(2)
+            self.assertFalse(writer.is_alive())
+            self.assertEqual(store.get(102).status, "cancelado")
+            self.assertEqual(len(store.events.history(102)), 2)
+        finally:
+            release.set()
+            compaction.join()
+
+        # O evento gravado durante a cópia entra no arquivo compactado
+        events = list(store.events.events())
+        self.assertEqual([e["seq"] for e in events], [1, 2, 3, 4, 5, 6])
+        self.assertTrue(all("dados" not in e for e in events))
+        self.assertEqual([e["tipo"] for e in store.events.history(102)], ["criada", "status"])
+        store.events.close()
+
+    def test_compact_after_close(self):
+        """Compactar um log já fechado não faz nada"""
+        log = EventLog(self.log_path, sync=False)
+        log.append(101, "criada", status="pendente", dados=dict(ENTREGAS_MOCK[0]))
+        log.close()
+        self.assertTrue(log.closed)
+        self.assertIsNone(log.compact(1))
+        log.close()
+
+    def test_snapshot_plus_newer_events(self):
+        """Snapshot compacta o log; na reabertura só os eventos posteriores são reaplicados"""
+        store = load_store(self.snap_path, ENTREGAS_MOCK, EventLog(self.log_path, sync=False))
+        writer = SnapshotWriter(store, self.snap_path, interval=3600)
+        store.update_status(101, "em_transito")
+        info = writer.save_if_changed()
+        self.assertEqual(info["seq"], 6)
+        self.assertTrue(all("dados" not in e for e in store.events.events()))
+
+        store.update_status(101, "entregue")
+        store.events.close()
+
+        reopened = load_store(self.snap_path, ENTREGAS_MOCK, EventLog(self.log_path, sync=False))
+        self.assertEqual(reopened.snapshot_seq, 6)
+        self.assertEqual(reopened.get(101).status, "entregue")
+        self.assertEqual(len(reopened), 5)
+        self.assertEqual(len(reopened.events.history(101)), 3)
+        reopened.events.close()
+
+
+class TestEventEndpoints(unittest.TestCase):
+    """Testes para POST /api/entregas/<id>/status e GET /api/entregas/<id>/historico"""
+
+    def setUp(self):
+        app = make_app()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = default_store(app)
+        self.store.events = EventLog(os.path.join(self.tmp.name, "eventos.jsonl"), sync=False)
+        self.client = app.test_client()
+
+    def tearDown(self):
+        self.store.events.close()
+        self.tmp.cleanup()
+
+    def test_status_and_history(self):
+        """Mudança de status aparece no histórico com o tempo por status"""
+        self.store.add(dict(ENTREGAS_MOCK[0], id=9001))
+        response = self.client.post('/api/entregas/9001/status', json={"status": "em_transito"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["data"]["status"], "em_transito")
+
+        data = self.client.get('/api/entregas/9001/historico').get_json()["data"]
+        self.assertEqual(data["status_atual"], "em_transito")
+        self.assertEqual([e["tipo"] for e in data["eventos"]], ["criada", "status"])
+        self.assertEqual(set(data["tempo_por_status_s"]), {"pendente", "em_transito"})
+
+    def test_errors(self):
+        """Status inválido, entrega inexistente e histórico desativado"""
+        response = self.client.post('/api/entregas/101/status', json={"status": "perdida"})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post('/api/entregas/999999/status', json={"status": "entregue"})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.client.get('/api/entregas/999999/historico').status_code, 404)
+
+        self.store.events.close()
+        self.store.events = None
+        response = self.client.get('/api/entregas/101/historico')
+        self.assertEqual(response.status_code, 404)
+        self.assertIn("ZECA_EVENT_LOG", response.get_json()["message"])
+        self.store.events = EventLog(os.path.join(self.tmp.name, "outro.jsonl"), sync=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
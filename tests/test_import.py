@@ -0,0 +1,298 @@
+"""
+Testes de Importação - Sistema Zeca Delivery
+============================================
+
+Testes para a importação em massa de entregas (CSV e JSONL) e para o
+endpoint POST /api/entregas/import, sem depender da API rodando.
+
+Para executar:
+    python -m pytest tests/
+"""
+
+import unittest
+import tempfile
+from datetime import datetime, timezone
+import pickle
+import json
+import csv
+import io
+import sys
+import os
+
+# Adicionar diretórios ao path para importar módulos
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from helpers import default_store, make_app
+from zeca.data.schema import CAMPOS, Delivery, convert_row
+from zeca.data.importer import import_stream, import_file, detect_format
+from zeca.data.store import DeliveryStore
+from zeca.data.sample_data import ENTREGAS_MOCK
+
+
+def make_row(delivery_id, **overrides):
+    """Entrega válida como dicionário de textos (linha de CSV)"""
+    row = {
+        "id": str(delivery_id), "cliente": f"Cliente {delivery_id}", "endereco": "Rua A, 1",
+        "bairro": "Centro", "cidade": "São Paulo", "estado": "SP", "cep": "01010-000",
+        "produto": "Pizza", "quantidade": "2", "valor": "45.90", "telefone": "(11) 90000-0000",
+        "entrega_prevista": "2025-08-04T19:30:00", "status": "pendente", "prioridade": "normal"
+    }
+    row.update(overrides)
+    return row
+
+
+def make_csv(rows, columns=CAMPOS, delimiter=","):
+    """Monta o texto de um CSV com cabeçalho"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=delimiter)
+    writer.writerow(columns)
+    writer.writerows([row[c] for c in columns] for row in rows)
+    return buffer.getvalue()
+
+
+class TestSchema(unittest.TestCase):
+    """Testes para a conversão de uma linha no esquema das entregas"""
+
+    def test_valid_row_is_converted(self):
+        """Tipos convertidos: id e quantidade inteiros, valor decimal, data"""
+        entrega, erros = convert_row([make_row(1)[c] for c in CAMPOS])
+        self.assertIsNone(erros)
+        self.assertEqual(entrega.id, 1)
+        self.assertEqual(entrega.quantidade, 2)
+        self.assertEqual(entrega.valor, 45.90)
+        self.assertEqual(entrega.prevista, datetime(2025, 8, 4, 19, 30))
+        self.assertEqual(entrega["entrega_prevista"], "2025-08-04T19:30:00")
+
+    def test_comma_decimal_and_date_normalization(self):
+        """Valor com vírgula e data com espaço são aceitos e normalizados"""
+        row = make_row(1, valor="45,90", entrega_prevista="2025-08-04 19:30")
+        entrega, erros = convert_row([row[c] for c in CAMPOS])
+        self.assertIsNone(erros)
+        self.assertEqual(entrega["valor"], 45.90)
+        self.assertEqual(entrega["entrega_prevista"], "2025-08-04T19:30:00")
+
+    def test_offset_date_converted_to_local_time(self):
+        """Data com fuso vira horário local sem fuso, comparável com as demais"""
+        row = make_row(1, entrega_prevista="2025-08-04T19:30:00-03:00")
+        entrega, erros = convert_row([row[c] for c in CAMPOS])
+        self.assertIsNone(erros)
+        self.assertIsNone(entrega.prevista.tzinfo)
+        esperada = datetime(2025, 8, 4, 22, 30, tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+        self.assertEqual(entrega.prevista, esperada)
+
+    def test_errors_per_field(self):
+        """Cada campo inválido gera seu próprio erro"""
+        row = make_row(1, status="perdido", prioridade="baixa", entrega_prevista="amanhã",
+                       quantidade="0", cliente="")
+        entrega, erros = convert_row([row[c] for c in CAMPOS])
+        self.assertIsNone(entrega)
+        campos = sorted(erro.split(":")[0] for erro in erros)
+        self.assertEqual(campos, ["cliente", "entrega_prevista", "prioridade", "quantidade", "status"])
+
+    def test_sample_data_matches_schema(self):
+        """Os dados de exemplo seguem o esquema documentado"""
+        for entrega in ENTREGAS_MOCK:
+            convertida, erros = convert_row([entrega[c] for c in CAMPOS])
+            self.assertIsNone(erros, entrega["id"])
+            self.assertEqual(convertida.to_dict(), entrega)
+
+
+class TestDelivery(unittest.TestCase):
+    """Testes para o registro Delivery"""
+
+    def test_round_trip(self):
+        """from_dict/to_dict preservam o formato da API"""
+        for entrega in ENTREGAS_MOCK:
+            record = Delivery.from_dict(entrega)
+            self.assertEqual(record.to_dict(), entrega)
+            self.assertEqual(Delivery(*record.astuple()), record)
+
+    def test_dict_style_access(self):
+        """Campos lidos por nome como em um dicionário"""
+        record = Delivery.from_dict(ENTREGAS_MOCK[1])
+        self.assertEqual(record["status"], "em_transito")
+        self.assertEqual(record["prioridade"], "alta")
+        self.assertEqual(record.get("bairro"), "Bela Vista")
+        self.assertIsNone(record.get("prevista"))
+        with self.assertRaises(KeyError):
+            record["status_code"]
+
+    def test_compact_record(self):
+        """Registro sem __dict__ e menor que o dicionário equivalente"""
+        record = Delivery.from_dict(ENTREGAS_MOCK[0])
+        self.assertFalse(hasattr(record, "__dict__"))
+        self.assertLess(sys.getsizeof(record), sys.getsizeof(ENTREGAS_MOCK[0]))
+
+    def test_invalid_dict(self):
+        """Dicionário inválido gera ValueError com os erros dos campos"""
+        with self.assertRaises(ValueError) as ctx:
+            Delivery.from_dict(dict(ENTREGAS_MOCK[0], status="sumiu"))
+        self.assertIn("status", str(ctx.exception))
+
+    def test_pickle(self):
+        """Registros podem ser enviados a outros processos"""
+        record = Delivery.from_dict(ENTREGAS_MOCK[0])
+        self.assertEqual(pickle.loads(pickle.dumps(record)), record)
+
+
+class TestImporter(unittest.TestCase):
+    """Testes para a importação em lotes"""
+
+    def test_csv_import_in_batches(self):
+        """Entregas válidas são gravadas em lotes de `batch_size`"""
+        store = DeliveryStore()
+        text = make_csv([make_row(i) for i in range(1, 6)])
+        result = import_stream(io.StringIO(text), store, batch_size=2)
+
+        self.assertEqual(result.lidas, 5)
+        self.assertEqual(result.importadas, 5)
+        self.assertEqual(result.rejeitadas, 0)
+        self.assertEqual(result.lotes, 3)
+        self.assertEqual([e["id"] for e in store.all()], [1, 2, 3, 4, 5])
+
+    def test_rejected_rows_report_line_and_errors(self):
+        """Linhas inválidas e IDs repetidos são rejeitados sem parar a importação"""
+        store = DeliveryStore([dict(ENTREGAS_MOCK[0], id=1)])
+        rows = [make_row(1), make_row(2), make_row(3, status="x"), make_row(2), make_row(4)]
+        result = import_stream(io.StringIO(make_csv(rows)), store)
+
+        self.assertEqual(result.importadas, 2)
+        self.assertEqual(result.rejeitadas, 3)
+        self.assertEqual([(e["linha"], e["id"]) for e in result.erros], [(2, "1"), (4, "3"), (5, "2")])
+        self.assertIn("status", result.erros[1]["erros"][0])
+        self.assertEqual(sorted(e["id"] for e in store.all()), [1, 2, 4])
+
+    def test_rows_with_wrong_field_count(self):
+        """Linha com campos a menos ou a mais é rejeitada, não lida desalinhada"""
+        rows = [dict(make_row(i), observacao="x") for i in (1, 2, 3)]
+        header, first, second, third = make_csv(rows, ("observacao",) + CAMPOS).splitlines()
+        text = "\n".join([header, first.rsplit(",", 1)[0], second + ",extra", third])
+        store = DeliveryStore()
+        result = import_stream(io.StringIO(text), store)
+
+        self.assertEqual(result.importadas, 1)
+        self.assertEqual([e["linha"] for e in result.erros], [2, 3])
+        self.assertEqual(result.erros[0]["erros"], ["esperados 15 campos, recebidos 14"])
+        self.assertEqual([e.id for e in store.all()], [3])
+
+    def test_store_rejects_existing_ids(self):
+        """A verificação de ID acontece na inclusão: escritas simultâneas não duplicam"""
+        store = DeliveryStore([dict(ENTREGAS_MOCK[0], id=1)])
+        recusadas = store.add_many([dict(ENTREGAS_MOCK[0], id=i) for i in (1, 2, 2)])
+        self.assertEqual([e.id for e in recusadas], [1, 2])
+        self.assertEqual([e.id for e in store.all()], [1, 2])
+        with self.assertRaises(ValueError):
+            store.add(dict(ENTREGAS_MOCK[0], id=2))
+
+        class WriteDuringImport(io.StringIO):
+            """Outra escrita inclui o ID 3 depois de a importação começar"""
+            def readline(self, *args):
+                if store.get(3) is None:
+                    store.add(dict(ENTREGAS_MOCK[0], id=3))
+                return super().readline(*args)
+
+        result = import_stream(WriteDuringImport(make_csv([make_row(3), make_row(4)])), store)
+        self.assertEqual(result.importadas, 1)
+        self.assertEqual(result.erros, [{"linha": 2, "id": "3", "erros": ["id: 3 já cadastrado"]}])
+        self.assertEqual(sorted(e.id for e in store.all()), [1, 2, 3, 4])
+
+    def test_semicolon_reordered_columns_and_extra_column(self):
+        """Cabeçalho em outra ordem, com coluna extra e separador ';'"""
+        columns = ("observacao",) + tuple(reversed(CAMPOS))
+        rows = [dict(make_row(i), observacao="portão azul") for i in (1, 2)]
+        store = DeliveryStore()
+        result = import_stream(io.StringIO(make_csv(rows, columns, ";")), store)
+
+        self.assertEqual(result.importadas, 2)
+        self.assertEqual(store.all()[0].cliente, "Cliente 1")
+        self.assertNotIn("observacao", store.all()[0].to_dict())
+
+    def test_missing_columns(self):
+        """Cabeçalho sem colunas obrigatórias gera ValueError"""
+        text = make_csv([make_row(1)], columns=CAMPOS[:-1])
+        with self.assertRaises(ValueError) as ctx:
+            import_stream(io.StringIO(text), DeliveryStore())
+        self.assertIn("prioridade", str(ctx.exception))
+
+    def test_max_errors_limits_details(self):
+        """Só os primeiros erros são detalhados; os demais são contados"""
+        rows = [make_row(i, status="x") for i in range(10)]
+        result = import_stream(io.StringIO(make_csv(rows)), max_errors=3)
+        self.assertEqual(result.rejeitadas, 10)
+        self.assertEqual(len(result.erros), 3)
+        self.assertEqual(result.to_dict()["erros_omitidos"], 7)
+
+    def test_jsonl_import(self):
+        """JSONL: linhas em branco ignoradas e JSON inválido rejeitado"""
+        lines = [json.dumps(ENTREGAS_MOCK[0]), "", "{nao é json", json.dumps(ENTREGAS_MOCK[1])]
+        store = DeliveryStore()
+        result = import_stream(io.StringIO("\n".join(lines)), store, formato="jsonl")
+
+        self.assertEqual(result.lidas, 3)
+        self.assertEqual(result.importadas, 2)
+        self.assertEqual(result.erros[0]["linha"], 3)
+        self.assertEqual([e.to_dict() for e in store.all()], ENTREGAS_MOCK[:2])
+
+    def test_import_file_with_bom(self):
+        """Arquivo salvo pelo Excel (UTF-8 com BOM) é lido pelo cabeçalho"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "pedidos.csv")
+            with open(path, "w", encoding="utf-8-sig") as f:
+                f.write(make_csv([make_row(1)]))
+            result = import_file(path, DeliveryStore())
+        self.assertEqual(result.importadas, 1)
+
+    def test_detect_format(self):
+        """Formato pela extensão ou pelo tipo de conteúdo"""
+        self.assertEqual(detect_format("pedidos.jsonl"), "jsonl")
+        self.assertEqual(detect_format(None, "application/x-ndjson"), "jsonl")
+        self.assertEqual(detect_format("pedidos.csv", "text/csv"), "csv")
+
+
+class TestImportEndpoint(unittest.TestCase):
+    """Testes para POST /api/entregas/import"""
+
+    def setUp(self):
+        app = make_app()
+        self.store = default_store(app)
+        self.client = app.test_client()
+
+    def test_import_csv_body(self):
+        """CSV no corpo: entregas incluídas e linhas rejeitadas informadas"""
+        text = make_csv([make_row(9001), make_row(9002, prioridade="baixa")])
+        response = self.client.post('/api/entregas/import', data=text.encode('utf-8'),
+                                    content_type='text/csv')
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data['data']['importadas'], 1)
+        self.assertEqual(data['data']['rejeitadas'], 1)
+        self.assertIn('message', data)
+        self.assertIn(9001, [e['id'] for e in self.store.all()])
+
+    def test_import_multipart_jsonl(self):
+        """Arquivo JSONL enviado em multipart (campo 'arquivo')"""
+        entrega = dict(ENTREGAS_MOCK[0], id=9003)
+        response = self.client.post('/api/entregas/import', data={
+            'arquivo': (io.BytesIO(json.dumps(entrega).encode('utf-8')), 'pedidos.jsonl')
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['data']['importadas'], 1)
+
+    def test_offset_dates_do_not_break_batches(self):
+        """Entrega importada com fuso convive com as demais nos lotes de rotas"""
+        text = make_csv([make_row(9004, entrega_prevista="2025-08-04T19:30:00-03:00")])
+        response = self.client.post('/api/entregas/import', data=text.encode('utf-8'),
+                                    content_type='text/csv')
+        self.assertEqual(response.get_json()['data']['importadas'], 1)
+        self.assertEqual(self.client.get('/api/rotas/lotes').status_code, 200)
+
+    def test_invalid_header(self):
+        """Cabeçalho incompleto retorna 400"""
+        response = self.client.post('/api/entregas/import', data=b"id,cliente\n1,Ana\n",
+                                    content_type='text/csv')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()['status'], 'error')
+
+
+if __name__ == '__main__':
+    unittest.main()
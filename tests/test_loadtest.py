@@ -0,0 +1,85 @@
+"""
+Testes do Teste de Carga - Sistema Zeca Delivery
+================================================
+
+Testes para o comando zeca-loadtest: mix de tráfego (pesos e log de
+acesso), percentis e um estágio curto contra a API iniciada no próprio
+processo.
+
+Para executar:
+    python -m pytest tests/
+"""
+
+import unittest
+import json
+import sys
+import os
+
+# Adicionar diretórios ao path para importar módulos
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from zeca.api.loadtest import (
+    OPERACOES, TrafficMix, mix_from_log, parse_mix, percentile, run_stage, start_api, summarize
+)
+
+
+class TestTrafficMix(unittest.TestCase):
+    """Testes para o mix de tráfego"""
+
+    def test_parse_mix(self):
+        """Pesos por operação; operação desconhecida ou peso inválido geram ValueError"""
+        self.assertEqual(parse_mix("lista=10,por_id=2.5,stats"), {"lista": 10, "por_id": 2.5, "stats": 1})
+        for texto in ("lista=10,delete=1", "lista=abc", "lista=-1", "lista=0"):
+            with self.assertRaises(ValueError):
+                parse_mix(texto)
+
+    def test_mix_from_access_log(self):
+        """Distribuição das rotas do log de acesso; outras linhas são ignoradas"""
+        linhas = [json.dumps({"metodo": "GET", "rota": "/api/entregas/<int:entrega_id>"})] * 3 + [
+            json.dumps({"metodo": "POST", "rota": "/api/entregas/<int:entrega_id>/status"}),
+            json.dumps({"metodo": "GET", "rota": "/api/health"}),
+            "texto solto",
+        ]
+        self.assertEqual(mix_from_log(linhas), {"por_id": 3, "status": 1})
+        with self.assertRaises(ValueError):
+            mix_from_log(["{}"])
+
+    def test_requests_follow_mix(self):
+        """Só as operações com peso são sorteadas, com os IDs conhecidos"""
+        trafego = TrafficMix({"por_id": 1, "status": 1, "lista": 0}, [101, 102], seed=7)
+        pedidos = [trafego.next_request() for _ in range(50)]
+        self.assertEqual({p[0] for p in pedidos}, {"por_id", "status"})
+        for nome, metodo, caminho, corpo, _ in pedidos:
+            self.assertEqual(metodo, OPERACOES[nome][0])
+            self.assertRegex(caminho, r"^/api/entregas/10[12]")
+
+    def test_percentiles(self):
+        """Posto mais próximo; resumo com contagens e taxa de falhas"""
+        valores = [i / 1000 for i in range(1, 101)]
+        self.assertEqual(percentile(valores, 50), 0.05)
+        self.assertEqual(percentile(valores, 99), 0.099)
+        self.assertIsNone(percentile([], 50))
+
+        resumo = summarize(valores, ok=95, refused=3, errors=2)
+        self.assertEqual(resumo["taxa_erros_pct"], 5.0)
+        self.assertEqual(resumo["latencia_ms"]["max"], 100.0)
+
+
+class TestLoadStage(unittest.TestCase):
+    """Teste de um estágio curto contra a API no próprio processo"""
+
+    def test_stage_against_in_process_api(self):
+        """Todas as requisições agendadas são enviadas e medidas"""
+        with start_api("processo") as base_url:
+            trafego = TrafficMix({"por_id": 3, "pendentes": 1, "stats": 1}, [101, 102, 103], seed=1)
+            estagio = run_stage(base_url, trafego, rps=40, duration=0.5)
+
+        self.assertEqual(estagio["enviadas"], 20)
+        self.assertEqual(estagio["concluidas"], 20)
+        self.assertEqual(estagio["erros"], 0)
+        self.assertEqual(sum(op["concluidas"] for op in estagio["por_operacao"].values()), 20)
+        self.assertIsNotNone(estagio["latencia_ms"]["p99"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+"""
+Testes de Consulta por Telefone, CEP e ID - Sistema Zeca Delivery
+=================================================================
+
+Testes para os índices por telefone e CEP, para os filtros ?telefone= e
+?cep_prefixo= de GET /api/entregas e para a consulta por ID
+(GET /api/entregas/<id> e POST /api/entregas/lookup).
+
+Para executar:
+    python -m pytest tests/
+"""
+
+import unittest
+import sys
+import os
+
+# Adicionar diretórios ao path para importar módulos
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from helpers import make_app
+from zeca.data.lookup import DeliveryLookup, normalize_cep, normalize_phone
+from zeca.data.sample_data import ENTREGAS_MOCK
+from zeca.data.store import DeliveryStore
+
+
+class TestDeliveryLookup(unittest.TestCase):
+    """Testes para os índices por telefone e CEP"""
+
+    def setUp(self):
+        self.store = DeliveryStore(ENTREGAS_MOCK)
+        # Mesmo cliente (101) com um segundo pedido, já entregue
+        self.store.add(dict(ENTREGAS_MOCK[0], id=201, telefone="+55 11 98765-4321", status="entregue"))
+        self.consulta = DeliveryLookup(self.store)
+
+    def test_normalization(self):
+        """Formatos diferentes do mesmo telefone/CEP"""
+        for telefone in ("(11) 98765-4321", "11987654321", "+55 (11) 98765-4321", "011 98765 4321"):
+            self.assertEqual(normalize_phone(telefone), "11987654321")
+        self.assertEqual(normalize_cep("01010-000"), "01010000")
+
+    def test_by_phone(self):
+        """Todas as entregas do telefone, ou só as abertas"""
+        self.assertEqual([e.id for e in self.consulta.by_phone("11987654321")], [101, 201])
+        self.assertEqual([e.id for e in self.consulta.by_phone("(11) 98765-4321", abertas=True)], [101])
+        self.assertEqual(self.consulta.by_phone("(21) 90000-0000"), [])
+        with self.assertRaises(ValueError):
+            self.consulta.by_phone("sem telefone")
+
+    def test_by_cep_prefix(self):
+        """Prefixo seleciona a faixa de CEPs; CEP completo, o próprio"""
+        self.assertEqual([e.id for e in self.consulta.by_cep_prefix("0130")], [103, 105])
+        self.assertEqual([e.id for e in self.consulta.by_cep_prefix("01310-100")], [102])
+        self.assertEqual(len(self.consulta.by_cep_prefix("0")), 6)
+        with self.assertRaises(ValueError):
+            self.consulta.by_cep_prefix("010100001")
+
+    def test_incremental_updates(self):
+        """Entregas novas e mudanças de status aparecem nas consultas"""
+        self.assertEqual(self.consulta.by_cep_prefix("2"), [])
+        self.store.add(dict(ENTREGAS_MOCK[0], id=202, cep="20040-002", telefone="(21) 3333-4444"))
+        self.assertEqual([e.id for e in self.consulta.by_cep_prefix("2")], [202])
+        self.assertEqual([e.id for e in self.consulta.by_phone("2133334444")], [202])
+
+        self.store.update_status(101, "cancelado")
+        self.assertEqual(self.consulta.by_phone("11987654321", abertas=True), [])
+
+
+class TestLookupEndpoint(unittest.TestCase):
+    """Testes para os filtros de GET /api/entregas"""
+
+    def setUp(self):
+        self.client = make_app().test_client()
+
+    def test_filters(self):
+        """Filtro por telefone, por prefixo de CEP e pelos dois"""
+        data = self.client.get('/api/entregas?telefone=(11)%2099876-5432').get_json()
+        self.assertEqual([e["id"] for e in data["data"]], [102])
+
+        data = self.client.get('/api/entregas?cep_prefixo=0130').get_json()
+        self.assertEqual([e["id"] for e in data["data"]], [103, 105])
+
+        data = self.client.get('/api/entregas?cep_prefixo=0130&telefone=11976543210').get_json()
+        self.assertEqual([e["id"] for e in data["data"]], [103])
+
+    def test_filter_pagination(self):
+        """limite e offset paginam o resultado; o total vem no cabeçalho"""
+        response = self.client.get('/api/entregas?cep_prefixo=0&limite=2&offset=1')
+        todas = self.client.get('/api/entregas?cep_prefixo=0').get_json()["data"]
+
+        self.assertEqual(response.headers['X-Total-Count'], str(len(todas)))
+        self.assertEqual([e["id"] for e in response.get_json()["data"]],
+                         [e["id"] for e in todas[1:3]])
+
+        response = self.client.get('/api/entregas?cep_prefixo=0&abertas=1&limite=1')
+        self.assertEqual(len(response.get_json()["data"]), 1)
+        self.assertEqual(self.client.get('/api/entregas?cep_prefixo=0&limite=0').status_code, 400)
+        self.assertEqual(self.client.get('/api/entregas?cep_prefixo=0&offset=-1').status_code, 400)
+
+    def test_invalid_filter(self):
+        """Telefone sem dígitos ou prefixo longo demais retornam 400"""
+        self.assertEqual(self.client.get('/api/entregas?telefone=abc').status_code, 400)
+        self.assertEqual(self.client.get('/api/entregas?cep_prefixo=1234567890').status_code, 400)
+
+
+class TestIdLookup(unittest.TestCase):
+    """Testes para a consulta por ID"""
+
+    def setUp(self):
+        self.client = make_app().test_client()
+
+    def test_get_many(self):
+        """Na ordem pedida, com os IDs não encontrados à parte"""
+        store = DeliveryStore(ENTREGAS_MOCK)
+        found, missing = store.get_many([103, 999, 101])
+        self.assertEqual([e.id for e in found], [103, 101])
+        self.assertEqual(missing, [999])
+
+    def test_get_by_id(self):
+        """Uma entrega pelo ID; inexistente retorna 404"""
+        response = self.client.get('/api/entregas/102')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["data"]["cliente"], "Maria Santos")
+        self.assertEqual(self.client.get('/api/entregas/999999').status_code, 404)
+
+    def test_lookup(self):
+        """Várias entregas em uma resposta; IDs repetidos contam uma vez"""
+        response = self.client.post('/api/entregas/lookup', json={"ids": [105, 101, 999999, 105]})
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()["data"]
+        self.assertEqual([e["id"] for e in data["entregas"]], [105, 101])
+        self.assertEqual(data["nao_encontrados"], [999999])
+
+    def test_lookup_invalid(self):
+        """Corpo sem lista de inteiros ou com IDs demais retorna 400"""
+        for body in ({}, {"ids": "101"}, {"ids": [101, "102"]}, {"ids": list(range(1001))}):
+            self.assertEqual(self.client.post('/api/entregas/lookup', json=body).status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,309 @@
+"""
+Testes de Observabilidade - Sistema Zeca Delivery
+=================================================
+
+Testes para métricas e instrumentação, sem depender da API rodando.
+
+Para executar:
+    python -m pytest tests/
+"""
+
+import unittest
+import threading
+import tempfile
+import pstats
+import json
+import io
+import sys
+import os
+
+# Adicionar diretórios ao path para importar módulos
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask
+
+from zeca.api.metrics import RequestMetrics, init_metrics
+from zeca.api.health import init_health
+from zeca.api.profiling import init_profiling
+from zeca.api.request_logging import init_request_logging
+from zeca.common.structured_logging import (
+    configure_logging, shutdown_logging, correlation, get_logger, log_stage
+)
+from zeca.data.store import DeliveryStore
+from zeca.data.sample_data import ENTREGAS_MOCK
+from zeca.reports.excel_generator import DeliveryReportGenerator
+from zeca.reports.profiling import SamplingProfiler, profile_call
+
+
+class TestRequestMetrics(unittest.TestCase):
+    """Testes para o registro de métricas de requisições"""
+
+    def test_observe_and_render(self):
+        """Requisições observadas aparecem no formato do Prometheus"""
+        metrics = RequestMetrics(buckets=(0.01, 0.1))
+        metrics.observe("/api/entregas", "GET", 200, 0.005, 100)
+        metrics.observe("/api/entregas", "GET", 200, 0.05, 100)
+        metrics.observe("/api/stats", "GET", 500, 0.5, 10)
+
+        text = metrics.render_prometheus()
+
+        self.assertIn('zeca_http_requests_total{route="/api/entregas",method="GET",status="200"} 2', text)
+        self.assertIn('zeca_http_request_errors_total{route="/api/stats",method="GET"} 1', text)
+        self.assertIn('zeca_http_request_duration_seconds_bucket{route="/api/entregas",method="GET",le="0.01"} 1', text)
+        self.assertIn('zeca_http_request_duration_seconds_bucket{route="/api/entregas",method="GET",le="0.1"} 2', text)
+        self.assertIn('zeca_http_request_duration_seconds_bucket{route="/api/stats",method="GET",le="+Inf"} 1', text)
+        self.assertIn('zeca_http_response_bytes_total{route="/api/entregas",method="GET"} 200', text)
+
+    def test_counters_from_many_threads(self):
+        """Contadores de threads (inclusive encerradas) são somados na coleta"""
+        metrics = RequestMetrics()
+
+        def worker():
+            for _ in range(100):
+                metrics.start_request()
+                metrics.observe("/api/entregas", "GET", 200, 0.001, 1)
+                metrics.end_request()
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        totals = metrics.snapshot()
+        self.assertEqual(totals.requests[("/api/entregas", "GET", 200)], 800)
+        self.assertEqual(totals.in_flight, 0)
+
+    def test_in_flight(self):
+        """Requisições iniciadas e não encerradas contam como em andamento"""
+        metrics = RequestMetrics()
+        metrics.start_request()
+
+        self.assertIn("zeca_http_requests_in_flight 1", metrics.render_prometheus())
+
+    def test_latency_percentile(self):
+        """Percentil usa a janela recente e ignora rotas de monitoramento"""
+        metrics = RequestMetrics()
+        self.assertIsNone(metrics.latency_percentile(99))
+
+        for i in range(100):
+            metrics.observe("/api/entregas", "GET", 200, (i + 1) / 1000, 1)
+        metrics.observe("/api/health/ready", "GET", 200, 9.0, 1)
+
+        self.assertEqual(metrics.latency_samples(), 100)
+        self.assertEqual(metrics.latency_percentile(99), 0.1)
+        self.assertEqual(metrics.latency_percentile(50), 0.051)
+
+
+class TestHealthProbes(unittest.TestCase):
+    """Testes para as sondas de liveness e readiness"""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.store = DeliveryStore(ENTREGAS_MOCK)
+        self.metrics = init_metrics(self.app)
+        init_health(self.app, self.store, self.metrics)
+        self.client = self.app.test_client()
+
+    def test_live(self):
+        """Liveness responde 200 sem consultar dependências"""
+        response = self.client.get("/api/health/live")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['status'], 'alive')
+
+    def test_ready(self):
+        """Readiness reporta backend, uptime e fila quando tudo está dentro dos limites"""
+        response = self.client.get("/api/health/ready")
+        data = response.get_json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['status'], 'ready')
+        self.assertEqual(data['backend']['total_entregas'], len(ENTREGAS_MOCK))
+        self.assertTrue(data['backend']['disponivel'])
+        self.assertEqual(data['requisicoes_em_andamento'], 0)
+        self.assertEqual(data['motivos'], [])
+
+    def test_not_ready_when_latency_high(self):
+        """p99 acima do limite tira a instância do balanceamento (503)"""
+        self.app.config['HEALTH_MAX_P99_MS'] = 100
+        for _ in range(50):
+            self.metrics.observe("/api/stats", "GET", 200, 0.5, 1)
+
+        response = self.client.get("/api/health/ready")
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.get_json()['latencia_p99_ms'], 500.0)
+
+    def test_not_ready_when_memory_high(self):
+        """Memória acima do limite gera 503 com o motivo"""
+        self.app.config['HEALTH_MAX_MEMORIA_MB'] = 1
+
+        response = self.client.get("/api/health/ready")
+
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("memória", response.get_json()['motivos'][0])
+
+    def test_store_tracks_writes(self):
+        """Escritas no backend atualizam total e horário da última escrita"""
+        antes = self.store.last_write
+        self.store.add(dict(ENTREGAS_MOCK[0], id=999))
+
+        data = self.client.get("/api/health/ready").get_json()
+        self.assertEqual(data['backend']['total_entregas'], len(ENTREGAS_MOCK) + 1)
+        self.assertGreaterEqual(self.store.last_write, antes)
+        self.assertNotIn(999, [e['id'] for e in ENTREGAS_MOCK])
+
+
+class TestProfiling(unittest.TestCase):
+    """Testes para o profiling sob demanda"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.app = Flask(__name__)
+        self.app.config.update(PROFILE_TOKEN="segredo", PROFILE_DIR=self.tmp.name)
+        init_profiling(self.app)
+
+        @self.app.route("/lento")
+        def lento():
+            return {"total": sum(range(10000))}
+
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_profile_requires_admin_token(self):
+        """Sem token válido a requisição é atendida sem perfil"""
+        for headers in ({}, {"X-Admin-Token": "errado"}):
+            with self.subTest(headers=headers):
+                response = self.client.get("/lento?profile=1", headers=headers)
+                self.assertEqual(response.status_code, 200)
+                self.assertNotIn("X-Profile", response.headers)
+        self.assertEqual(os.listdir(self.tmp.name), [])
+
+    def test_profile_request(self):
+        """Perfil da requisição é gravado e pode ser baixado por administradores"""
+        admin = {"X-Admin-Token": "segredo"}
+        response = self.client.get("/lento", headers={"X-Profile": "1", **admin})
+        filename = response.headers["X-Profile"]
+
+        stats = pstats.Stats(os.path.join(self.tmp.name, filename))
+        self.assertTrue(any(func[2] == "lento" for func in stats.stats))
+
+        self.assertEqual(self.client.get(f"/api/profiles/{filename}").status_code, 404)
+        download = self.client.get(f"/api/profiles/{filename}", headers=admin)
+        self.assertEqual(download.status_code, 200)
+        download.close()
+
+    def test_report_profile(self):
+        """Perfil da geração de relatório grava pstats e pilhas collapsed"""
+        generator = DeliveryReportGenerator()
+        prefix = os.path.join(self.tmp.name, "relatorio")
+
+        wb, perfil = profile_call(generator.create_styled_workbook, ENTREGAS_MOCK * 200,
+                                  output_prefix=prefix)
+
+        self.assertEqual(wb.sheetnames, ["Entregas do Dia"])
+        wb.save(prefix + ".xlsx")   # fecha os arquivos temporários do modo streaming
+        functions = {func[2] for func in pstats.Stats(perfil['pstats']).stats}
+        self.assertIn("create_styled_workbook", functions)
+        self.assertIn("_adjust_column_widths", functions)
+
+        with open(perfil['resumo'], encoding="utf-8") as f:
+            self.assertIn("create_styled_workbook", f.read())
+
+        with open(perfil['collapsed'], encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines) > 0, perfil['amostras'] > 0)
+        for line in lines:
+            stack, count = line.rsplit(" ", 1)
+            self.assertGreater(int(count), 0)
+
+    def test_sampling_profiler_captures_stack(self):
+        """Amostrador registra a pilha da thread em execução"""
+        def busy():
+            total = 0
+            for i in range(2_000_000):
+                total += i
+            return total
+
+        with SamplingProfiler(interval=0.0005) as sampler:
+            busy()
+
+        self.assertGreater(sampler.samples, 0)
+        self.assertTrue(any("test_observability:busy" in stack for stack in sampler.stacks))
+
+
+class TestStructuredLogging(unittest.TestCase):
+    """Testes para o logging estruturado com fila e correlação"""
+
+    def setUp(self):
+        self.stream = io.StringIO()
+        configure_logging(level="INFO", fmt="json", stream=self.stream)
+        self.logger = get_logger("testes")
+
+    def tearDown(self):
+        shutdown_logging()
+
+    def events(self):
+        """Descarrega a fila e retorna os eventos gravados"""
+        shutdown_logging()
+        return [json.loads(line) for line in self.stream.getvalue().splitlines()]
+
+    def test_json_event_with_correlation(self):
+        """Eventos saem em JSON com campos extras e o ID de correlação do contexto"""
+        with correlation("abc123"):
+            self.logger.info("Relatório salvo", extra={"arquivo": "r.xlsx", "linhas": 5})
+        self.logger.warning("Sem contexto")
+
+        first, second = self.events()
+        self.assertEqual(first['mensagem'], "Relatório salvo")
+        self.assertEqual(first['correlation_id'], "abc123")
+        self.assertEqual(first['arquivo'], "r.xlsx")
+        self.assertEqual(first['linhas'], 5)
+        self.assertEqual(second['nivel'], "WARNING")
+        self.assertNotIn('correlation_id', second)
+
+    def test_log_stage(self):
+        """Etapas registram duração e campos adicionados durante a execução"""
+        with log_stage(self.logger, "gravacao") as stage:
+            stage["tamanho_bytes"] = 10
+        with self.assertRaises(RuntimeError):
+            with log_stage(self.logger, "busca"):
+                raise RuntimeError("API fora do ar")
+
+        ok, failed = self.events()
+        self.assertEqual(ok['etapa'], "gravacao")
+        self.assertEqual(ok['tamanho_bytes'], 10)
+        self.assertGreaterEqual(ok['duracao_ms'], 0)
+        self.assertEqual(failed['nivel'], "ERROR")
+        self.assertIn("API fora do ar", failed['excecao'])
+
+    def test_request_correlation_id(self):
+        """Requisições recebem X-Request-ID, usado nos logs emitidos durante elas"""
+        app = Flask(__name__)
+        init_request_logging(app)
+
+        @app.route("/eco")
+        def eco():
+            self.logger.info("Dentro da requisição")
+            return {"ok": True}
+
+        client = app.test_client()
+        given = client.get("/eco", headers={"X-Request-ID": "req-42"})
+        generated = client.get("/eco", headers={"X-Request-ID": "inválido com espaço"})
+
+        self.assertEqual(given.headers["X-Request-ID"], "req-42")
+        self.assertRegex(generated.headers["X-Request-ID"], r"^[0-9a-f]{16}$")
+
+        events = self.events()
+        inside = [e for e in events if e['mensagem'] == "Dentro da requisição"]
+        access = [e for e in events if e['mensagem'] == "Requisição atendida"]
+        self.assertEqual(inside[0]['correlation_id'], "req-42")
+        self.assertEqual(access[0]['rota'], "/eco")
+        self.assertEqual(access[0]['status'], 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
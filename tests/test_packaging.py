@@ -0,0 +1,110 @@
+"""
+Testes de Empacotamento - Sistema Zeca Delivery
+===============================================
+
+Testes para os comandos do pacote zeca: tempo de inicialização medido com
+`python -X importtime` e importação preguiçosa das dependências pesadas.
+
+Para executar:
+    python -m pytest tests/
+"""
+
+import unittest
+import subprocess
+import json
+import sys
+import os
+
+RAIZ = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Orçamento de importação de zeca.cli (tempo acumulado, em milissegundos)
+ORCAMENTO_IMPORTACAO_MS = 100
+
+DEPENDENCIAS_PESADAS = ("flask", "openpyxl", "requests")
+
+
+def run_python(*args):
+    """Executa o Python em um processo novo, a partir da raiz do projeto"""
+    return subprocess.run([sys.executable, *args], cwd=RAIZ, capture_output=True,
+                          text=True, timeout=60)
+
+
+def loaded_after(code):
+    """Dependências pesadas carregadas depois de executar `code`"""
+    script = (f"import sys\n{code}\n"
+              f"print('@@' + repr(sorted(m for m in {DEPENDENCIAS_PESADAS!r} if m in sys.modules)))")
+    result = run_python("-c", script)
+    marker = [line for line in result.stdout.splitlines() if line.startswith('@@')]
+    if not marker:
+        raise AssertionError(result.stderr)
+    return json.loads(marker[-1][2:].replace("'", '"'))
+
+
+class TestStartupTime(unittest.TestCase):
+    """Testes do tempo de inicialização dos comandos"""
+
+    def test_import_cli_within_budget(self):
+        """Importar zeca.cli deve caber no orçamento de inicialização"""
+        result = run_python("-X", "importtime", "-c", "import zeca.cli")
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+        # Linhas: "import time: <self> | <acumulado> | <módulo>"
+        acumulado = {}
+        for line in result.stderr.splitlines():
+            campos = line.split("|")
+            if len(campos) == 3 and campos[1].strip().isdigit():
+                acumulado[campos[2].strip()] = int(campos[1])
+        self.assertIn("zeca.cli", acumulado)
+        self.assertLess(acumulado["zeca.cli"] / 1000, ORCAMENTO_IMPORTACAO_MS)
+
+    def test_cli_does_not_import_heavy_dependencies(self):
+        """zeca.cli e o pacote zeca não carregam Flask, openpyxl nem requests"""
+        self.assertEqual(loaded_after("import zeca, zeca.cli"), [])
+
+    def test_data_command_is_lightweight(self):
+        """zeca-data não carrega Flask, openpyxl nem requests"""
+        code = ("import io, contextlib, zeca.cli\n"
+                "with contextlib.redirect_stdout(io.StringIO()):\n"
+                "    zeca.cli.data_main(['--stats'])")
+        self.assertEqual(loaded_after(code), [])
+
+    def test_data_import_is_lightweight(self):
+        """zeca-data import (só validação) não carrega Flask, openpyxl nem requests"""
+        code = ("import io, os, tempfile, contextlib, zeca.cli\n"
+                "from zeca.data.schema import CAMPOS\n"
+                "path = os.path.join(tempfile.mkdtemp(), 'pedidos.csv')\n"
+                "open(path, 'w').write(','.join(CAMPOS) + '\\n')\n"
+                "with contextlib.redirect_stdout(io.StringIO()):\n"
+                "    zeca.cli.data_main(['import', path])")
+        self.assertEqual(loaded_after(code), [])
+
+    def test_report_help_is_lightweight(self):
+        """zeca-report --help não carrega openpyxl nem requests"""
+        code = ("import io, contextlib, zeca.cli\n"
+                "with contextlib.redirect_stdout(io.StringIO()):\n"
+                "    try:\n"
+                "        zeca.cli.report_main(['--help'])\n"
+                "    except SystemExit:\n"
+                "        pass")
+        self.assertEqual(loaded_after(code), [])
+
+
+class TestEntryPoints(unittest.TestCase):
+    """Testes dos comandos via `python -m zeca`"""
+
+    def test_data_stats_json(self):
+        """`python -m zeca data --stats` imprime as estatísticas em JSON"""
+        result = run_python("-m", "zeca", "data", "--stats")
+        self.assertEqual(result.returncode, 0, result.stderr)
+        stats = json.loads(result.stdout)
+        self.assertIn("total_entregas", stats)
+
+    def test_unknown_command(self):
+        """Comando desconhecido retorna código 2 com o uso"""
+        result = run_python("-m", "zeca", "nada")
+        self.assertEqual(result.returncode, 2)
+        self.assertIn("python -m zeca", result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
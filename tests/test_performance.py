@@ -0,0 +1,174 @@
+"""
+Testes de Desempenho - Sistema Zeca Delivery
+============================================
+
+Testes de regressão de desempenho: os endpoints principais e a geração do
+relatório Excel são executados sobre um conjunto gerado de 100 mil
+entregas (o relatório, sobre parte dele), e o tempo e o pico de memória
+(tracemalloc) de cada caso são comparados com as referências gravadas em
+tests/perf_baseline.json. Cada referência registra quantas linhas o caso
+processou, e só é comparada com medições do mesmo tamanho. O teste falha quando um caso passa da referência mais a tolerância: a maior
+entre a porcentagem (ZECA_PERF_TOLERANCIA) e uma folga absoluta (5 ms no
+tempo, 4 MB na memória), para que casos muito rápidos não falhem por ruído.
+
+Os tempos dependem da máquina, por isso os testes só rodam quando pedidos:
+
+    ZECA_PERF=1 python -m pytest tests/test_performance.py
+
+Variáveis de ambiente:
+- ZECA_PERF=1              executa os testes
+- ZECA_PERF_ATUALIZAR=1    regrava as referências com as medições atuais
+- ZECA_PERF_LINHAS         tamanho do conjunto (padrão 100000)
+- ZECA_PERF_TOLERANCIA     folga sobre a referência (padrão 0.5 = +50%)
+- ZECA_PERF_REPETICOES     execuções cronometradas por caso (padrão 5)
+
+O tempo e a memória são medidos em execuções separadas, porque o
+tracemalloc deixa as alocações bem mais lentas. Cada caso é executado uma
+vez sem medição (aquecimento), ZECA_PERF_REPETICOES vezes para o tempo (vale
+o menor, o menos afetado por outros processos da máquina) e uma vez para a
+memória. O relatório usa as primeiras 5 mil entregas no tempo e 1 mil na
+memória: a planilha é gravada em streaming, então o custo por linha e o
+pico de memória já aparecem nesses tamanhos.
+"""
+
+import unittest
+import tempfile
+import shutil
+import json
+import time
+import sys
+import os
+
+# Adicionar diretórios ao path para importar módulos
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from helpers import make_app
+from zeca.api.loadtest import synthetic_deliveries
+from zeca.common.structured_logging import get_logger
+from zeca.reports.excel_generator import DeliveryReportGenerator
+from zeca.reports.timing import StageTimer
+
+ARQUIVO_REFERENCIAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'perf_baseline.json')
+LINHAS = int(os.environ.get('ZECA_PERF_LINHAS', 100_000))
+TOLERANCIA = float(os.environ.get('ZECA_PERF_TOLERANCIA', 0.5))
+REPETICOES = int(os.environ.get('ZECA_PERF_REPETICOES', 5))
+ATUALIZAR = os.environ.get('ZECA_PERF_ATUALIZAR') == '1'
+FOLGA_MINIMA = {"tempo_s": 0.005, "pico_memoria_mb": 4.0}
+LINHAS_RELATORIO = 5_000
+LINHAS_MEMORIA_RELATORIO = 1_000
+
+logger = get_logger("perf")
+
+
+@unittest.skipUnless(os.environ.get('ZECA_PERF') == '1', "testes de desempenho: defina ZECA_PERF=1")
+class TestPerformanceRegression(unittest.TestCase):
+    """Tempo e pico de memória comparados com as referências gravadas"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.entregas = list(synthetic_deliveries(LINHAS, start_id=1))
+        cls.app = make_app(cls.entregas)
+        cls.client = cls.app.test_client()
+        # Índices montados antes das medições (sem a thread de aquecimento concorrendo)
+        cls.app.extensions["zeca_tenants"].default.warm()
+
+        cls.referencias = {"casos": {}}
+        if os.path.exists(ARQUIVO_REFERENCIAS):
+            with open(ARQUIVO_REFERENCIAS, encoding='utf-8') as f:
+                cls.referencias = json.load(f)
+        cls.medicoes = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        if ATUALIZAR and cls.medicoes:
+            casos = dict(cls.referencias["casos"], **cls.medicoes)
+            with open(ARQUIVO_REFERENCIAS, 'w', encoding='utf-8') as f:
+                json.dump({"casos": dict(sorted(casos.items()))}, f, indent=2)
+                f.write('\n')
+
+    def measure(self, name, action, memory_action=None, linhas=LINHAS, linhas_memoria=None):
+        """
+        Mede o tempo de `action` (o menor de REPETICOES execuções, após um
+        aquecimento) e o pico de memória de `memory_action` (padrão: a
+        própria `action`) e compara com a referência. `linhas` e
+        `linhas_memoria` são os tamanhos processados em cada medição.
+        """
+        action()
+        tempos = []
+        for _ in range(REPETICOES):
+            started = time.perf_counter()
+            action()
+            tempos.append(time.perf_counter() - started)
+        elapsed = min(tempos)
+
+        with StageTimer(logger) as timer:
+            with timer.stage(name):
+                (memory_action or action)()
+        medicao = {"linhas": linhas,
+                   "linhas_memoria": linhas_memoria or linhas,
+                   "tempo_s": round(elapsed, 3),
+                   "pico_memoria_mb": round(timer.stages[-1].peak_memory / 1024 / 1024, 1)}
+        self.medicoes[name] = medicao
+
+        referencia = self.referencias["casos"].get(name)
+        if ATUALIZAR or referencia is None:
+            return
+        if (referencia.get("linhas"), referencia.get("linhas_memoria")) != (
+                medicao["linhas"], medicao["linhas_memoria"]):
+            return
+        for campo, folga in FOLGA_MINIMA.items():
+            limite = max(referencia[campo] * (1 + TOLERANCIA), referencia[campo] + folga)
+            self.assertLessEqual(
+                medicao[campo], limite,
+                f"{name}: {campo} {medicao[campo]} acima da referência {referencia[campo]} "
+                f"(limite {limite:.3f})")
+
+    def check_endpoint(self, name, method, path, **kwargs):
+        """Caso de endpoint: medição e status 200 em todas as execuções"""
+        status = set()
+        self.measure(name, lambda: status.add(self.client.open(path, method=method, **kwargs).status_code))
+        self.assertEqual(status, {200})
+
+    def test_list_all(self):
+        self.check_endpoint("lista", "GET", "/api/entregas")
+
+    def test_pending(self):
+        self.check_endpoint("pendentes", "GET", "/api/entregas/pendentes")
+
+    def test_stats(self):
+        self.check_endpoint("stats", "GET", "/api/stats")
+
+    def test_search(self):
+        self.check_endpoint("busca", "GET", "/api/entregas/busca?q=pizza")
+
+    def test_phone_filter(self):
+        telefone = self.entregas[LINHAS // 2]["telefone"]
+        self.check_endpoint("telefone", "GET", "/api/entregas", query_string={"telefone": telefone})
+
+    def test_lookup(self):
+        ids = [entrega["id"] for entrega in self.entregas[::max(1, LINHAS // 1000)]][:1000]
+        self.check_endpoint("lookup", "POST", "/api/entregas/lookup", json={"ids": ids})
+
+    def test_route_batches(self):
+        self.check_endpoint("lotes", "GET", "/api/rotas/lotes")
+
+    def test_report_generation(self):
+        directory = tempfile.mkdtemp()
+        try:
+            generator = DeliveryReportGenerator(trace_memory=False)
+            path = os.path.join(directory, "relatorio.xlsx")
+            results = []
+            self.measure("relatorio",
+                         lambda: results.append(generator.generate_report(
+                             filename=path, deliveries=self.entregas[:LINHAS_RELATORIO])),
+                         lambda: results.append(generator.generate_report(
+                             filename=path, deliveries=self.entregas[:LINHAS_MEMORIA_RELATORIO])),
+                         linhas=min(LINHAS, LINHAS_RELATORIO),
+                         linhas_memoria=min(LINHAS, LINHAS_MEMORIA_RELATORIO))
+            self.assertTrue(all(results))
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+"""
+Testes de Limite de Requisições - Sistema Zeca Delivery
+=======================================================
+
+Testes para os baldes de fichas por cliente e para o controle de admissão
+(429/503 com Retry-After) em uma app Flask de teste.
+
+Para executar:
+    python -m pytest tests/
+"""
+
+import unittest
+import threading
+import sys
+import os
+
+# Adicionar diretórios ao path para importar módulos
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask, jsonify
+
+from zeca.api.rate_limit import TokenBuckets, init_rate_limit
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBuckets(unittest.TestCase):
+    """Testes para o token bucket"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.buckets = TokenBuckets(rate=2, burst=3, max_clients=2, clock=self.clock)
+
+    def test_burst_then_refill(self):
+        """Rajada inicial, recusa com espera e reposição com o tempo"""
+        self.assertEqual([self.buckets.acquire("a") for _ in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(self.buckets.acquire("a"), 0.5)
+
+        self.clock.now = 0.5
+        self.assertEqual(self.buckets.acquire("a"), 0)
+        self.assertGreater(self.buckets.acquire("a"), 0)
+
+    def test_clients_are_independent(self):
+        """Um cliente sem fichas não afeta os outros"""
+        for _ in range(3):
+            self.buckets.acquire("a")
+        self.assertGreater(self.buckets.acquire("a"), 0)
+        self.assertEqual(self.buckets.acquire("b"), 0)
+
+    def test_max_clients(self):
+        """O cliente usado há mais tempo é descartado"""
+        for client in ("a", "b", "c"):
+            self.buckets.acquire(client)
+        self.assertEqual(len(self.buckets), 2)
+        self.assertNotIn("a", self.buckets._buckets)
+
+
+class TestAdmission(unittest.TestCase):
+    """Testes para os hooks de admissão na app"""
+
+    def make_app(self, **config):
+        app = Flask(__name__)
+        app.config.update(config)
+        self.release = threading.Event()
+        self.entered = threading.Event()
+
+        @app.route("/api/entregas")
+        def entregas():
+            return jsonify([])
+
+        @app.route("/api/lento")
+        def lento():
+            self.entered.set()
+            self.release.wait(5)
+            return jsonify({})
+
+        @app.route("/api/health/live")
+        def live():
+            return jsonify({"status": "alive"})
+
+        init_rate_limit(app)
+        return app.test_client()
+
+    def test_rate_limited_client_gets_429(self):
+        """Acima da rajada: 429 com Retry-After no envelope padrão"""
+        client = self.make_app(RATE_LIMIT_RPS=1, RATE_LIMIT_RAJADA=2)
+        self.assertEqual(client.get("/api/entregas").status_code, 200)
+        self.assertEqual(client.get("/api/entregas").status_code, 200)
+
+        response = client.get("/api/entregas")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers["Retry-After"], "1")
+        self.assertEqual(response.get_json()["status"], "error")
+
+        # Sondas não são limitadas
+        self.assertEqual(client.get("/api/health/live").status_code, 200)
+
+    def test_concurrency_limit_gets_503(self):
+        """Com todas as vagas ocupadas: 503; a vaga é liberada ao final"""
+        client = self.make_app(RATE_LIMIT_RPS=0, MAX_CONCORRENTES=1)
+        thread = threading.Thread(target=client.get, args=("/api/lento",))
+        thread.start()
+        self.assertTrue(self.entered.wait(5))
+
+        response = client.get("/api/entregas")
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("Retry-After", response.headers)
+
+        self.release.set()
+        thread.join()
+        self.assertEqual(client.get("/api/entregas").status_code, 200)
+
+    def test_disabled(self):
+        """Com os limites em 0 nada é recusado"""
+        client = self.make_app(RATE_LIMIT_RPS=0, MAX_CONCORRENTES=0)
+        for _ in range(20):
+            self.assertEqual(client.get("/api/entregas").status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,290 @@
+"""
+Testes de Relatórios - Sistema Zeca Delivery
+============================================
+
+Testes para a geração de relatórios Excel sem depender da API rodando.
+
+Para executar:
+    python -m pytest tests/
+"""
+
+import unittest
+import tempfile
+import tracemalloc
+import json
+from datetime import datetime
+import sys
+import os
+
+# Adicionar diretórios ao path para importar módulos
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from openpyxl import load_workbook
+
+from zeca.data.sample_data import ENTREGAS_MOCK, compute_stats, compare_stats, StatsAccumulator
+from zeca.reports.excel_generator import DeliveryReportGenerator
+from zeca.reports.sharding import partition_deliveries, generate_sharded_reports, slugify, unique_slugs
+from zeca.reports.scheduler import CronSchedule, ReportJob, ReportScheduler, RunHistory
+
+
+def save_and_load(wb):
+    """Salva a planilha em arquivo temporário e a reabre para leitura"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "relatorio.xlsx")
+        wb.save(path)
+        return load_workbook(path)
+
+
+class TestStreamingWorkbook(unittest.TestCase):
+    """Testes para a planilha gerada em streaming com várias abas"""
+
+    def test_single_sheet_by_default(self):
+        """Sem limite baixo, todas as entregas ficam na aba principal"""
+        wb = save_and_load(DeliveryReportGenerator().create_styled_workbook(ENTREGAS_MOCK))
+
+        self.assertEqual(wb.sheetnames, ["Entregas do Dia"])
+        ws = wb["Entregas do Dia"]
+        self.assertEqual(ws.max_row, len(ENTREGAS_MOCK) + 1)
+        self.assertEqual(ws["A1"].value, "ID")
+        self.assertEqual(ws["H2"].value, "2025-08-04 19:30:00")
+
+    def test_invalid_delivery_fails_before_writing(self):
+        """Entrega inválida é recusada na validação, com o campo no erro"""
+        invalida = dict(ENTREGAS_MOCK[0], entrega_prevista="hoje à noite")
+        with self.assertRaises(ValueError) as ctx:
+            DeliveryReportGenerator().create_styled_workbook([invalida])
+        self.assertIn("entrega_prevista", str(ctx.exception))
+
+    def test_sheet_rollover(self):
+        """Entregas além do limite continuam em novas abas"""
+        generator = DeliveryReportGenerator(rows_per_sheet=2)
+        wb = generator.create_styled_workbook(ENTREGAS_MOCK)
+        generator.add_statistics_sheet(wb, compute_stats(ENTREGAS_MOCK))
+        wb = save_and_load(wb)
+
+        self.assertEqual(wb.sheetnames, ["Entregas do Dia", "Entregas do Dia (2)",
+                                         "Entregas do Dia (3)", "Estatísticas"])
+        self.assertEqual([wb[name].max_row for name in wb.sheetnames[:3]], [3, 3, 2])
+
+        labels = [row[0] for row in wb["Estatísticas"].iter_rows(values_only=True)]
+        self.assertIn("  Entregas do Dia (3):", labels)
+
+    def test_one_sheet_per_status(self):
+        """Layout por status cria uma aba para cada status"""
+        wb = save_and_load(DeliveryReportGenerator(sheet_by="status").create_styled_workbook(ENTREGAS_MOCK))
+
+        self.assertEqual(sorted(wb.sheetnames), ["Em Transito", "Entregue", "Pendente"])
+        self.assertEqual(wb["Pendente"].max_row, 4)
+
+    def test_invalid_configuration(self):
+        """Limite de linhas fora do permitido pelo Excel gera ValueError"""
+        with self.assertRaises(ValueError):
+            DeliveryReportGenerator(rows_per_sheet=2_000_000)
+        with self.assertRaises(ValueError):
+            DeliveryReportGenerator(sheet_by="cidade")
+
+
+class TestShardedReports(unittest.TestCase):
+    """Testes para os relatórios particionados"""
+
+    def test_partition_by_status(self):
+        """Particionamento agrupa todas as entregas pela chave"""
+        shards = partition_deliveries(ENTREGAS_MOCK, "status")
+
+        self.assertEqual(set(shards), {"pendente", "em_transito", "entregue"})
+        self.assertEqual(sum(len(rows) for rows in shards.values()), len(ENTREGAS_MOCK))
+        self.assertIsInstance(shards["pendente"][0], tuple)
+
+    def test_invalid_partition_key(self):
+        """Chave de partição desconhecida gera ValueError"""
+        with self.assertRaises(ValueError):
+            partition_deliveries(ENTREGAS_MOCK, "cidade")
+
+    def test_slugify(self):
+        """Nomes de partição viram trechos seguros de arquivo"""
+        self.assertEqual(slugify("Consolação"), "consolacao")
+        self.assertEqual(slugify("Bela Vista"), "bela_vista")
+
+    def test_colliding_slugs_get_suffix(self):
+        """Partições com o mesmo trecho de nome geram arquivos distintos"""
+        self.assertEqual(unique_slugs(["Consolação", "Consolacao", "Centro"]),
+                         {"Centro": "centro", "Consolacao": "consolacao", "Consolação": "consolacao_2"})
+
+        entregas = [dict(ENTREGAS_MOCK[0], bairro="Bela Vista"), dict(ENTREGAS_MOCK[1], bairro="Bela-Vista")]
+        with tempfile.TemporaryDirectory() as output_dir:
+            manifest = generate_sharded_reports(entregas, "bairro", output_dir, max_workers=1)
+            arquivos = [item['arquivo'] for item in manifest['arquivos']]
+            self.assertEqual(len(set(arquivos)), 2)
+            for arquivo in arquivos:
+                self.assertTrue(os.path.exists(os.path.join(output_dir, arquivo)))
+
+            with self.assertRaises(ValueError):
+                generate_sharded_reports(entregas, "bairro", output_dir, max_workers=-1)
+
+    def test_generate_sharded_reports(self):
+        """Gera um arquivo por bairro em processos separados e o manifesto"""
+        with tempfile.TemporaryDirectory() as output_dir:
+            manifest = generate_sharded_reports(ENTREGAS_MOCK, "bairro", output_dir, max_workers=2)
+
+            self.assertEqual(manifest['total_arquivos'], 4)
+            self.assertEqual(manifest['total_linhas'], len(ENTREGAS_MOCK))
+            self.assertTrue(os.path.exists(manifest['manifesto']))
+
+            with open(manifest['manifesto'], encoding='utf-8') as f:
+                self.assertEqual(json.load(f)['total_arquivos'], 4)
+
+            centro = next(item for item in manifest['arquivos'] if item['particao'] == "Centro")
+            wb = load_workbook(os.path.join(output_dir, centro['arquivo']))
+            self.assertEqual(wb["Entregas do Dia"].max_row, 3)
+            self.assertIn("Estatísticas", wb.sheetnames)
+
+
+class FakeGenerator(DeliveryReportGenerator):
+    """Gerador que usa os dados mockados em vez da API"""
+
+    deliveries = ENTREGAS_MOCK
+
+    def verify_api_connection(self):
+        return True
+
+    def fetch_deliveries(self):
+        return list(self.deliveries)
+
+    def fetch_data_version(self):
+        return f"teste.{len(self.deliveries)}"
+
+    def fetch_statistics(self):
+        return compute_stats(self.deliveries)
+
+
+class TestReportScheduler(unittest.TestCase):
+    """Testes para o agendador de relatórios"""
+
+    def test_cron_next_run(self):
+        """Expressões cron, apelidos e intervalos calculam a próxima execução"""
+        moment = datetime(2026, 10, 19, 10, 7, 30)   # segunda-feira
+
+        self.assertEqual(CronSchedule("*/15 * * * *").next_after(moment), datetime(2026, 10, 19, 10, 15))
+        self.assertEqual(CronSchedule("@daily").next_after(moment), datetime(2026, 10, 20, 0, 0))
+        self.assertEqual(CronSchedule("0 9 * * 6,7").next_after(moment), datetime(2026, 10, 24, 9, 0))
+        self.assertEqual(CronSchedule("@every 10m").next_after(moment), datetime(2026, 10, 19, 10, 17, 30))
+
+    def test_invalid_cron(self):
+        """Expressões inválidas geram ValueError"""
+        for expression in ("* * *", "61 * * * *", "@every 10x"):
+            with self.subTest(expression=expression):
+                with self.assertRaises(ValueError):
+                    CronSchedule(expression)
+
+    def test_run_skipped_when_data_unchanged(self):
+        """Segunda execução com os mesmos dados é ignorada e registrada no histórico"""
+        with tempfile.TemporaryDirectory() as tmp:
+            history = RunHistory(os.path.join(tmp, "historico.db"))
+            job = ReportJob("teste", "@hourly", output_dir=tmp)
+            scheduler = ReportScheduler([job], history, generator_factory=FakeGenerator)
+
+            first = scheduler.run_once()[0]
+            second = scheduler.run_once()[0]
+            scheduler.stop()
+
+            self.assertEqual(first['status'], 'sucesso')
+            self.assertEqual(first['linhas'], len(ENTREGAS_MOCK))
+            self.assertGreater(first['tamanho_bytes'], 0)
+            self.assertGreater(first['pico_memoria_bytes'], 0)
+            self.assertTrue(os.path.exists(first['arquivo']))
+            self.assertEqual(second['status'], 'ignorado')
+
+            self.assertIsNone(second.get('linhas'))
+            self.assertFalse(tracemalloc.is_tracing())
+
+            runs = history.query(job="teste")
+            self.assertEqual([run['status'] for run in runs], ['ignorado', 'sucesso'])
+
+
+class TestStageTiming(unittest.TestCase):
+    """Testes para a medição de tempo e memória por etapa"""
+
+    def test_report_result_with_stages(self):
+        """Resultado traz wall, CPU e memória de cada etapa e vai para o log JSONL"""
+        with tempfile.TemporaryDirectory() as tmp:
+            run_log = os.path.join(tmp, "execucoes.jsonl")
+            generator = FakeGenerator(run_log=run_log, local_stats=False)
+            result = generator.generate_report(filename=os.path.join(tmp, "relatorio.xlsx"))
+
+            self.assertTrue(result)
+            self.assertEqual(result.rows, len(ENTREGAS_MOCK))
+            self.assertEqual([stage.name for stage in result.stages],
+                             ["verificacao", "busca_entregas", "busca_estatisticas",
+                              "planilha", "aba_estatisticas", "gravacao"])
+            for stage in result.stages:
+                self.assertGreaterEqual(stage.wall_ms, 0)
+                self.assertGreaterEqual(stage.cpu_ms, 0)
+                self.assertGreater(stage.peak_memory, 0)
+            self.assertGreater(result.stage("gravacao").fields['tamanho_bytes'], 0)
+
+            with open(run_log, encoding="utf-8") as f:
+                lines = [json.loads(line) for line in f]
+            self.assertEqual(len(lines), 1)
+            self.assertEqual(lines[0]['status'], "sucesso")
+            self.assertEqual(len(lines[0]['etapas']), 6)
+            self.assertEqual(lines[0]['etapas'][3]['linhas'], len(ENTREGAS_MOCK))
+
+    def test_failed_report_is_falsy(self):
+        """Falha na geração retorna resultado falso com o motivo"""
+        generator = FakeGenerator(trace_memory=False)
+        generator.deliveries = []
+        result = generator.generate_report(filename="nao_gerado.xlsx")
+
+        self.assertFalse(result)
+        self.assertEqual(result.error, "nenhuma entrega encontrada")
+        self.assertIsNone(result.peak_memory)
+        self.assertFalse(os.path.exists("nao_gerado.xlsx"))
+
+
+class TestFusedStatistics(unittest.TestCase):
+    """Testes para as estatísticas calculadas na passada da planilha"""
+
+    def test_accumulator_matches_compute_stats(self):
+        """Acumulador alimentado pela planilha produz as mesmas estatísticas"""
+        accumulator = StatsAccumulator()
+        save_and_load(DeliveryReportGenerator().create_styled_workbook(ENTREGAS_MOCK, stats=accumulator))
+        statistics = accumulator.result()
+
+        self.assertEqual(statistics, compute_stats(ENTREGAS_MOCK))
+        self.assertEqual(statistics['distribuicao_prioridade'], {"normal": 3, "alta": 2})
+        self.assertEqual(sum(statistics['valor_por_prioridade'].values()), statistics['valor_total'])
+
+    def test_compare_stats(self):
+        """Divergências entre estatísticas locais e da API são listadas"""
+        local = compute_stats(ENTREGAS_MOCK)
+        self.assertEqual(compare_stats(local, dict(local, valor_total=local['valor_total'] + 0.001)), [])
+
+        remote = dict(local, total_entregas=99, distribuicao_status={})
+        self.assertEqual(len(compare_stats(local, remote)), 2)
+
+    def test_local_stats_skip_api_call(self):
+        """Por padrão a API de estatísticas não é chamada"""
+        class NoStatsGenerator(FakeGenerator):
+            def fetch_statistics(self):
+                raise AssertionError("não deveria chamar /api/stats")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "relatorio.xlsx")
+            result = NoStatsGenerator(trace_memory=False).generate_report(filename=path)
+
+            self.assertTrue(result)
+            self.assertIsNone(result.stage("busca_estatisticas"))
+            labels = [row[0] for row in load_workbook(path)["Estatísticas"].iter_rows(values_only=True)]
+            self.assertIn("🚦 Distribuição por Prioridade:", labels)
+
+    def test_verify_stats_against_api(self):
+        """Conferência registra quantas estatísticas divergem da API"""
+        with tempfile.TemporaryDirectory() as tmp:
+            generator = FakeGenerator(verify_stats=True, trace_memory=False)
+            result = generator.generate_report(filename=os.path.join(tmp, "relatorio.xlsx"))
+
+        self.assertEqual(result.stage("conferencia_estatisticas").fields['divergencias'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+"""
+Testes de Rotas - Sistema Zeca Delivery
+=======================================
+
+Testes para o agrupamento de entregas em lotes e a ordenação de paradas.
+
+Para executar:
+    python -m pytest tests/
+"""
+
+import unittest
+import random
+import time
+import sys
+import os
+from datetime import datetime
+
+# Adicionar diretórios ao path para importar módulos
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from zeca.data.sample_data import ENTREGAS_MOCK
+from zeca.routing.batching import build_batches
+from zeca.routing.optimizer import optimize_route, coordinates_for
+
+
+def make_delivery(delivery_id, cep, horario, bairro="Centro"):
+    """Cria entrega mínima para os testes de agrupamento"""
+    return {
+        "id": delivery_id,
+        "bairro": bairro,
+        "cep": cep,
+        "valor": 10.0,
+        "entrega_prevista": f"2025-08-04T{horario}:00",
+        "status": "pendente"
+    }
+
+
+class TestRouteBatching(unittest.TestCase):
+    """Testes para o agrupamento de entregas em lotes"""
+
+    def test_batches_cover_all_deliveries(self):
+        """Todas as entregas aparecem em exatamente um lote"""
+        lotes = build_batches(ENTREGAS_MOCK)
+
+        ids = [e['id'] for lote in lotes for e in lote['entregas']]
+        self.assertEqual(sorted(ids), sorted(e['id'] for e in ENTREGAS_MOCK))
+        self.assertEqual([lote['lote'] for lote in lotes], list(range(1, len(lotes) + 1)))
+
+    def test_max_size_is_respected(self):
+        """Lotes não passam do tamanho máximo"""
+        entregas = [make_delivery(i, "01310-100", "20:00") for i in range(7)]
+
+        lotes = build_batches(entregas, max_tamanho=3)
+
+        self.assertEqual([lote['total'] for lote in lotes], [3, 3, 1])
+
+    def test_time_window_splits_batches(self):
+        """Entregas fora da janela de tempo vão para outro lote"""
+        entregas = [
+            make_delivery(1, "01310-100", "19:00"),
+            make_delivery(2, "01310-200", "19:20"),
+            make_delivery(3, "01310-300", "20:30"),
+        ]
+
+        lotes = build_batches(entregas, janela_minutos=30)
+
+        self.assertEqual([[e['id'] for e in lote['entregas']] for lote in lotes], [[1, 2], [3]])
+        self.assertEqual(lotes[0]['janela_minutos'], 20)
+
+    def test_group_by_bairro(self):
+        """Agrupamento por bairro separa regiões diferentes"""
+        entregas = [
+            make_delivery(1, "01310-100", "20:00", bairro="Bela Vista"),
+            make_delivery(2, "01310-100", "20:00", bairro="Jardins"),
+        ]
+
+        self.assertEqual(len(build_batches(entregas)), 1)
+        self.assertEqual(len(build_batches(entregas, agrupar_por='bairro')), 2)
+
+    def test_invalid_parameters(self):
+        """Parâmetros inválidos geram ValueError"""
+        with self.assertRaises(ValueError):
+            build_batches(ENTREGAS_MOCK, max_tamanho=0)
+        with self.assertRaises(ValueError):
+            build_batches(ENTREGAS_MOCK, agrupar_por='cidade')
+
+
+class TestRouteOptimizer(unittest.TestCase):
+    """Testes para o otimizador de ordem de paradas"""
+
+    def test_route_is_permutation(self):
+        """A rota visita cada entrega exatamente uma vez"""
+        rota = optimize_route(ENTREGAS_MOCK)
+
+        self.assertEqual(sorted(rota['ordem']), sorted(e['id'] for e in ENTREGAS_MOCK))
+        self.assertEqual(len(rota['paradas']), len(ENTREGAS_MOCK))
+        self.assertTrue(rota['otimizacao_completa'])
+
+    def test_deadline_penalty_changes_order(self):
+        """Entrega com prazo apertado é visitada antes de uma mais próxima"""
+        entregas = [
+            make_delivery(1, "01010-000", "21:00"),   # perto da cozinha, prazo folgado
+            make_delivery(2, "01426-001", "19:15"),   # longe, prazo apertado
+        ]
+
+        rota = optimize_route(entregas, saida=datetime(2025, 8, 4, 19, 0), penalidade_atraso=10)
+
+        self.assertEqual(rota['ordem'], [2, 1])
+        self.assertEqual(rota['atraso_total_minutos'], 0.0)
+
+    def test_unknown_cep_falls_back(self):
+        """CEP fora da tabela usa a região ou é marcado como desconhecido"""
+        self.assertEqual(coordinates_for("01310-100")[1], "setor")
+        self.assertEqual(coordinates_for("01399-999")[1], "regiao")
+        self.assertEqual(coordinates_for("99999-999"), (None, None))
+
+        rota = optimize_route([make_delivery(1, "99999-999", "20:00")])
+        self.assertEqual(rota['paradas'][0]['coordenada'], "desconhecida")
+
+    def test_time_budget_is_respected(self):
+        """Otimização de muitas paradas devolve rota dentro do orçamento"""
+        ceps = ["01001-000", "01302-000", "01310-100", "01426-001", "01504-000",
+                "04101-000", "05402-000", "01451-000", "05010-000", "01029-000"]
+        rng = random.Random(42)
+        entregas = [make_delivery(i, rng.choice(ceps), f"{rng.randint(19, 22)}:{rng.randint(0, 59):02d}")
+                    for i in range(80)]
+
+        inicio = time.perf_counter()
+        rota = optimize_route(entregas, orcamento_ms=20)
+        decorrido_ms = (time.perf_counter() - inicio) * 1000
+
+        self.assertEqual(len(rota['ordem']), 80)
+        self.assertLess(decorrido_ms, 500)
+
+    def test_time_budget_covers_construction(self):
+        """Com muitas paradas o orçamento vale também para a matriz e o vizinho mais próximo"""
+        entregas = [make_delivery(i, f"0{1000 + i % 500:04d}-000", f"{19 + i % 4}:{i % 60:02d}")
+                    for i in range(2000)]
+
+        inicio = time.perf_counter()
+        rota = optimize_route(entregas, orcamento_ms=20)
+        decorrido_ms = (time.perf_counter() - inicio) * 1000
+
+        self.assertEqual(sorted(rota['ordem']), list(range(2000)))
+        self.assertFalse(rota['otimizacao_completa'])
+        self.assertLess(decorrido_ms, 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+"""
+Testes de Busca - Sistema Zeca Delivery
+=======================================
+
+Testes para o índice de busca de entregas (normalização, prefixos,
+atualização incremental) e para o endpoint GET /api/entregas/busca.
+
+Para executar:
+    python -m pytest tests/
+"""
+
+import unittest
+import sys
+import os
+
+# Adicionar diretórios ao path para importar módulos
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from helpers import make_app
+from zeca.data.sample_data import ENTREGAS_MOCK
+from zeca.data.search import DeliverySearch, tokenize
+from zeca.data.store import DeliveryStore
+
+
+def ids(result):
+    total, entregas = result
+    return [e.id for e in entregas]
+
+
+class TestSearchIndex(unittest.TestCase):
+    """Testes para a busca sobre o armazenamento"""
+
+    def setUp(self):
+        self.store = DeliveryStore(ENTREGAS_MOCK)
+        self.store.add(dict(ENTREGAS_MOCK[0], id=201, cliente="Conceição Araújo",
+                            endereco="Rua da Consolação, 88", produto="Açaí"))
+        self.busca = DeliverySearch(self.store)
+
+    def test_tokenize(self):
+        """Minúsculas, sem acentos e sem pontuação"""
+        self.assertEqual(tokenize("Rua da Consolação, 88"), ["rua", "da", "consolacao", "88"])
+        self.assertEqual(tokenize("JOÃO"), ["joao"])
+
+    def test_accent_insensitive(self):
+        """Consulta com ou sem acento encontra o mesmo registro"""
+        self.assertEqual(ids(self.busca.search("joao")), [101])
+        self.assertEqual(ids(self.busca.search("João")), [101])
+        self.assertEqual(ids(self.busca.search("consolacao")), [105, 201])
+        self.assertEqual(ids(self.busca.search("acai")), [201])
+
+    def test_prefix_and_all_terms(self):
+        """Cada termo casa por prefixo e todos precisam casar"""
+        self.assertEqual(ids(self.busca.search("conso")), [105, 201])
+        self.assertEqual(ids(self.busca.search("concei")), [201])
+        self.assertEqual(ids(self.busca.search("pizza consolacao")), [105])
+        self.assertEqual(ids(self.busca.search("pizza paulista")), [102])
+        self.assertEqual(ids(self.busca.search("xyz")), [])
+
+    def test_limit_and_total(self):
+        """Total de encontradas e até `limit` entregas, por ordem de ID"""
+        total, entregas = self.busca.search("pizza", limit=2)
+        self.assertEqual(total, len([e for e in ENTREGAS_MOCK if "Pizza" in e["produto"]]))
+        self.assertEqual([e.id for e in entregas], [101, 102])
+
+    def test_incremental_updates(self):
+        """Entregas novas e substituição do armazenamento aparecem na busca"""
+        self.assertEqual(ids(self.busca.search("zeferino")), [])
+        self.store.add(dict(ENTREGAS_MOCK[0], id=202, cliente="Zeferino Souza"))
+        self.assertEqual(ids(self.busca.search("zeferino")), [202])
+
+        self.store.update_status(202, "entregue")
+        self.assertEqual(self.busca.search("zeferino")[1][0].status, "entregue")
+
+        self.store.replace_all(ENTREGAS_MOCK)
+        self.assertEqual(ids(self.busca.search("zeferino")), [])
+        self.assertEqual(ids(self.busca.search("joao")), [101])
+
+
+class TestSearchEndpoint(unittest.TestCase):
+    """Testes para GET /api/entregas/busca"""
+
+    def setUp(self):
+        self.client = make_app().test_client()
+
+    def test_search(self):
+        """Resposta com a consulta, o total e as entregas"""
+        response = self.client.get('/api/entregas/busca?q=maria')
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()["data"]
+        self.assertEqual(data["encontradas"], 1)
+        self.assertEqual(data["entregas"][0]["cliente"], "Maria Santos")
+
+    def test_invalid_parameters(self):
+        """Consulta vazia ou limite fora da faixa retornam 400"""
+        self.assertEqual(self.client.get('/api/entregas/busca').status_code, 400)
+        self.assertEqual(self.client.get('/api/entregas/busca?q=pizza&limite=0').status_code, 400)
+        self.assertEqual(self.client.get('/api/entregas/busca?q=pizza&limite=abc').status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+"""
+Testes de SLA - Sistema Zeca Delivery
+=====================================
+
+Testes para os percentis em streaming (P²), para o acompanhamento dos
+tempos de entrega e para o endpoint GET /api/stats/sla.
+
+Para executar:
+    python -m pytest tests/
+"""
+
+import unittest
+import tempfile
+import random
+from datetime import datetime, timedelta
+import sys
+import os
+
+# Adicionar diretórios ao path para importar módulos
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from helpers import default_store, make_app
+from zeca.data.events import EventLog
+from zeca.data.sample_data import ENTREGAS_MOCK
+from zeca.data.schema import Delivery
+from zeca.data.sla import P2Quantile, SlaTracker
+from zeca.data.store import DeliveryStore
+
+
+class TestP2Quantile(unittest.TestCase):
+    """Testes para o estimador de quantis"""
+
+    def test_close_to_exact_percentiles(self):
+        """Estimativas próximas dos percentis exatos"""
+        rng = random.Random(42)
+        samples = [rng.expovariate(1 / 900) for _ in range(20000)]
+        ordered = sorted(samples)
+        for p in (0.5, 0.9, 0.99):
+            quantile = P2Quantile(p)
+            for x in samples:
+                quantile.add(x)
+            exact = ordered[int(p * len(ordered))]
+            self.assertAlmostEqual(quantile.value(), exact, delta=exact * 0.03)
+
+    def test_few_samples(self):
+        """Com menos de cinco amostras o valor é exato; sem amostras, None"""
+        quantile = P2Quantile(0.5)
+        self.assertIsNone(quantile.value())
+        for x in (30, 10, 20):
+            quantile.add(x)
+        self.assertEqual(quantile.value(), 20)
+
+
+class TestSlaTracker(unittest.TestCase):
+    """Testes para os tempos por entrega, bairro e prioridade"""
+
+    def setUp(self):
+        self.tracker = SlaTracker()
+        self.base = datetime(2025, 8, 4, 18, 0)
+        self.entrega = Delivery.from_dict(ENTREGAS_MOCK[0])  # prevista 19:30
+
+    def lifecycle(self, entrega, pickup_min, delivered_min):
+        self.tracker.observe("criada", entrega, self.base)
+        self.tracker.observe("status", entrega, self.base + timedelta(minutes=pickup_min), "em_transito")
+        self.tracker.observe("status", entrega, self.base + timedelta(minutes=delivered_min), "entregue")
+
+    def test_durations_and_delay(self):
+        """Coleta, trânsito, lead time e atraso de uma entrega"""
+        self.lifecycle(self.entrega, 20, 100)
+        geral = self.tracker.result()["geral"]
+        self.assertEqual(geral["coleta_s"]["p50"], 1200.0)
+        self.assertEqual(geral["transito_s"]["p50"], 4800.0)
+        self.assertEqual(geral["lead_time_s"]["p50"], 6000.0)
+        self.assertEqual(geral["atraso_s"]["p50"], 600.0)
+        self.assertEqual((geral["entregues"], geral["atrasadas"]), (1, 1))
+        self.assertEqual(self.tracker.result()["em_aberto"], 0)
+
+    def test_groups(self):
+        """Métricas separadas por bairro e prioridade"""
+        outra = Delivery.from_dict(ENTREGAS_MOCK[1])
+        self.lifecycle(self.entrega, 10, 60)
+        self.lifecycle(outra, 10, 60)
+        result = self.tracker.result()
+        self.assertEqual(result["geral"]["entregues"], 2)
+        self.assertEqual(set(result["por_bairro"]), {self.entrega.bairro, outra.bairro})
+        self.assertEqual(result["por_bairro"][self.entrega.bairro]["taxa_pontualidade"], 100.0)
+
+    def test_unknown_start_and_cancellation(self):
+        """Sem a criação só o atraso é medido; canceladas não contam como entregues"""
+        self.tracker.observe("status", self.entrega, self.base, "entregue")
+        geral = self.tracker.result()["geral"]
+        self.assertEqual(geral["atraso_s"]["amostras"], 1)
+        self.assertEqual(geral["lead_time_s"]["amostras"], 0)
+
+        outra = Delivery.from_dict(ENTREGAS_MOCK[1])
+        self.tracker.observe("criada", outra, self.base)
+        self.assertEqual(self.tracker.result()["em_aberto"], 1)
+        self.tracker.observe("status", outra, self.base, "cancelado")
+        self.assertEqual(self.tracker.result()["em_aberto"], 0)
+        self.assertEqual(self.tracker.result()["geral"]["entregues"], 1)
+
+    def test_store_listener_and_log(self):
+        """Escritas no armazenamento alimentam o acompanhamento; o log o reconstrói"""
+        with tempfile.TemporaryDirectory() as tmp:
+            store = DeliveryStore(events=EventLog(os.path.join(tmp, "eventos.jsonl"), sync=False))
+            store.add_listener(self.tracker.observe)
+            store.add_many(ENTREGAS_MOCK)
+            store.update_status(101, "em_transito")
+            store.update_status(101, "entregue")
+            self.assertEqual(self.tracker.result()["geral"]["lead_time_s"]["amostras"], 1)
+
+            rebuilt = SlaTracker()
+            self.assertEqual(rebuilt.load(store.events.events(), store.get), 7)
+            self.assertEqual(rebuilt.result()["geral"]["entregues"], 1)
+            self.assertEqual(rebuilt.result()["em_aberto"], self.tracker.result()["em_aberto"])
+            store.events.close()
+
+
+class TestSlaEndpoint(unittest.TestCase):
+    """Testes para GET /api/stats/sla"""
+
+    def setUp(self):
+        app = make_app()
+        self.store = default_store(app)
+        self.client = app.test_client()
+
+    def test_status_change_updates_sla(self):
+        """Uma entrega concluída pela API aparece nas métricas"""
+        before = self.client.get('/api/stats/sla').get_json()["data"]["geral"]["entregues"]
+        self.store.add(dict(ENTREGAS_MOCK[0], id=9101))
+        self.client.post('/api/entregas/9101/status', json={"status": "em_transito"})
+        self.client.post('/api/entregas/9101/status', json={"status": "entregue"})
+
+        data = self.client.get('/api/stats/sla').get_json()["data"]
+        self.assertEqual(data["geral"]["entregues"], before + 1)
+        self.assertIn("p99", data["geral"]["lead_time_s"])
+        self.assertIn(ENTREGAS_MOCK[0]["prioridade"], data["por_prioridade"])
+
+
+if __name__ == '__main__':
+    unittest.main()
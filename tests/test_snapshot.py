@@ -0,0 +1,236 @@
+"""
+Testes de Snapshot - Sistema Zeca Delivery
+==========================================
+
+Testes para o snapshot binário das entregas (gravação, leitura via mmap)
+e para o armazenamento da API aberto a partir dele.
+
+Para executar:
+    python -m pytest tests/
+"""
+
+import unittest
+import tempfile
+import sys
+import os
+
+# Adicionar diretórios ao path para importar módulos
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from flask import Flask
+
+from helpers import default_store, make_app
+from zeca.data.sample_data import ENTREGAS_MOCK
+from zeca.data.schema import Delivery
+from zeca.data.snapshot import Snapshot, SnapshotColumns, write_snapshot
+from zeca.data.search import DeliverySearch
+from zeca.data.store import DeliveryStore
+from zeca.api.persistence import SnapshotWriter, init_persistence, load_store, shutdown
+
+
+def sample_records():
+    """Entregas de exemplo como registros, incluindo uma importada com data com fuso"""
+    extra = dict(ENTREGAS_MOCK[0], id=999, entrega_prevista="2025-08-04T19:30:00-03:00")
+    return [Delivery.from_dict(e) for e in ENTREGAS_MOCK + [extra]]
+
+
+class TestSnapshotFormat(unittest.TestCase):
+    """Testes para gravação e leitura do snapshot"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "entregas.snap")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        """Os registros lidos são iguais aos gravados"""
+        records = sample_records()
+        info = write_snapshot(self.path, records)
+        self.assertEqual(info["linhas"], len(records))
+        self.assertEqual(info["tamanho_bytes"], os.path.getsize(self.path))
+
+        snapshot = Snapshot(self.path)
+        try:
+            self.assertEqual(snapshot.meta, {})
+            self.assertEqual(len(snapshot), len(records))
+            self.assertEqual(snapshot.records(), records)
+            self.assertIsNone(snapshot.records()[-1].prevista.tzinfo)
+        finally:
+            snapshot.close()
+
+    def test_columns_and_dictionaries(self):
+        """Colunas são memoryviews sobre o arquivo; textos repetidos ficam no dicionário uma vez"""
+        write_snapshot(self.path, sample_records())
+        snapshot = Snapshot(self.path)
+        try:
+            ids = snapshot.column("id")
+            self.assertIsInstance(ids, memoryview)
+            self.assertEqual(list(ids), [e["id"] for e in ENTREGAS_MOCK] + [999])
+            bairros = {e["bairro"] for e in ENTREGAS_MOCK}
+            self.assertEqual(len(snapshot.strings("bairro")), len(bairros))
+            self.assertEqual(snapshot.indices_where("status", 0), [0, 2, 4, 5])
+        finally:
+            snapshot.close()
+
+    def test_selected_records(self):
+        """Registros montados apenas para as posições pedidas"""
+        write_snapshot(self.path, sample_records())
+        snapshot = Snapshot(self.path)
+        try:
+            self.assertEqual([r.id for r in snapshot.records([1, 3])], [102, 104])
+        finally:
+            snapshot.close()
+
+    def test_columns_copied_from_snapshot(self):
+        """Linhas copiadas de um snapshot aberto, depois de outras, sem montar os registros"""
+        records = sample_records()
+        write_snapshot(self.path, records[2:])
+        snapshot = Snapshot(self.path)
+        try:
+            columns = SnapshotColumns()
+            columns.extend(records[:2])
+            columns.extend_from(snapshot)
+            other = os.path.join(self.tmp.name, "copia.snap")
+            self.assertEqual(columns.write(other)["linhas"], len(records))
+        finally:
+            snapshot.close()
+
+        copy = Snapshot(other)
+        try:
+            self.assertEqual(copy.records(), records)
+        finally:
+            copy.close()
+
+    def test_empty_snapshot(self):
+        """Snapshot sem entregas"""
+        write_snapshot(self.path, [])
+        snapshot = Snapshot(self.path)
+        try:
+            self.assertEqual(len(snapshot), 0)
+            self.assertEqual(snapshot.records(), [])
+        finally:
+            snapshot.close()
+
+    def test_invalid_file(self):
+        """Arquivo que não é snapshot gera ValueError"""
+        with open(self.path, "wb") as f:
+            f.write(b"id,cliente\n" * 10)
+        with self.assertRaises(ValueError):
+            Snapshot(self.path)
+
+
+class TestSnapshotStore(unittest.TestCase):
+    """Testes para o armazenamento aberto a partir de um snapshot"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "entregas.snap")
+        write_snapshot(self.path, sample_records())
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_reads_columns_before_materializing(self):
+        """Contagem, IDs e filtro por status sem montar todos os registros"""
+        store = DeliveryStore.from_snapshot(self.path)
+        self.assertEqual(len(store), 6)
+        self.assertIn(999, store.ids())
+        self.assertEqual([e.id for e in store.by_status("entregue")], [104])
+        self.assertIsNotNone(store._snapshot)
+
+        self.assertEqual(store.all(), sample_records())
+        self.assertIsNotNone(store._snapshot)
+
+    def test_indexes_without_materializing(self):
+        """Índices de busca e por ID montados sobre as colunas; a API inicia sem montar os registros"""
+        store = DeliveryStore.from_snapshot(self.path)
+        busca = DeliverySearch(store)
+        busca.warm()
+        self.assertIsNotNone(store._snapshot)
+        self.assertEqual([e.id for e in busca.search("joao")[1]], [101, 999])
+        found, missing = store.get_many([104, 1, 999])
+        self.assertEqual(([e.id for e in found], missing), ([104, 999], [1]))
+
+        store.add(dict(ENTREGAS_MOCK[0], id=1000, cliente="Zeferino"))
+        self.assertEqual(busca.search("zeferino")[0], 1)
+        self.assertIsNotNone(store._snapshot)
+
+        # Mudança de status monta os registros; as posições continuam as mesmas
+        store.update_status(104, "cancelado")
+        self.assertIsNone(store._snapshot)
+        self.assertEqual([store.get(i).status for i in (104, 1000)], ["cancelado", "pendente"])
+
+        app = make_app(SNAPSHOT_PATH=self.path, SNAPSHOT_INTERVALO_S=3600)
+        shard = app.extensions["zeca_tenants"].default
+        shard.warm()
+        self.assertEqual(app.test_client().get('/api/entregas').get_json()["total"], 6)
+        self.assertIsNotNone(shard.store._snapshot)
+        shutdown(app)
+
+    def test_writes_after_snapshot(self):
+        """Entregas incluídas depois da abertura somam-se às do snapshot"""
+        store = DeliveryStore.from_snapshot(self.path)
+        store.add(dict(ENTREGAS_MOCK[0], id=1000))
+        self.assertEqual(len(store), 7)
+        self.assertEqual([e.id for e in store.by_status("pendente")], [101, 103, 105, 999, 1000])
+
+        other = os.path.join(self.tmp.name, "novo.snap")
+        store.save_snapshot(other)
+        self.assertIsNotNone(store._snapshot)
+        self.assertEqual(DeliveryStore.from_snapshot(other).all(), store.all())
+
+        # Sobre o próprio arquivo aberto: o mapeamento atual continua válido
+        store.add(dict(ENTREGAS_MOCK[1], id=1001, bairro="Bairro Novo"))
+        self.assertEqual(store.save_snapshot(self.path)["linhas"], 8)
+        self.assertEqual(DeliveryStore.from_snapshot(self.path).all(), store.all())
+
+    def test_load_store_fallback(self):
+        """Snapshot inexistente ou inválido: entregas padrão"""
+        self.assertEqual(len(load_store(os.path.join(self.tmp.name, "nada.snap"), ENTREGAS_MOCK)), 5)
+        invalid = os.path.join(self.tmp.name, "invalido.snap")
+        with open(invalid, "wb") as f:
+            f.write(b"x" * 64)
+        self.assertEqual(len(load_store(invalid, ENTREGAS_MOCK)), 5)
+
+    def test_writer_saves_only_after_changes(self):
+        """O gravador só grava quando houve escrita desde o último snapshot"""
+        store = DeliveryStore(ENTREGAS_MOCK)
+        path = os.path.join(self.tmp.name, "api", "entregas.snap")
+        writer = SnapshotWriter(store, path, interval=3600)
+        self.assertIsNone(writer.save_if_changed())
+
+        store.add(dict(ENTREGAS_MOCK[0], id=1000))
+        self.assertEqual(writer.save_if_changed()["linhas"], 6)
+        self.assertIsNone(writer.save_if_changed())
+        self.assertEqual(len(Snapshot(path)), 6)
+
+    def test_init_persistence(self):
+        """A API abre o armazenamento a partir do snapshot configurado"""
+        app = Flask(__name__)
+        app.config["SNAPSHOT_PATH"] = self.path
+        app.config["SNAPSHOT_INTERVALO_S"] = 3600
+        app.config["EVENT_LOG_PATH"] = None
+        store = init_persistence(app, ENTREGAS_MOCK)
+        self.assertEqual(len(store), 6)
+        self.assertIsInstance(app.extensions["snapshots"], SnapshotWriter)
+        shutdown(app)
+
+    def test_shutdown(self):
+        """Encerramento único por app: snapshot final, log fechado sem compactar depois"""
+        log_path = os.path.join(self.tmp.name, "eventos.jsonl")
+        app = make_app(SNAPSHOT_PATH=self.path, SNAPSHOT_INTERVALO_S=3600, EVENT_LOG_PATH=log_path)
+        default_store(app).add(dict(ENTREGAS_MOCK[0], id=1000))
+        writer, events = app.extensions["snapshots"], app.extensions["eventos"]
+
+        shutdown(app)
+        shutdown(app)
+        self.assertTrue(events.closed)
+        self.assertFalse(writer._thread.is_alive())
+        self.assertEqual(writer.last_info["linhas"], 7)
+        self.assertIsNone(writer.save_if_changed())
+
+
+if __name__ == '__main__':
+    unittest.main()
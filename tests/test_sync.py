@@ -0,0 +1,100 @@
+"""
+Testes de Sincronização Incremental - Sistema Zeca Delivery
+===========================================================
+
+Testes para o diário de mudanças do armazenamento e para o endpoint
+GET /api/entregas/changes?since=<token>.
+
+Para executar:
+    python -m pytest tests/
+"""
+
+import unittest
+import sys
+import os
+
+# Adicionar diretórios ao path para importar módulos
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from helpers import default_store, make_app
+from zeca.data.sample_data import ENTREGAS_MOCK
+from zeca.data.store import DeliveryStore
+
+
+class TestChangeJournal(unittest.TestCase):
+    """Testes para o diário de mudanças"""
+
+    def setUp(self):
+        self.store = DeliveryStore(ENTREGAS_MOCK, journal_size=5)
+        self.token = self.store.sync_token()
+
+    def test_no_changes(self):
+        """Sem mudanças: listas vazias e o mesmo token"""
+        token, criadas, alteradas = self.store.changes_since(self.token)
+        self.assertEqual((token, criadas, alteradas), (self.token, [], []))
+
+    def test_created_and_changed(self):
+        """Criadas e alteradas depois do token, com o estado atual"""
+        self.store.add(dict(ENTREGAS_MOCK[0], id=201))
+        self.store.update_status(201, "em_transito")
+        self.store.update_status(102, "entregue")
+        self.store.update_status(102, "cancelado")
+
+        token, criadas, alteradas = self.store.changes_since(self.token)
+        self.assertEqual([(e.id, e.status) for e in criadas], [(201, "em_transito")])
+        self.assertEqual([(e.id, e.status) for e in alteradas], [(102, "cancelado")])
+
+        self.assertEqual(self.store.changes_since(token)[1:], ([], []))
+
+    def test_resync_when_token_is_too_old(self):
+        """Mais mudanças que o diário guarda: ressincronização"""
+        for i in range(6):
+            self.store.add(dict(ENTREGAS_MOCK[0], id=300 + i))
+        token, criadas, alteradas = self.store.changes_since(self.token)
+        self.assertIsNone(criadas)
+        self.assertEqual(token, self.store.sync_token())
+
+    def test_resync_after_replace_or_other_instance(self):
+        """Token de antes de replace_all ou de outra instância: ressincronização"""
+        self.assertIsNone(DeliveryStore(ENTREGAS_MOCK).changes_since(self.token)[1])
+        self.store.replace_all(ENTREGAS_MOCK)
+        self.assertIsNone(self.store.changes_since(self.token)[1])
+
+    def test_invalid_token(self):
+        """Token malformado gera ValueError"""
+        with self.assertRaises(ValueError):
+            self.store.changes_since("abc")
+
+
+class TestChangesEndpoint(unittest.TestCase):
+    """Testes para GET /api/entregas/changes"""
+
+    def setUp(self):
+        app = make_app()
+        self.store = default_store(app)
+        self.client = app.test_client()
+
+    def test_delta_after_full_list(self):
+        """Token da lista completa; o delta traz só o que mudou"""
+        token = self.client.get('/api/entregas').headers['X-Sync-Token']
+        self.store.add(dict(ENTREGAS_MOCK[0], id=9201))
+        self.client.post('/api/entregas/101/status', json={"status": "cancelado"})
+
+        data = self.client.get(f'/api/entregas/changes?since={token}').get_json()["data"]
+        self.assertFalse(data["resync"])
+        self.assertEqual([e["id"] for e in data["criadas"]], [9201])
+        self.assertEqual([e["id"] for e in data["canceladas"]], [101])
+        self.assertEqual(data["atualizadas"], [])
+        self.assertEqual(data["token"], self.store.sync_token())
+
+    def test_resync_signal(self):
+        """Sem token ou com token desconhecido: resync com o token atual"""
+        for url in ('/api/entregas/changes', '/api/entregas/changes?since=outra.1'):
+            data = self.client.get(url).get_json()["data"]
+            self.assertTrue(data["resync"])
+            self.assertEqual(data["token"], self.store.sync_token())
+        self.assertEqual(self.client.get('/api/entregas/changes?since=x.y').status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+"""
+Testes de Tenants - Sistema Zeca Delivery
+=========================================
+
+Testes para as partições por tenant (franquia/cidade): carga sob demanda,
+isolamento entre tenants, descarga com snapshot e roteamento pelo
+cabeçalho X-Tenant ou pelo prefixo /t/<tenant>.
+
+Para executar:
+    python -m pytest tests/
+"""
+
+import unittest
+import tempfile
+import shutil
+import sys
+import os
+
+# Adicionar diretórios ao path para importar módulos
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from helpers import make_app
+from zeca.api.tenants import Shard, TenantRegistry, tenant_slug
+from zeca.data.sample_data import ENTREGAS_MOCK
+from zeca.data.store import DeliveryStore
+
+RIO = dict(ENTREGAS_MOCK[0], id=501, cliente="Carla Rocha", cidade="Rio de Janeiro",
+           estado="RJ", telefone="(21) 99999-0000", cep="20040-002")
+
+
+class TestTenantRegistry(unittest.TestCase):
+    """Testes para o registro de partições"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.default = Shard("padrao", DeliveryStore(ENTREGAS_MOCK))
+        self.registry = TenantRegistry(self.default, ["sao-paulo", "rio-de-janeiro"],
+                                       self.directory, seed=ENTREGAS_MOCK + [RIO])
+
+    def tearDown(self):
+        self.registry.close()
+        shutil.rmtree(self.directory)
+
+    def test_slug(self):
+        """Nome do tenant a partir da cidade"""
+        self.assertEqual(tenant_slug("São Paulo"), "sao-paulo")
+        self.assertEqual(tenant_slug(" Rio de Janeiro "), "rio-de-janeiro")
+
+    def test_lazy_load_seeded_by_city(self):
+        """Carga na primeira consulta, com as entregas de exemplo da cidade"""
+        self.assertFalse(self.registry.is_loaded("rio-de-janeiro"))
+        rio = self.registry.get("rio-de-janeiro")
+        self.assertTrue(self.registry.is_loaded("rio-de-janeiro"))
+        self.assertEqual([e.id for e in rio.store.all()], [501])
+        self.assertEqual(len(self.registry.get("sao-paulo").store), len(ENTREGAS_MOCK))
+        self.assertIs(self.registry.get(None), self.default)
+
+        with self.assertRaises(KeyError):
+            self.registry.get("curitiba")
+
+    def test_shards_are_isolated(self):
+        """Escritas de um tenant não aparecem nos índices de outro"""
+        rio = self.registry.get("rio-de-janeiro")
+        sp = self.registry.get("sao-paulo")
+        rio.store.add(dict(RIO, id=502))
+        rio.store.update_status(501, "entregue")
+
+        self.assertEqual([e.id for e in rio.consulta.by_cep_prefix("2")], [501, 502])
+        self.assertEqual(sp.consulta.by_cep_prefix("2"), [])
+        self.assertEqual(sp.busca.search("carla")[0], 0)
+        self.assertEqual(rio.sla.result()["geral"]["entregues"], 1)
+        self.assertIsNone(self.default.store.get(502))
+
+    def test_unload_and_reload(self):
+        """Descarga grava o snapshot; a nova carga volta ao mesmo estado"""
+        rio = self.registry.get("rio-de-janeiro")
+        rio.store.add(dict(RIO, id=502))
+        rio.store.update_status(501, "em_transito")
+
+        self.assertTrue(self.registry.unload("rio-de-janeiro"))
+        self.assertFalse(self.registry.is_loaded("rio-de-janeiro"))
+        self.assertFalse(self.registry.unload("rio-de-janeiro"))
+        self.assertTrue(os.path.exists(os.path.join(self.directory, "rio-de-janeiro", "entregas.snap")))
+
+        rio = self.registry.get("rio-de-janeiro")
+        self.assertEqual([(e.id, e.status) for e in rio.store.all()],
+                         [(501, "em_transito"), (502, RIO["status"])])
+
+    def test_unload_refused(self):
+        """A partição padrão e tenants sem diretório não são descarregados"""
+        with self.assertRaises(ValueError):
+            self.registry.unload("padrao")
+        memoria = TenantRegistry(self.default, ["rio-de-janeiro"])
+        memoria.get("rio-de-janeiro")
+        with self.assertRaises(ValueError):
+            memoria.unload("rio-de-janeiro")
+        with self.assertRaises(ValueError):
+            TenantRegistry(self.default, ["Rio de Janeiro"])
+
+
+class TestTenantRouting(unittest.TestCase):
+    """Testes para o roteamento por cabeçalho e prefixo de URL"""
+
+    def setUp(self):
+        app = make_app(PROFILE_TOKEN="segredo")
+        self.directory = tempfile.mkdtemp()
+        self.registry = TenantRegistry(app.extensions["zeca_tenants"].default, ["rio-de-janeiro"],
+                                       self.directory, seed=[RIO])
+        app.extensions["zeca_tenants"] = self.registry
+        self.client = app.test_client()
+
+    def tearDown(self):
+        self.registry.close()
+        shutil.rmtree(self.directory)
+
+    def test_header_and_prefix(self):
+        """Cabeçalho X-Tenant e prefixo /t/<tenant> chegam à mesma partição"""
+        data = self.client.get('/api/entregas', headers={"X-Tenant": "rio-de-janeiro"}).get_json()
+        self.assertEqual([e["id"] for e in data["data"]], [501])
+        data = self.client.get('/t/rio-de-janeiro/api/entregas/501').get_json()
+        self.assertEqual(data["data"]["cliente"], "Carla Rocha")
+
+        # Sem tenant: a partição padrão de sempre
+        self.assertEqual(self.client.get('/api/entregas/501').status_code, 404)
+        self.assertEqual(self.client.get('/api/entregas/101').status_code, 200)
+
+    def test_seed_split_between_shards(self):
+        """Entregas de exemplo de uma cidade declarada ficam só na partição do tenant"""
+        app = make_app(ENTREGAS_MOCK + [RIO], TENANTS="rio-de-janeiro")
+        client = app.test_client()
+        try:
+            padrao = client.get('/api/entregas').get_json()["data"]
+            rio = client.get('/t/rio-de-janeiro/api/entregas').get_json()["data"]
+            self.assertEqual([e["id"] for e in rio], [501])
+            self.assertNotIn(501, [e["id"] for e in padrao])
+            self.assertEqual(len(padrao) + len(rio), len(ENTREGAS_MOCK) + 1)
+        finally:
+            app.extensions["zeca_tenants"].close()
+
+    def test_unknown_or_conflicting_tenant(self):
+        """Tenant não declarado retorna 404; prefixo e cabeçalho diferentes, 400"""
+        self.assertEqual(self.client.get('/t/curitiba/api/entregas').status_code, 404)
+        response = self.client.get('/t/rio-de-janeiro/api/entregas', headers={"X-Tenant": "padrao"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_admin_endpoints(self):
+        """Lista de tenants; carga e descarga só com X-Admin-Token"""
+        data = self.client.get('/api/tenants').get_json()["data"]
+        self.assertEqual([(t["tenant"], t["carregado"]) for t in data],
+                         [("padrao", True), ("rio-de-janeiro", False)])
+
+        self.assertEqual(self.client.post('/api/tenants/rio-de-janeiro/load').status_code, 403)
+        admin = {"X-Admin-Token": "segredo"}
+        response = self.client.post('/api/tenants/rio-de-janeiro/load', headers=admin)
+        self.assertEqual(response.get_json()["data"]["total_entregas"], 1)
+
+        response = self.client.post('/api/tenants/rio-de-janeiro/unload', headers=admin)
+        self.assertTrue(response.get_json()["data"]["descarregado"])
+        self.assertEqual(self.client.post('/api/tenants/padrao/unload', headers=admin).status_code, 409)
+        self.assertEqual(self.client.post('/api/tenants/curitiba/load', headers=admin).status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,20 @@
+"""
+Sistema Zeca Delivery
+=====================
+
+Pacote com a API de entregas, o gerador de relatórios Excel, o
+agendador, os lotes/rotas de entregadores e os dados de exemplo.
+
+Comandos instalados:
+- zeca-api     API Flask de entregas
+- zeca-report  Relatórios Excel (e subcomandos schedule/history)
+- zeca-data    Dados de exemplo e estatísticas
+- zeca-loadtest  Teste de carga da API (vazão e latência por estágio)
+
+Este módulo não importa dependências pesadas (Flask, openpyxl, requests):
+cada comando carrega apenas o que usa.
+
+Autor: Demonstração do artigo Zeca Delivery
+"""
+
+__version__ = "1.0.0"
@@ -0,0 +1,7 @@
+"""Permite `python -m zeca <api|report|data|loadtest> ...`"""
+
+import sys
+
+from zeca.cli import main
+
+sys.exit(main())
@@ -0,0 +1 @@
+"""API Flask de entregas e extensões (métricas, health check, profiling e logs)"""
@@ -0,0 +1,450 @@
+"""
+API Flask para Sistema de Entregas Zeca
+======================================
+
+API REST que fornece endpoints para gerenciar entregas de delivery.
+Desenvolvida como demonstração prática do artigo sobre automação de entregas.
+
+Endpoints disponíveis:
+- GET /api/entregas - Lista todas as entregas (?telefone= / ?cep_prefixo= filtram)
+- GET /api/entregas/pendentes - Lista entregas pendentes
+- GET /api/entregas/status/<status> - Filtra por status
+- GET /api/entregas/busca?q= - Busca por cliente, endereço ou produto
+- GET /api/entregas/changes?since=<token> - Entregas alteradas desde o token
+- GET /api/entregas/<id> - Uma entrega pelo ID
+- POST /api/entregas/lookup - Várias entregas pelos IDs em uma requisição
+- POST /api/entregas/import - Importa entregas de arquivo CSV ou JSONL
+- POST /api/entregas/<id>/status - Altera o status de uma entrega
+- GET /api/entregas/<id>/historico - Eventos e tempo em cada status
+- GET /api/health - Health check da API
+- GET /api/health/live - Liveness (processo respondendo)
+- GET /api/health/ready - Readiness (backend, latência e memória)
+- GET /api/stats - Estatísticas das entregas
+- GET /api/stats/sla - Tempos de entrega e percentis por bairro e prioridade
+- GET /api/rotas/lotes - Lotes de entregas pendentes por região e horário
+- GET /api/metrics - Métricas das requisições (formato Prometheus)
+- GET /api/tenants - Tenants (franquias/cidades) e partições carregadas
+
+Tenants: cabeçalho X-Tenant ou prefixo /t/<tenant>/api/... (ver zeca/api/tenants.py)
+
+Perfil por requisição (administradores): ?profile=1 + cabeçalho X-Admin-Token
+
+`create_app(config)` monta uma app nova (config aplicada antes das
+extensões, que leem app.config). Importar este módulo não cria app nem
+abre arquivos: a app é criada pelo comando zeca-api (`main`) ou pelo
+módulo WSGI (delivery_api.py na raiz, `gunicorn delivery_api:app`).
+Testes usam `create_app(...).test_client()`, sem servidor. `shutdown(app)`
+(zeca/api/persistence.py) grava o snapshot final e fecha os logs da app;
+sem ela, isso acontece no fim do processo.
+
+Autor: Demonstração do artigo Zeca Delivery
+"""
+
+from flask import Blueprint, Flask, current_app, jsonify, request
+from flask.json.provider import DefaultJSONProvider
+from datetime import datetime
+import threading
+import argparse
+import os
+
+from zeca import __version__
+from zeca.data.sample_data import ENTREGAS_MOCK, compute_stats
+from zeca.routing.batching import (
+    build_batches, MAX_TAMANHO_PADRAO, JANELA_MINUTOS_PADRAO, PREFIXO_CEP_PADRAO
+)
+from zeca.routing.optimizer import optimize_route, ORCAMENTO_MS_PADRAO, ORCAMENTO_MS_MAXIMO
+from zeca.api.metrics import init_metrics
+from zeca.api.health import init_health, format_uptime
+from zeca.api.profiling import init_profiling
+from zeca.api.request_logging import init_request_logging
+from zeca.api.rate_limit import init_rate_limit
+from zeca.api.responses import format_response
+from zeca.common.structured_logging import configure_logging, get_logger
+from zeca.api.persistence import init_persistence
+from zeca.api.sla import init_sla
+from zeca.api.tenants import (
+    Shard, TENANT_PADRAO, current_shard, default_seed, init_tenants, tenant_names
+)
+from zeca.data.schema import STATUS_VALIDOS, Delivery
+from zeca.data.events import time_in_status
+from zeca.data.search import LIMITE_PADRAO
+from zeca.data.importer import (
+    import_stream, detect_format, text_stream, LOTE_PADRAO, MAX_ERROS_PADRAO
+)
+
+logger = get_logger("api")
+
+# Máximo de IDs por requisição em POST /api/entregas/lookup
+MAX_IDS_LOOKUP = 1000
+
+class DeliveryJSONProvider(DefaultJSONProvider):
+    """JSON da API: registros Delivery saem no formato de dicionário"""
+    
+    @staticmethod
+    def default(o):
+        if isinstance(o, Delivery):
+            return o.to_dict()
+        return DefaultJSONProvider.default(o)
+
+api = Blueprint("api", __name__)
+
+def create_app(config=None, entregas=ENTREGAS_MOCK):
+    """Cria a app da API com as entregas iniciais informadas"""
+    app = Flask(__name__)
+    app.json = DeliveryJSONProvider(app)
+    app.config.update(config or {})
+    app.config.setdefault("ORCAMENTO_MS_MAX",
+                          int(os.environ.get("ZECA_ORCAMENTO_MS_MAX", ORCAMENTO_MS_MAXIMO)))
+    init_request_logging(app)
+    # Entregas das cidades com tenant declarado ficam só na partição do tenant
+    store = init_persistence(app, default_seed(entregas, tenant_names(app)))
+    padrao = Shard(TENANT_PADRAO, store, sla=init_sla(app, store))
+    app.extensions["zeca_busca"] = padrao.busca
+    app.extensions["zeca_consulta"] = padrao.consulta
+    threading.Thread(target=padrao.warm, name="zeca-indices", daemon=True).start()
+    metrics = init_metrics(app)
+    init_health(app, store, metrics)
+    init_rate_limit(app)
+    # Depois do limite de requisições: tenants só são carregados para requisições admitidas
+    init_tenants(app, padrao, entregas)
+    init_profiling(app)
+    app.register_blueprint(api)
+    return app
+
+def int_arg(name, default):
+    """Lê parâmetro inteiro da query string, com erro claro se inválido"""
+    value = request.args.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Parâmetro '{name}' deve ser um número inteiro")
+
+@api.route('/')
+def home():
+    """Página inicial da API"""
+    return jsonify({
+        "service": "Zeca Delivery API",
+        "version": __version__,
+        "description": "API para automação de entregas",
+        "endpoints": {
+            "health": "/api/health",
+            "liveness": "/api/health/live",
+            "readiness": "/api/health/ready",
+            "entregas": "/api/entregas", 
+            "pendentes": "/api/entregas/pendentes",
+            "por_status": "/api/entregas/status/<status>",
+            "busca": "/api/entregas/busca?q=<termos>",
+            "mudancas": "/api/entregas/changes?since=<token>",
+            "por_id": "/api/entregas/<id>",
+            "lookup": "/api/entregas/lookup",
+            "importacao": "/api/entregas/import",
+            "alterar_status": "/api/entregas/<id>/status",
+            "historico": "/api/entregas/<id>/historico",
+            "estatisticas": "/api/stats",
+            "sla": "/api/stats/sla",
+            "lotes": "/api/rotas/lotes",
+            "metricas": "/api/metrics",
+            "tenants": "/api/tenants"
+        },
+        "article": "Sistema baseado no artigo: Como o Python Automatizou a Logística de Entregas"
+    })
+
+@api.route('/api/health')
+def health_check():
+    """Health check da API"""
+    store = current_app.extensions["zeca_tenants"].default.store
+    return jsonify({
+        "status": "healthy",
+        "service": "delivery-api",
+        "version": __version__,
+        "timestamp": datetime.now().isoformat(),
+        "uptime": format_uptime((datetime.now() - store.created_at).total_seconds()),
+        "database": "ok" if store.ping() else "indisponivel",
+        "total_entregas": len(store),
+        "ultima_escrita": store.last_write.isoformat()
+    })
+
+@api.route('/api/entregas', methods=['GET'])
+def get_entregas():
+    """Retorna todas as entregas, ou as do telefone e/ou prefixo de CEP informados"""
+    try:
+        shard = current_shard()
+        telefone = request.args.get('telefone')
+        cep_prefixo = request.args.get('cep_prefixo')
+        if telefone is None and cep_prefixo is None:
+            # Token lido antes da lista: o que mudar no meio volta no próximo delta
+            token = shard.store.sync_token()
+            response = format_response(shard.store.all())
+            response.headers['X-Sync-Token'] = token
+            return response
+        
+        ids = None
+        if telefone is not None:
+            ids = shard.consulta.phone_ids(telefone)
+        if cep_prefixo is not None:
+            por_cep = shard.consulta.cep_prefix_ids(cep_prefixo)
+            ids = por_cep if ids is None else ids & por_cep
+        abertas = request.args.get('abertas') in ('1', 'true')
+        limite = int_arg('limite', LIMITE_PADRAO)
+        offset = int_arg('offset', 0)
+        if not 1 <= limite <= 1000 or offset < 0:
+            return format_response([], status="error",
+                                 message="Parâmetro 'limite' deve estar entre 1 e 1000 "
+                                         "e 'offset' não pode ser negativo"), 400
+        
+        total, entregas = shard.consulta.select(ids, abertas=abertas, limit=limite, offset=offset)
+        response = format_response(entregas)
+        response.headers['X-Total-Count'] = str(total)
+        return response
+    except ValueError as e:
+        return format_response([], status="error", message=str(e)), 400
+    except Exception as e:
+        return format_response([], status="error", message=str(e)), 500
+
+@api.route('/api/entregas/pendentes', methods=['GET'])
+def get_entregas_pendentes():
+    """Retorna apenas entregas pendentes"""
+    try:
+        pendentes = current_shard().store.by_status('pendente')
+        return format_response(pendentes)
+    except Exception as e:
+        return format_response([], status="error", message=str(e)), 500
+
+@api.route('/api/entregas/status/<status>', methods=['GET'])
+def get_entregas_por_status(status):
+    """Retorna entregas filtradas por status"""
+    try:
+        if status not in STATUS_VALIDOS:
+            return format_response([], status="error", 
+                                 message=f"Status inválido. Use: {', '.join(STATUS_VALIDOS)}"), 400
+        
+        entregas_filtradas = current_shard().store.by_status(status)
+        return format_response(entregas_filtradas)
+    except Exception as e:
+        return format_response([], status="error", message=str(e)), 500
+
+@api.route('/api/entregas/busca', methods=['GET'])
+def buscar_entregas():
+    """Busca entregas por cliente, endereço ou produto (sem acentos, por prefixo)"""
+    try:
+        consulta = request.args.get('q', '').strip()
+        if not consulta:
+            return format_response({}, status="error", message="Informe o parâmetro 'q'"), 400
+        limite = int_arg('limite', LIMITE_PADRAO)
+        if not 1 <= limite <= 1000:
+            return format_response({}, status="error",
+                                 message="Parâmetro 'limite' deve estar entre 1 e 1000"), 400
+        
+        total, entregas = current_shard().busca.search(consulta, limit=limite)
+        return format_response({"consulta": consulta, "encontradas": total, "entregas": entregas})
+    except ValueError as e:
+        return format_response({}, status="error", message=str(e)), 400
+    except Exception as e:
+        return format_response({}, status="error", message=str(e)), 500
+
+@api.route('/api/entregas/changes', methods=['GET'])
+def get_mudancas():
+    """Entregas criadas, atualizadas ou canceladas desde o token de sincronização"""
+    try:
+        shard = current_shard()
+        since = request.args.get('since')
+        if since:
+            token, criadas, alteradas = shard.store.changes_since(since)
+        else:
+            token, criadas, alteradas = shard.store.sync_token(), None, None
+        
+        if criadas is None:
+            return format_response({"token": token, "resync": True},
+                                 message="Token ausente, expirado ou de outra instância: "
+                                         "baixe /api/entregas e use o novo token")
+        
+        canceladas = [e for e in alteradas if e.status == 'cancelado']
+        return format_response({
+            "token": token,
+            "resync": False,
+            "criadas": criadas,
+            "atualizadas": [e for e in alteradas if e.status != 'cancelado'],
+            "canceladas": canceladas
+        })
+    except ValueError as e:
+        return format_response({}, status="error", message=str(e)), 400
+    except Exception as e:
+        return format_response({}, status="error", message=str(e)), 500
+
+@api.route('/api/entregas/<int:entrega_id>', methods=['GET'])
+def get_entrega(entrega_id):
+    """Retorna uma entrega pelo ID"""
+    try:
+        entrega = current_shard().store.get(entrega_id)
+        if entrega is None:
+            return format_response({}, status="error", message=f"Entrega {entrega_id} não encontrada"), 404
+        return format_response(entrega)
+    except Exception as e:
+        return format_response({}, status="error", message=str(e)), 500
+
+@api.route('/api/entregas/lookup', methods=['POST'])
+def lookup_entregas():
+    """Retorna várias entregas pelos IDs (JSON: {"ids": [...]}) em uma única resposta"""
+    try:
+        payload = request.get_json(silent=True) or {}
+        ids = payload.get('ids') if isinstance(payload, dict) else None
+        if not isinstance(ids, list) or not all(type(i) is int for i in ids):
+            return format_response({}, status="error",
+                                 message='Envie {"ids": [...]} com uma lista de IDs inteiros'), 400
+        if len(ids) > MAX_IDS_LOOKUP:
+            return format_response({}, status="error",
+                                 message=f"Máximo de {MAX_IDS_LOOKUP} IDs por requisição"), 400
+        
+        encontradas, nao_encontrados = current_shard().store.get_many(dict.fromkeys(ids))
+        return format_response({
+            "entregas": encontradas,
+            "total": len(encontradas),
+            "nao_encontrados": nao_encontrados
+        })
+    except Exception as e:
+        return format_response({}, status="error", message=str(e)), 500
+
+@api.route('/api/entregas/import', methods=['POST'])
+def import_entregas():
+    """Importa entregas de CSV/JSONL enviado no corpo ou em multipart (campo 'arquivo')"""
+    try:
+        upload = request.files.get('arquivo')
+        formato = request.args.get('formato') or detect_format(
+            upload.filename if upload else None, request.mimetype)
+        stream = text_stream(upload.stream if upload else request.stream)
+        
+        result = import_stream(stream, current_shard().store, formato=formato,
+                               batch_size=int_arg('lote', LOTE_PADRAO),
+                               max_errors=int_arg('max_erros', MAX_ERROS_PADRAO))
+        logger.info("Importação concluída", extra={
+            key: value for key, value in result.to_dict().items() if key != 'erros'
+        })
+        
+        message = f"{result.rejeitadas} linha(s) rejeitada(s)" if result.rejeitadas else None
+        return format_response(result.to_dict(), message=message)
+    except ValueError as e:
+        return format_response({}, status="error", message=str(e)), 400
+    except Exception as e:
+        return format_response({}, status="error", message=str(e)), 500
+
+@api.route('/api/entregas/<int:entrega_id>/status', methods=['POST'])
+def update_entrega_status(entrega_id):
+    """Altera o status de uma entrega (JSON: {"status": "..."})"""
+    try:
+        payload = request.get_json(silent=True) or {}
+        status = payload.get('status')
+        if status not in STATUS_VALIDOS:
+            return format_response({}, status="error",
+                                 message=f"Status inválido. Use: {', '.join(STATUS_VALIDOS)}"), 400
+        
+        entrega = current_shard().store.update_status(entrega_id, status)
+        return format_response(entrega)
+    except KeyError:
+        return format_response({}, status="error", message=f"Entrega {entrega_id} não encontrada"), 404
+    except Exception as e:
+        return format_response({}, status="error", message=str(e)), 500
+
+@api.route('/api/entregas/<int:entrega_id>/historico', methods=['GET'])
+def get_historico_entrega(entrega_id):
+    """Eventos da entrega (índice por ID do log) e tempo passado em cada status"""
+    try:
+        shard = current_shard()
+        if shard.store.events is None:
+            return format_response({}, status="error",
+                                 message="Histórico de eventos desativado (configure ZECA_EVENT_LOG)"), 404
+        
+        entrega = shard.store.get(entrega_id)
+        if entrega is None:
+            return format_response({}, status="error", message=f"Entrega {entrega_id} não encontrada"), 404
+        
+        eventos = shard.store.events.history(entrega_id)
+        return format_response({
+            "id": entrega_id,
+            "status_atual": entrega.status,
+            "eventos": eventos,
+            "tempo_por_status_s": time_in_status(eventos)
+        })
+    except Exception as e:
+        return format_response({}, status="error", message=str(e)), 500
+
+@api.route('/api/stats')
+def get_estatisticas():
+    """Retorna estatísticas das entregas"""
+    try:
+        return format_response(compute_stats(current_shard().store.all()))
+    except Exception as e:
+        return format_response({}, status="error", message=str(e)), 500
+
+@api.route('/api/stats/sla')
+def get_sla():
+    """Tempos de coleta, trânsito, lead time e atraso (p50/p90/p99) por bairro e prioridade"""
+    try:
+        return format_response(current_shard().sla.result())
+    except Exception as e:
+        return format_response({}, status="error", message=str(e)), 500
+
+@api.route('/api/rotas/lotes', methods=['GET'])
+def get_lotes_rotas():
+    """Agrupa entregas pendentes em lotes por região e janela de horário"""
+    try:
+        max_tamanho = int_arg('max_tamanho', MAX_TAMANHO_PADRAO)
+        janela_minutos = int_arg('janela_minutos', JANELA_MINUTOS_PADRAO)
+        prefixo_cep = int_arg('prefixo_cep', PREFIXO_CEP_PADRAO)
+        agrupar_por = request.args.get('agrupar_por', 'cep')
+        otimizar = request.args.get('otimizar') in ('1', 'true')
+        # Limitado ao teto configurado: o cálculo roda dentro da requisição
+        orcamento_ms = min(max(int_arg('orcamento_ms', ORCAMENTO_MS_PADRAO), 0),
+                           current_app.config["ORCAMENTO_MS_MAX"])
+        
+        pendentes = current_shard().store.by_status('pendente')
+        lotes = build_batches(pendentes, max_tamanho=max_tamanho,
+                              janela_minutos=janela_minutos,
+                              agrupar_por=agrupar_por, prefixo_cep=prefixo_cep)
+        
+        # Ordenar as paradas de cada lote
+        if otimizar:
+            for lote in lotes:
+                rota = optimize_route(lote['entregas'], orcamento_ms=orcamento_ms)
+                por_id = {e['id']: e for e in lote['entregas']}
+                lote['entregas'] = [por_id[i] for i in rota['ordem']]
+                lote['rota'] = rota
+        
+        return format_response(lotes)
+    except ValueError as e:
+        return format_response([], status="error", message=str(e)), 400
+    except Exception as e:
+        return format_response([], status="error", message=str(e)), 500
+
+@api.app_errorhandler(404)
+def not_found(error):
+    """Handler para rotas não encontradas"""
+    return format_response({}, status="error", message="Endpoint não encontrado"), 404
+
+@api.app_errorhandler(500)
+def internal_error(error):
+    """Handler para erros internos"""
+    return format_response({}, status="error", message="Erro interno do servidor"), 500
+
+def main(argv=None, app=None):
+    """Inicia a API (comando zeca-api); sem `app`, cria uma com `create_app()`"""
+    parser = argparse.ArgumentParser(prog="zeca-api", description="API de Entregas - Sistema Zeca Delivery")
+    parser.add_argument("--host", default="0.0.0.0", help="Endereço de escuta")
+    parser.add_argument("--port", type=int, default=5000, help="Porta")
+    parser.add_argument("--no-debug", action="store_true", help="Desativa o modo debug do Flask")
+    args = parser.parse_args(argv)
+    
+    configure_logging()
+    if app is None:
+        app = create_app()
+    logger.info("Iniciando API de Entregas Zeca", extra={
+        "url": f"http://localhost:{args.port}",
+        "endpoints": sorted(rule.rule for rule in app.url_map.iter_rules() if rule.endpoint != 'static')
+    })
+    
+    app.run(debug=not args.no_debug, host=args.host, port=args.port)
+    return 0
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Health Check - Sistema Zeca Delivery
+====================================
+
+Sondas de liveness e readiness para o balanceador de carga:
+
+- GET /api/health/live  - o processo está de pé e respondendo (sempre 200)
+- GET /api/health/ready - a instância pode receber tráfego; responde 503
+  quando o backend de dados não responde ou quando o p99 de latência ou a
+  memória do processo passam dos limites configurados
+
+Limites (app.config ou variáveis de ambiente):
+- HEALTH_MAX_P99_MS       (ZECA_HEALTH_MAX_P99_MS, padrão 1000)
+- HEALTH_MAX_MEMORIA_MB   (ZECA_HEALTH_MAX_MEMORIA_MB, padrão 512)
+- HEALTH_MIN_AMOSTRAS     (ZECA_HEALTH_MIN_AMOSTRAS, padrão 20) - mínimo de
+  requisições recentes para o p99 ser levado em conta
+
+Uso:
+    from zeca.api.health import init_health
+    init_health(app, store)
+
+Autor: Demonstração do artigo Zeca Delivery
+"""
+
+from flask import jsonify
+from datetime import datetime
+import sys
+import os
+
+MAX_P99_MS_PADRAO = 1000
+MAX_MEMORIA_MB_PADRAO = 512
+MIN_AMOSTRAS_PADRAO = 20
+
+
+def memory_rss_bytes():
+    """Memória residente atual do processo, em bytes (None se indisponível)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    # Fora do Linux: pico de memória do processo
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def format_uptime(seconds):
+    """Formata segundos como H:MM:SS"""
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def _config_number(app, name, default):
+    value = os.environ.get(f"ZECA_{name}", default)
+    app.config.setdefault(name, float(value))
+
+
+def readiness(app, store, metrics):
+    """Executa as verificações de readiness; retorna (pronto, detalhes)"""
+    config = app.config
+    motivos = []
+
+    backend_ok = store.ping()
+    if not backend_ok:
+        motivos.append("backend de dados não respondeu")
+
+    p99 = metrics.latency_percentile(99) if metrics else None
+    amostras = metrics.latency_samples() if metrics else 0
+    p99_ms = round(p99 * 1000, 1) if p99 is not None else None
+    if p99_ms is not None and amostras >= config["HEALTH_MIN_AMOSTRAS"] \
+            and p99_ms > config["HEALTH_MAX_P99_MS"]:
+        motivos.append(f"p99 de latência {p99_ms}ms acima de {config['HEALTH_MAX_P99_MS']:g}ms")
+
+    rss = memory_rss_bytes()
+    memoria_mb = round(rss / 1024 / 1024, 1) if rss is not None else None
+    if memoria_mb is not None and memoria_mb > config["HEALTH_MAX_MEMORIA_MB"]:
+        motivos.append(f"memória {memoria_mb}MB acima de {config['HEALTH_MAX_MEMORIA_MB']:g}MB")
+
+    # A própria sonda conta como requisição em andamento
+    fila = max(0, metrics.in_flight() - 1) if metrics else None
+
+    uptime = (datetime.now() - store.created_at).total_seconds()
+    detalhes = {
+        "uptime": format_uptime(uptime),
+        "uptime_segundos": round(uptime, 1),
+        "backend": {
+            "tipo": store.backend,
+            "disponivel": backend_ok,
+            "total_entregas": len(store),
+            "ultima_escrita": store.last_write.isoformat()
+        },
+        "requisicoes_em_andamento": fila,
+        "latencia_p99_ms": p99_ms,
+        "amostras_latencia": amostras,
+        "memoria_mb": memoria_mb,
+        "limites": {
+            "max_p99_ms": config["HEALTH_MAX_P99_MS"],
+            "max_memoria_mb": config["HEALTH_MAX_MEMORIA_MB"],
+            "min_amostras": int(config["HEALTH_MIN_AMOSTRAS"])
+        },
+        "motivos": motivos
+    }
+    return not motivos, detalhes
+
+
+def init_health(app, store, metrics=None):
+    """Registra /api/health/live e /api/health/ready na app"""
+    _config_number(app, "HEALTH_MAX_P99_MS", MAX_P99_MS_PADRAO)
+    _config_number(app, "HEALTH_MAX_MEMORIA_MB", MAX_MEMORIA_MB_PADRAO)
+    _config_number(app, "HEALTH_MIN_AMOSTRAS", MIN_AMOSTRAS_PADRAO)
+    metrics = metrics or app.extensions.get("zeca_metrics")
+
+    @app.route("/api/health/live")
+    def health_live():
+        """Liveness: o processo está respondendo"""
+        return jsonify({
+            "status": "alive",
+            "timestamp": datetime.now().isoformat()
+        })
+
+    @app.route("/api/health/ready")
+    def health_ready():
+        """Readiness: a instância pode receber tráfego"""
+        pronto, detalhes = readiness(app, store, metrics)
+        detalhes = {
+            "status": "ready" if pronto else "not_ready",
+            "timestamp": datetime.now().isoformat(),
+            **detalhes
+        }
+        return jsonify(detalhes), 200 if pronto else 503
@@ -0,0 +1,514 @@
+"""
+Teste de Carga da API - Sistema Zeca Delivery
+=============================================
+
+Comando `zeca-loadtest`: sobe a API (em um subprocesso ou neste processo)
+ou usa uma já em execução, envia um mix de requisições configurável a uma
+taxa alvo e mede vazão, percentis de latência e taxa de erros, para achar
+o ponto de saturação antes do pico do jantar.
+
+- Mix de tráfego: pesos por operação (`--mix lista=10,por_id=25,status=5`)
+  ou a distribuição real de rotas de um log de acesso da API
+  (`--mix-do-log logs/api.jsonl`, linhas "Requisição atendida")
+- Laço aberto: a requisição i é disparada no instante início + i/rps, sem
+  esperar as anteriores terminarem; a latência conta a partir do instante
+  agendado, então a fila formada quando a API não dá conta aparece nos
+  percentis (sem "omissão coordenada")
+- Estágios: `--rps 50,100,200` executa um estágio por taxa e para no
+  primeiro saturado (vazão abaixo de 90% da alvo, mais de 1% de erros ou
+  recusas, ou p99 acima de `--slo-p99-ms`)
+- Respostas 429/503 (limite de requisições) contam como recusadas; outros
+  status >= 400, timeouts e falhas de conexão, como erros
+
+A API iniciada pelo comando roda sem o limite por cliente (todas as
+requisições vêm do mesmo IP), exceto com `--com-limite`. Com `--url`, as
+operações de escrita (status, importacao) alteram os dados do servidor
+informado.
+
+Uso:
+    zeca-loadtest --rps 50,100,200 --duracao 10
+    zeca-loadtest --modo processo --entregas 100000 --mix por_id=50,busca=50
+    zeca-loadtest --url http://localhost:5000 --mix-do-log logs/api.jsonl --json
+
+Autor: Demonstração do artigo Zeca Delivery
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+import subprocess
+import threading
+import argparse
+import random
+import socket
+import json
+import time
+import sys
+import os
+
+from zeca.data.sample_data import ENTREGAS_MOCK
+from zeca.data.schema import STATUS_VALIDOS
+
+MODOS = ("subprocesso", "processo")
+RPS_PADRAO = "50"
+DURACAO_PADRAO_S = 10
+WORKERS_PADRAO = 64
+TIMEOUT_PADRAO_S = 10
+SLO_P99_MS_PADRAO = 500
+INICIO_TIMEOUT_S = 30
+
+# Critérios de saturação de um estágio
+VAZAO_MINIMA = 0.9
+FALHAS_MAXIMAS = 0.01
+
+# Primeiro ID das entregas criadas pelo teste (--entregas e importacao)
+ID_INICIAL = 10_000_000
+LOTE_CARGA = 5000
+
+TERMOS_BUSCA = ("pizza", "joao", "maria", "consolacao", "rua", "hamburguer", "centro", "sushi")
+
+# Operação: (método, rota como aparece no log de acesso)
+OPERACOES = {
+    "lista": ("GET", "/api/entregas"),
+    "pendentes": ("GET", "/api/entregas/pendentes"),
+    "filtro": ("GET", "/api/entregas/status/<status>"),
+    "por_id": ("GET", "/api/entregas/<int:entrega_id>"),
+    "busca": ("GET", "/api/entregas/busca"),
+    "stats": ("GET", "/api/stats"),
+    "sla": ("GET", "/api/stats/sla"),
+    "lotes": ("GET", "/api/rotas/lotes"),
+    "status": ("POST", "/api/entregas/<int:entrega_id>/status"),
+    "importacao": ("POST", "/api/entregas/import"),
+}
+
+MIX_PADRAO = {
+    "lista": 10, "pendentes": 15, "filtro": 10, "por_id": 25, "busca": 10,
+    "stats": 10, "sla": 5, "lotes": 5, "status": 8, "importacao": 2,
+}
+
+
+def parse_mix(text):
+    """Pesos por operação a partir de "lista=10,por_id=25" """
+    mix = {}
+    for item in text.split(","):
+        name, sep, weight = item.strip().partition("=")
+        if name not in OPERACOES:
+            raise ValueError(f"Operação desconhecida: {name!r}. Use: {', '.join(OPERACOES)}")
+        try:
+            mix[name] = float(weight) if sep else 1.0
+        except ValueError:
+            raise ValueError(f"Peso inválido para {name}: {weight!r}")
+        if mix[name] < 0:
+            raise ValueError(f"Peso inválido para {name}: {weight!r}")
+    if not sum(mix.values()):
+        raise ValueError("O mix precisa de ao menos uma operação com peso maior que zero")
+    return mix
+
+
+def mix_from_log(lines):
+    """Pesos por operação a partir das linhas JSON do log de acesso da API"""
+    by_route = {route: name for name, route in OPERACOES.items()}
+    mix = {}
+    for line in lines:
+        try:
+            event = json.loads(line)
+        except ValueError:
+            continue
+        name = by_route.get((event.get("metodo"), event.get("rota"))) if isinstance(event, dict) else None
+        if name is not None:
+            mix[name] = mix.get(name, 0) + 1
+    if not mix:
+        raise ValueError("Nenhuma requisição de operação conhecida no log de acesso")
+    return mix
+
+
+def synthetic_deliveries(count, start_id=ID_INICIAL, seed=0):
+    """Entregas sintéticas a partir das de exemplo, com IDs, telefones e CEPs distintos"""
+    rng = random.Random(seed)
+    for i in range(count):
+        entrega = dict(ENTREGAS_MOCK[i % len(ENTREGAS_MOCK)])
+        entrega["id"] = start_id + i
+        entrega["telefone"] = f"(11) 9{rng.randrange(10**8):08d}"
+        entrega["cep"] = f"0{rng.randrange(1000, 9999)}-{rng.randrange(1000):03d}"
+        entrega["status"] = rng.choice(STATUS_VALIDOS[:3])
+        yield entrega
+
+
+class TrafficMix:
+    """Monta as requisições do mix, sorteadas com os pesos configurados"""
+
+    def __init__(self, mix, ids, seed=None, next_id=ID_INICIAL):
+        self.names = [name for name, weight in mix.items() if weight > 0]
+        self.weights = [mix[name] for name in self.names]
+        self.ids = list(ids) or [ENTREGAS_MOCK[0]["id"]]
+        self.next_id = next_id
+        self.random = random.Random(seed)
+
+    def next_request(self):
+        """Sorteia a operação; retorna (nome, método, caminho, corpo JSON, dados brutos)"""
+        rng = self.random
+        name = rng.choices(self.names, self.weights)[0]
+        method = OPERACOES[name][0]
+        if name == "lista":
+            return name, method, "/api/entregas", None, None
+        if name == "pendentes":
+            return name, method, "/api/entregas/pendentes", None, None
+        if name == "filtro":
+            return name, method, f"/api/entregas/status/{rng.choice(STATUS_VALIDOS)}", None, None
+        if name == "por_id":
+            return name, method, f"/api/entregas/{rng.choice(self.ids)}", None, None
+        if name == "busca":
+            return name, method, f"/api/entregas/busca?q={rng.choice(TERMOS_BUSCA)}", None, None
+        if name == "stats":
+            return name, method, "/api/stats", None, None
+        if name == "sla":
+            return name, method, "/api/stats/sla", None, None
+        if name == "lotes":
+            return name, method, "/api/rotas/lotes", None, None
+        if name == "status":
+            body = {"status": rng.choice(("em_transito", "entregue"))}
+            return name, method, f"/api/entregas/{rng.choice(self.ids)}/status", body, None
+        # importacao: uma entrega nova por requisição
+        entrega = next(synthetic_deliveries(1, self.next_id, seed=self.next_id))
+        self.next_id += 1
+        return name, method, "/api/entregas/import?formato=jsonl", None, json.dumps(entrega) + "\n"
+
+
+def percentile(sorted_values, p):
+    """Percentil pelo posto mais próximo de uma lista já ordenada"""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(latencies, ok, refused, errors):
+    """Contagens e percentis de latência (ms) de um conjunto de requisições"""
+    latencies = sorted(latencies)
+    total = ok + refused + errors
+    return {
+        "concluidas": total,
+        "ok": ok,
+        "recusadas": refused,
+        "erros": errors,
+        "taxa_erros_pct": round((refused + errors) / total * 100, 2) if total else None,
+        "latencia_ms": {
+            name: round(value * 1000, 2) if value is not None else None
+            for name, value in (("p50", percentile(latencies, 50)), ("p90", percentile(latencies, 90)),
+                                ("p99", percentile(latencies, 99)),
+                                ("max", latencies[-1] if latencies else None))
+        },
+    }
+
+
+class StageResults:
+    """Resultados de um estágio, acumulados pelas threads de envio"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_operation = {}
+
+    def record(self, name, latency, outcome):
+        with self._lock:
+            latencies, counts = self._by_operation.setdefault(name, ([], {"ok": 0, "recusada": 0, "erro": 0}))
+            latencies.append(latency)
+            counts[outcome] += 1
+
+    def summary(self):
+        with self._lock:
+            items = sorted(self._by_operation.items())
+        por_operacao = {}
+        all_latencies = []
+        totals = {"ok": 0, "recusada": 0, "erro": 0}
+        for name, (latencies, counts) in items:
+            por_operacao[name] = summarize(latencies, counts["ok"], counts["recusada"], counts["erro"])
+            all_latencies.extend(latencies)
+            for outcome, count in counts.items():
+                totals[outcome] += count
+        geral = summarize(all_latencies, totals["ok"], totals["recusada"], totals["erro"])
+        return geral, por_operacao
+
+
+def _outcome(status_code):
+    if status_code < 400:
+        return "ok"
+    return "recusada" if status_code in (429, 503) else "erro"
+
+
+def run_stage(base_url, traffic, rps, duration, workers=WORKERS_PADRAO, timeout=TIMEOUT_PADRAO_S,
+              slo_p99_ms=SLO_P99_MS_PADRAO):
+    """Executa um estágio em laço aberto a `rps` requisições por segundo; retorna o relatório"""
+    import requests
+
+    sessions = threading.local()
+    results = StageResults()
+
+    def send(name, method, path, body, data, scheduled):
+        session = getattr(sessions, "session", None)
+        if session is None:
+            session = sessions.session = requests.Session()
+        try:
+            response = session.request(method, base_url + path, json=body, data=data, timeout=timeout,
+                                       headers={"Content-Type": "application/x-ndjson"} if data else None)
+            response.content  # lê o corpo inteiro
+            outcome = _outcome(response.status_code)
+        except requests.RequestException:
+            outcome = "erro"
+        results.record(name, time.perf_counter() - scheduled, outcome)
+
+    total = max(1, int(rps * duration))
+    interval = 1.0 / rps
+    generator_lag = 0.0
+    start = time.perf_counter() + 0.05
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="zeca-carga") as pool:
+        for i in range(total):
+            scheduled = start + i * interval
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                generator_lag = max(generator_lag, -delay)
+            pool.submit(send, *traffic.next_request(), scheduled)
+    elapsed = time.perf_counter() - start
+
+    geral, por_operacao = results.summary()
+    vazao = geral["concluidas"] / elapsed if elapsed > 0 else 0.0
+    motivos = []
+    if vazao < rps * VAZAO_MINIMA:
+        motivos.append(f"vazão {vazao:.1f}/s abaixo de {VAZAO_MINIMA:.0%} da alvo")
+    if geral["taxa_erros_pct"] is not None and geral["taxa_erros_pct"] > FALHAS_MAXIMAS * 100:
+        motivos.append(f"{geral['taxa_erros_pct']}% de erros/recusas")
+    p99 = geral["latencia_ms"]["p99"]
+    if p99 is not None and p99 > slo_p99_ms:
+        motivos.append(f"p99 {p99}ms acima de {slo_p99_ms:g}ms")
+
+    return {
+        "rps_alvo": rps,
+        "duracao_s": round(elapsed, 2),
+        "enviadas": total,
+        "vazao_rps": round(vazao, 1),
+        **geral,
+        "atraso_gerador_ms": round(generator_lag * 1000, 1),
+        "saturado": bool(motivos),
+        "motivos": motivos,
+        "por_operacao": por_operacao,
+    }
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_ready(base_url, process=None, timeout=INICIO_TIMEOUT_S):
+    import requests
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"A API encerrou durante a inicialização (código {process.returncode})")
+        try:
+            if requests.get(base_url + "/api/health/live", timeout=1).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.1)
+    raise RuntimeError(f"A API não respondeu em {timeout}s ({base_url})")
+
+
+def _api_environment(rate_limit):
+    env = {"ZECA_LOG_LEVEL": "WARNING"}
+    if not rate_limit:
+        env["ZECA_RATE_LIMIT_RPS"] = "0"
+    return env
+
+
+@contextmanager
+def start_api(mode="subprocesso", rate_limit=False):
+    """Sobe a API para o teste; produz a URL base e encerra a API ao final"""
+    if mode not in MODOS:
+        raise ValueError(f"Modo inválido. Use: {', '.join(MODOS)}")
+
+    if mode == "subprocesso":
+        port = _free_port()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "zeca", "api", "--host", "127.0.0.1", "--port", str(port), "--no-debug"],
+            env={**os.environ, **_api_environment(rate_limit)},
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        base_url = f"http://127.0.0.1:{port}"
+        try:
+            _wait_ready(base_url, process)
+            yield base_url
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        return
+
+    # Neste processo: uma app nova servida pelo werkzeug em uma thread
+    from werkzeug.serving import WSGIRequestHandler, make_server
+    from zeca.api.delivery_api import create_app
+
+    app = create_app({} if rate_limit else {"RATE_LIMIT_RPS": 0})
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server("127.0.0.1", 0, app, threaded=True, request_handler=QuietHandler)
+    thread = threading.Thread(target=server.serve_forever, name="zeca-loadtest-api", daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    try:
+        _wait_ready(base_url)
+        yield base_url
+    finally:
+        server.shutdown()
+        thread.join()
+
+
+def seed_api(base_url, count, start_id=ID_INICIAL, batch_size=LOTE_CARGA):
+    """Importa `count` entregas sintéticas pela API; retorna os IDs importados"""
+    import requests
+
+    ids = []
+    lines = []
+
+    def flush():
+        response = requests.post(f"{base_url}/api/entregas/import",
+                                 params={"formato": "jsonl", "lote": batch_size},
+                                 data="".join(lines).encode(), timeout=600,
+                                 headers={"Content-Type": "application/x-ndjson"})
+        response.raise_for_status()
+        lines.clear()
+
+    for entrega in synthetic_deliveries(count, start_id):
+        lines.append(json.dumps(entrega) + "\n")
+        ids.append(entrega["id"])
+        if len(lines) >= batch_size:
+            flush()
+    if lines:
+        flush()
+    return ids
+
+
+def existing_ids(base_url):
+    """IDs das entregas já cadastradas na API"""
+    import requests
+
+    response = requests.get(f"{base_url}/api/entregas", timeout=600)
+    response.raise_for_status()
+    return [entrega["id"] for entrega in response.json()["data"]]
+
+
+def run(base_url, mix, rates, duration, workers=WORKERS_PADRAO, timeout=TIMEOUT_PADRAO_S,
+        slo_p99_ms=SLO_P99_MS_PADRAO, seed_count=0, seed=None):
+    """Carga inicial opcional e um estágio por taxa, até o primeiro saturado"""
+    ids = existing_ids(base_url)
+    if seed_count:
+        ids += seed_api(base_url, seed_count)
+    traffic = TrafficMix(mix, ids, seed=seed, next_id=ID_INICIAL + seed_count)
+
+    stages = []
+    for rps in rates:
+        stage = run_stage(base_url, traffic, rps, duration, workers, timeout, slo_p99_ms)
+        stages.append(stage)
+        if stage["saturado"]:
+            break
+    saturated = next((stage["rps_alvo"] for stage in stages if stage["saturado"]), None)
+    return {"url": base_url, "mix": mix, "entregas": len(ids), "estagios": stages,
+            "saturacao_rps": saturated}
+
+
+def format_report(report):
+    """Relatório legível dos estágios"""
+    lines = [f"API: {report['url']} - {report['entregas']} entregas",
+             "Mix: " + ", ".join(f"{name}={weight:g}" for name, weight in report["mix"].items()), ""]
+    header = f"{'rps alvo':>9} {'vazão':>8} {'ok':>7} {'recus.':>7} {'erros':>7} " \
+             f"{'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    lines.append(header)
+    lines.append("-" * len(header))
+    for stage in report["estagios"]:
+        latencia = stage["latencia_ms"]
+        cells = [f"{latencia[k]:>8}" if latencia[k] is not None else f"{'-':>8}"
+                 for k in ("p50", "p90", "p99", "max")]
+        lines.append(f"{stage['rps_alvo']:>9g} {stage['vazao_rps']:>8} {stage['ok']:>7} "
+                     f"{stage['recusadas']:>7} {stage['erros']:>7} " + " ".join(cells))
+        if stage["motivos"]:
+            lines.append(f"{'':>9} saturado: {'; '.join(stage['motivos'])}")
+        if stage["atraso_gerador_ms"] > 50:
+            lines.append(f"{'':>9} aviso: gerador atrasou até {stage['atraso_gerador_ms']}ms "
+                         "(máquina de teste sobrecarregada?)")
+    lines.append("")
+    if report["saturacao_rps"] is None:
+        lines.append("Nenhum estágio saturou")
+    else:
+        lines.append(f"Saturação a partir de {report['saturacao_rps']:g} req/s")
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    """Lê os argumentos da linha de comando"""
+    parser = argparse.ArgumentParser(prog="zeca-loadtest",
+                                     description="Teste de carga da API - Sistema Zeca Delivery")
+    parser.add_argument("--url", default=None,
+                        help="API já em execução (sem esta opção a API é iniciada pelo comando)")
+    parser.add_argument("--modo", choices=MODOS, default="subprocesso",
+                        help="Como iniciar a API: subprocesso (padrão) ou neste processo")
+    parser.add_argument("--com-limite", action="store_true",
+                        help="Mantém o limite de requisições por cliente na API iniciada")
+    parser.add_argument("--rps", default=RPS_PADRAO,
+                        help="Taxa(s) alvo em requisições por segundo, um estágio por valor (ex.: 50,100,200)")
+    parser.add_argument("--duracao", type=float, default=DURACAO_PADRAO_S, help="Segundos por estágio")
+    parser.add_argument("--mix", default=None,
+                        help="Pesos por operação (ex.: lista=10,por_id=25). Operações: " + ", ".join(OPERACOES))
+    parser.add_argument("--mix-do-log", default=None, metavar="ARQUIVO.jsonl",
+                        help="Usa a distribuição de rotas de um log de acesso da API como mix")
+    parser.add_argument("--workers", type=int, default=WORKERS_PADRAO,
+                        help="Máximo de requisições em andamento no gerador")
+    parser.add_argument("--timeout", type=float, default=TIMEOUT_PADRAO_S, help="Timeout por requisição (s)")
+    parser.add_argument("--slo-p99-ms", type=float, default=SLO_P99_MS_PADRAO,
+                        help="p99 acima deste valor marca o estágio como saturado")
+    parser.add_argument("--entregas", type=int, default=0,
+                        help="Entregas sintéticas importadas antes do teste")
+    parser.add_argument("--seed", type=int, default=None, help="Semente do sorteio das operações")
+    parser.add_argument("--json", action="store_true", help="Relatório em JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Função principal do comando zeca-loadtest"""
+    args = parse_args(argv)
+    try:
+        rates = [float(value) for value in args.rps.split(",")]
+        if any(rate <= 0 for rate in rates):
+            raise ValueError
+    except ValueError:
+        print(f"❌ --rps inválido: {args.rps}", file=sys.stderr)
+        return 2
+
+    try:
+        if args.mix_do_log:
+            with open(args.mix_do_log, encoding="utf-8") as log:
+                mix = mix_from_log(log)
+        else:
+            mix = parse_mix(args.mix) if args.mix else dict(MIX_PADRAO)
+
+        if args.url:
+            api = nullcontext(args.url.rstrip("/"))
+        else:
+            api = start_api(args.modo, rate_limit=args.com_limite)
+        with api as base_url:
+            report = run(base_url, mix, rates, args.duracao, workers=args.workers, timeout=args.timeout,
+                         slo_p99_ms=args.slo_p99_ms, seed_count=args.entregas, seed=args.seed)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print(format_report(report))
+    return 0
@@ -0,0 +1,244 @@
+"""
+Métricas de Requisições - Sistema Zeca Delivery
+===============================================
+
+Instrumentação das apps Flask: contagem de requisições por rota, erros,
+histogramas de latência (buckets fixos), bytes de resposta e requisições
+em andamento, exportados em /api/metrics no formato texto do Prometheus.
+
+Custo no caminho da requisição:
+- Cada thread escreve apenas nos seus próprios contadores (sem lock)
+- O lock só é usado na primeira requisição de cada thread e na coleta
+- Contadores de threads encerradas são consolidados durante a coleta
+
+Uso:
+    from zeca.api.metrics import init_metrics
+    init_metrics(app)
+
+Autor: Demonstração do artigo Zeca Delivery
+"""
+
+from flask import Response, g, request
+from bisect import bisect_left
+from collections import deque
+import threading
+import time
+
+# Limites dos buckets de latência, em segundos
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Consolidar contadores de threads encerradas a partir deste número de threads
+MAX_SHARDS_ATIVOS = 256
+
+ROTA_NAO_ENCONTRADA = "<nao_encontrada>"
+
+# Quantidade de latências recentes usadas no cálculo de percentis
+JANELA_LATENCIAS = 1024
+
+# Rotas de monitoramento não entram na janela (as sondas distorceriam o p99)
+ROTAS_FORA_DA_JANELA = ("/api/health", "/api/metrics")
+
+
+class _Shard:
+    """Contadores de uma única thread"""
+
+    __slots__ = ("requests", "errors", "latency", "response_bytes", "in_flight")
+
+    def __init__(self):
+        self.requests = {}        # (rota, método, status) -> contagem
+        self.errors = {}          # (rota, método) -> contagem
+        self.latency = {}         # (rota, método) -> [buckets..., +Inf, soma]
+        self.response_bytes = {}  # (rota, método) -> bytes
+        self.in_flight = 0
+
+    def merge_into(self, totals):
+        """Soma os contadores desta thread em `totals` (cópias atômicas sob o GIL)"""
+        for key, count in dict(self.requests).items():
+            totals.requests[key] = totals.requests.get(key, 0) + count
+        for key, count in dict(self.errors).items():
+            totals.errors[key] = totals.errors.get(key, 0) + count
+        for key, size in dict(self.response_bytes).items():
+            totals.response_bytes[key] = totals.response_bytes.get(key, 0) + size
+        for key, values in dict(self.latency).items():
+            values = list(values)
+            current = totals.latency.get(key)
+            if current is None:
+                totals.latency[key] = values
+            else:
+                for i, value in enumerate(values):
+                    current[i] += value
+        totals.in_flight += self.in_flight
+
+
+class RequestMetrics:
+    """Registro de métricas de requisições com contadores por thread"""
+
+    def __init__(self, buckets=BUCKETS_LATENCIA):
+        self.buckets = tuple(buckets)
+        self._local = threading.local()
+        self._shards = []          # (thread, shard)
+        self._retired = _Shard()   # contadores de threads já encerradas
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=JANELA_LATENCIAS)   # append é thread-safe
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                if len(self._shards) >= MAX_SHARDS_ATIVOS:
+                    self._retire_dead_threads()
+                self._shards.append((threading.current_thread(), shard))
+        return shard
+
+    def _retire_dead_threads(self):
+        """Consolida contadores de threads encerradas (chamar com o lock)"""
+        alive = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                alive.append((thread, shard))
+            else:
+                shard.merge_into(self._retired)
+        self._shards = alive
+
+    def start_request(self):
+        """Marca o início de uma requisição; retorna o instante inicial"""
+        self._shard().in_flight += 1
+        return time.perf_counter()
+
+    def end_request(self):
+        """Marca o fim de uma requisição (sempre chamado, mesmo com erro)"""
+        self._shard().in_flight -= 1
+
+    def observe(self, route, method, status, duration, response_bytes):
+        """Registra uma requisição concluída"""
+        shard = self._shard()
+        key = (route, method)
+
+        request_key = (route, method, status)
+        shard.requests[request_key] = shard.requests.get(request_key, 0) + 1
+        if status >= 500:
+            shard.errors[key] = shard.errors.get(key, 0) + 1
+        shard.response_bytes[key] = shard.response_bytes.get(key, 0) + response_bytes
+
+        histogram = shard.latency.get(key)
+        if histogram is None:
+            histogram = shard.latency[key] = [0] * (len(self.buckets) + 2)
+        histogram[bisect_left(self.buckets, duration)] += 1
+        histogram[-1] += duration
+
+        if not route.startswith(ROTAS_FORA_DA_JANELA):
+            self._recent.append(duration)
+
+    def latency_percentile(self, percentile):
+        """Percentil da latência (segundos) nas requisições recentes, ou None"""
+        recent = sorted(self._recent)
+        if not recent:
+            return None
+        index = min(len(recent) - 1, int(len(recent) * percentile / 100))
+        return recent[index]
+
+    def latency_samples(self):
+        """Quantidade de latências na janela recente"""
+        return len(self._recent)
+
+    def in_flight(self):
+        """Requisições em andamento em todas as threads"""
+        with self._lock:
+            return sum(shard.in_flight for _, shard in self._shards)
+
+    def snapshot(self):
+        """Soma os contadores de todas as threads"""
+        totals = _Shard()
+        with self._lock:
+            self._retire_dead_threads()
+            self._retired.merge_into(totals)
+            for _, shard in self._shards:
+                shard.merge_into(totals)
+        return totals
+
+    def render_prometheus(self):
+        """Exporta as métricas no formato texto do Prometheus"""
+        totals = self.snapshot()
+        lines = [
+            "# HELP zeca_http_requests_total Total de requisições HTTP por rota, método e status",
+            "# TYPE zeca_http_requests_total counter",
+        ]
+        for (route, method, status), count in sorted(totals.requests.items()):
+            lines.append(f"zeca_http_requests_total{_labels(route=route, method=method, status=status)} {count}")
+
+        lines += [
+            "# HELP zeca_http_request_errors_total Requisições que terminaram com status 5xx",
+            "# TYPE zeca_http_request_errors_total counter",
+        ]
+        for (route, method), count in sorted(totals.errors.items()):
+            lines.append(f"zeca_http_request_errors_total{_labels(route=route, method=method)} {count}")
+
+        lines += [
+            "# HELP zeca_http_request_duration_seconds Latência das requisições",
+            "# TYPE zeca_http_request_duration_seconds histogram",
+        ]
+        for (route, method), values in sorted(totals.latency.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), values[:-1]):
+                cumulative += count
+                labels = _labels(route=route, method=method, le=bound)
+                lines.append(f"zeca_http_request_duration_seconds_bucket{labels} {cumulative}")
+            labels = _labels(route=route, method=method)
+            lines.append(f"zeca_http_request_duration_seconds_sum{labels} {values[-1]:.6f}")
+            lines.append(f"zeca_http_request_duration_seconds_count{labels} {cumulative}")
+
+        lines += [
+            "# HELP zeca_http_response_bytes_total Bytes enviados nas respostas",
+            "# TYPE zeca_http_response_bytes_total counter",
+        ]
+        for (route, method), size in sorted(totals.response_bytes.items()):
+            lines.append(f"zeca_http_response_bytes_total{_labels(route=route, method=method)} {size}")
+
+        lines += [
+            "# HELP zeca_http_requests_in_flight Requisições em andamento",
+            "# TYPE zeca_http_requests_in_flight gauge",
+            f"zeca_http_requests_in_flight {totals.in_flight}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _labels(**labels):
+    """Formata labels do Prometheus com escape de caracteres especiais"""
+    parts = []
+    for name, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{name}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def init_metrics(app, metrics=None):
+    """Registra os hooks de instrumentação e a rota /api/metrics na app"""
+    metrics = metrics or RequestMetrics()
+    app.extensions["zeca_metrics"] = metrics
+
+    @app.before_request
+    def _metrics_start():
+        g._metrics_start = metrics.start_request()
+
+    @app.after_request
+    def _metrics_observe(response):
+        start = g.get("_metrics_start")
+        if start is not None:
+            route = request.url_rule.rule if request.url_rule is not None else ROTA_NAO_ENCONTRADA
+            metrics.observe(route, request.method, response.status_code,
+                            time.perf_counter() - start,
+                            response.calculate_content_length() or 0)
+        return response
+
+    @app.teardown_request
+    def _metrics_end(exc):
+        if g.pop("_metrics_start", None) is not None:
+            metrics.end_request()
+
+    @app.route("/api/metrics")
+    def get_metrics():
+        """Métricas das requisições no formato do Prometheus"""
+        return Response(metrics.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+    return metrics
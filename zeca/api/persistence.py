@@ -0,0 +1,210 @@
+"""
+Persistência da API - Sistema Zeca Delivery
+===========================================
+
+Abre o armazenamento de entregas a partir do último snapshot binário
+(zeca/data/snapshot.py) e do log de eventos (zeca/data/events.py), e grava
+um novo snapshot periodicamente, para que uma API reiniciada volte a
+atender em milissegundos, sem reimportar os arquivos do dia.
+
+- Na inicialização: se o arquivo de snapshot existir, as entregas vêm dele
+  (via mmap); senão, das entregas padrão. Com log de eventos, os eventos
+  posteriores ao snapshot (seq maior que a gravada no cabeçalho) são
+  reaplicados; sem snapshot, o log inteiro reconstrói as entregas
+- Em segundo plano: a cada SNAPSHOT_INTERVALO_S segundos, se houve escrita
+  desde o último snapshot, um novo arquivo substitui o anterior e o log é
+  compactado até a sequência coberta pelo snapshot
+- No encerramento: grava o snapshot final, se houver mudanças, e fecha o
+  log. Cada app tem um único gancho atexit (`on_shutdown` registra as
+  funções de encerramento das extensões); `shutdown(app)` encerra a app
+  antes do fim do processo e remove o gancho
+
+Configuração (variáveis de ambiente ou app.config):
+- SNAPSHOT_PATH         (ZECA_SNAPSHOT_PATH; sem valor = snapshots desativados)
+- SNAPSHOT_INTERVALO_S  (ZECA_SNAPSHOT_INTERVALO_S, padrão 60)
+- EVENT_LOG_PATH        (ZECA_EVENT_LOG; sem valor = sem log/histórico)
+
+Sem SNAPSHOT_PATH o log nunca é compactado: cada inclusão fica nele com os
+dados completos.
+
+Com vários workers criados por fork (ex.: gunicorn --preload), o snapshot
+aberto antes do fork tem suas páginas compartilhadas entre os workers; a
+gravação periódica roda apenas no processo que inicializou a API. O log de
+eventos pressupõe um único processo escrevendo.
+
+Uso:
+    from zeca.api.persistence import init_persistence, shutdown
+    store = init_persistence(app, ENTREGAS_MOCK)
+    shutdown(app)
+
+Autor: Demonstração do artigo Zeca Delivery
+"""
+
+from functools import partial
+import threading
+import atexit
+import os
+
+from zeca.common.structured_logging import get_logger
+from zeca.data.events import EventLog
+from zeca.data.store import DeliveryStore
+
+INTERVALO_PADRAO_S = 60
+
+logger = get_logger("persistence")
+
+
+def replay(store, events, after_seq=0):
+    """Reaplica no armazenamento os eventos com sequência maior que `after_seq`"""
+    applied = ignored = 0
+    for event in events.events(after_seq):
+        if store.apply_event(event):
+            applied += 1
+        else:
+            ignored += 1
+    if applied or ignored:
+        log = logger.warning if ignored else logger.info
+        log("Eventos reaplicados", extra={
+            "arquivo": events.path, "apos_seq": after_seq,
+            "eventos_aplicados": applied, "eventos_ignorados": ignored
+        })
+    return applied, ignored
+
+
+def load_store(path, entregas_padrao=(), events=None):
+    """
+    Armazenamento a partir do snapshot (se existir e for válido) ou das
+    entregas padrão, mais os eventos do log ainda não cobertos pelo snapshot.
+    """
+    if path and os.path.exists(path):
+        try:
+            store = DeliveryStore.from_snapshot(path, events=events)
+            logger.info("Entregas carregadas do snapshot", extra={
+                "arquivo": path, "total_entregas": len(store),
+                "snapshot_de": store.last_write.isoformat()
+            })
+            if events is not None:
+                events.skip_to(store.snapshot_seq)
+                replay(store, events, store.snapshot_seq)
+            return store
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Snapshot ignorado", extra={"arquivo": path, "erro": str(e)})
+
+    if events is None:
+        return DeliveryStore(entregas_padrao)
+    store = DeliveryStore(events=events)
+    if len(events):
+        replay(store, events)
+    else:
+        store.add_many(entregas_padrao)
+    return store
+
+
+class SnapshotWriter:
+    """Grava o snapshot em segundo plano quando o armazenamento muda"""
+
+    def __init__(self, store, path, interval=INTERVALO_PADRAO_S):
+        self.store = store
+        self.path = path
+        self.interval = interval
+        self.saved_write = store.last_write
+        self.last_info = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="zeca-snapshot", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def save_if_changed(self):
+        """Grava um snapshot se houve escrita desde o último; retorna as informações ou None"""
+        with self._lock:
+            if self.store.last_write == self.saved_write:
+                return None
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            written = self.store.last_write
+            info = self.store.save_snapshot(self.path)
+            self.saved_write = written
+            self.last_info = info
+            logger.info("Snapshot gravado", extra={"arquivo": self.path, **info})
+
+            if self.store.events is not None:
+                # None: log já fechado (encerramento), nada a compactar
+                compacted = self.store.events.compact(info["seq"])
+                if compacted is not None:
+                    logger.info("Log de eventos compactado", extra={
+                        "arquivo": self.store.events.path, **compacted
+                    })
+            return info
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.save_if_changed()
+            except Exception:
+                logger.exception("Falha ao gravar snapshot", extra={"arquivo": self.path})
+
+    def stop(self):
+        """Encerra a gravação periódica e grava o snapshot final"""
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        try:
+            self.save_if_changed()
+        except Exception:
+            logger.exception("Falha ao gravar snapshot", extra={"arquivo": self.path})
+
+
+def on_shutdown(app, fn):
+    """
+    Registra `fn` para o encerramento da app (executadas na ordem inversa
+    do registro). A app tem um único gancho atexit, criado no primeiro
+    registro e removido por `shutdown`.
+    """
+    hooks = app.extensions.get("zeca_encerramento")
+    if hooks is None:
+        hooks = app.extensions["zeca_encerramento"] = {"atexit": partial(shutdown, app), "funcoes": []}
+        atexit.register(hooks["atexit"])
+    hooks["funcoes"].append(fn)
+
+
+def shutdown(app):
+    """Encerra as extensões da app (snapshot final, logs fechados); chamadas seguintes não fazem nada"""
+    hooks = app.extensions.pop("zeca_encerramento", None)
+    if hooks is None:
+        return
+    atexit.unregister(hooks["atexit"])
+    for fn in reversed(hooks["funcoes"]):
+        try:
+            fn()
+        except Exception:
+            logger.exception("Falha no encerramento da API")
+
+
+def init_persistence(app, entregas_padrao=()):
+    """Cria o armazenamento da API e, se configurados, o log de eventos e os snapshots"""
+    app.config.setdefault("SNAPSHOT_PATH", os.environ.get("ZECA_SNAPSHOT_PATH") or None)
+    app.config.setdefault("SNAPSHOT_INTERVALO_S",
+                          float(os.environ.get("ZECA_SNAPSHOT_INTERVALO_S", INTERVALO_PADRAO_S)))
+    app.config.setdefault("EVENT_LOG_PATH", os.environ.get("ZECA_EVENT_LOG") or None)
+
+    events = None
+    if app.config["EVENT_LOG_PATH"]:
+        events = EventLog(app.config["EVENT_LOG_PATH"])
+        on_shutdown(app, events.close)
+
+    path = app.config["SNAPSHOT_PATH"]
+    store = load_store(path, entregas_padrao, events)
+
+    writer = None
+    if path:
+        writer = SnapshotWriter(store, path, app.config["SNAPSHOT_INTERVALO_S"]).start()
+        # Ordem inversa no encerramento: snapshot final antes de fechar o log
+        on_shutdown(app, writer.stop)
+
+    app.extensions["snapshots"] = writer
+    app.extensions["eventos"] = events
+    return store
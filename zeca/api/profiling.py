@@ -0,0 +1,107 @@
+"""
+Profiling de Requisições - Sistema Zeca Delivery
+================================================
+
+Captura sob demanda de um perfil cProfile por requisição, restrita a
+administradores.
+
+- Ativação: `?profile=1` na URL ou cabeçalho `X-Profile: 1`
+- Autorização: cabeçalho `X-Admin-Token` igual a PROFILE_TOKEN
+  (app.config ou variável de ambiente ZECA_PROFILE_TOKEN). Sem token
+  configurado o profiling fica desligado; pedidos sem token válido são
+  atendidos normalmente, sem perfil
+- Resultado: arquivo .prof em PROFILE_DIR (padrão logs/profiles), informado
+  no cabeçalho `X-Profile` da resposta e disponível em
+  GET /api/profiles/<arquivo> (também restrito a administradores)
+
+Apenas uma requisição é perfilada por vez: o cProfile não suporta
+perfis simultâneos no mesmo processo. Requisições que chegam durante
+um perfil em andamento recebem `X-Profile: ocupado`.
+
+Uso:
+    from zeca.api.profiling import init_profiling
+    init_profiling(app)
+
+Autor: Demonstração do artigo Zeca Delivery
+"""
+
+from flask import current_app, g, request, send_from_directory, abort
+from datetime import datetime
+import threading
+import cProfile
+import hmac
+import time
+import os
+
+DIRETORIO_PERFIS = os.path.join("logs", "profiles")
+
+
+def profiling_requested():
+    """A requisição pediu perfil e traz um token de administrador válido"""
+    if request.args.get("profile") != "1" and request.headers.get("X-Profile") != "1":
+        return False
+    return is_admin()
+
+
+def is_admin():
+    """Confere o cabeçalho X-Admin-Token com o token configurado"""
+    token = current_app.config.get("PROFILE_TOKEN")
+    given = request.headers.get("X-Admin-Token", "")
+    return bool(token) and hmac.compare_digest(given.encode(), token.encode())
+
+
+def init_profiling(app):
+    """Registra os hooks de profiling e a rota de download dos perfis"""
+    app.config.setdefault("PROFILE_TOKEN", os.environ.get("ZECA_PROFILE_TOKEN"))
+    app.config.setdefault("PROFILE_DIR", DIRETORIO_PERFIS)
+    lock = threading.Lock()
+
+    @app.before_request
+    def _profile_start():
+        if not profiling_requested():
+            return
+        if not lock.acquire(blocking=False):
+            g._profile_busy = True
+            return
+        g._profile = cProfile.Profile()
+        g._profile_start = time.perf_counter()
+        g._profile.enable()
+
+    @app.after_request
+    def _profile_finish(response):
+        profile = g.pop("_profile", None)
+        if profile is None:
+            if g.pop("_profile_busy", False):
+                response.headers["X-Profile"] = "ocupado"
+            return response
+
+        profile.disable()
+        elapsed_ms = (time.perf_counter() - g.pop("_profile_start")) * 1000
+        lock.release()
+
+        directory = app.config["PROFILE_DIR"]
+        os.makedirs(directory, exist_ok=True)
+        endpoint = (request.endpoint or "nao_encontrada").replace(".", "_")
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        filename = f"{timestamp}_{endpoint}.prof"
+        profile.dump_stats(os.path.join(directory, filename))
+
+        response.headers["X-Profile"] = filename
+        response.headers["X-Profile-Tempo-Ms"] = f"{elapsed_ms:.1f}"
+        return response
+
+    @app.teardown_request
+    def _profile_abort(exc):
+        # Requisição interrompida antes do after_request: liberar o perfil
+        profile = g.pop("_profile", None)
+        if profile is not None:
+            profile.disable()
+            lock.release()
+
+    @app.route("/api/profiles/<path:filename>")
+    def get_profile(filename):
+        """Download de um perfil gravado (apenas administradores)"""
+        if not is_admin():
+            abort(404)
+        return send_from_directory(os.path.abspath(app.config["PROFILE_DIR"]), filename,
+                                   mimetype="application/octet-stream")
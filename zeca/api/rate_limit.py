@@ -0,0 +1,134 @@
+"""
+Limite de Requisições - Sistema Zeca Delivery
+=============================================
+
+Protege a API de clientes que disparam requisições demais (ex.: um painel
+consultando /api/entregas em loop) e de picos que esgotariam os workers:
+
+- Limite por cliente (token bucket): cada cliente (IP de origem) acumula
+  até RATE_LIMIT_RAJADA fichas, repostas a RATE_LIMIT_RPS por segundo;
+  cada requisição gasta uma. Sem fichas: 429 com `Retry-After`
+- Limite global de concorrência: no máximo MAX_CONCORRENTES requisições em
+  atendimento ao mesmo tempo; acima disso: 503 com `Retry-After`
+
+As respostas de recusa usam o envelope padrão (`format_response`). Tudo em
+memória do processo e em tempo constante por requisição: um dicionário
+ordenado de baldes (o menos usado é descartado quando passa de
+RATE_LIMIT_MAX_CLIENTES) e um semáforo. Sondas de health check e
+/api/metrics não são limitadas.
+
+Configuração (app.config ou variáveis de ambiente; 0 desativa):
+- RATE_LIMIT_RPS           (ZECA_RATE_LIMIT_RPS, padrão 50)
+- RATE_LIMIT_RAJADA        (ZECA_RATE_LIMIT_RAJADA, padrão 100)
+- RATE_LIMIT_MAX_CLIENTES  (ZECA_RATE_LIMIT_MAX_CLIENTES, padrão 10000)
+- MAX_CONCORRENTES         (ZECA_MAX_CONCORRENTES, padrão 64)
+
+Atrás de um proxy reverso o IP de origem é o do proxy; configure o
+werkzeug.middleware.proxy_fix.ProxyFix para usar o X-Forwarded-For.
+
+Uso:
+    from zeca.api.rate_limit import init_rate_limit
+    init_rate_limit(app)
+
+Autor: Demonstração do artigo Zeca Delivery
+"""
+
+from collections import OrderedDict
+from flask import g, request
+import threading
+import math
+import time
+import os
+
+from zeca.api.responses import format_response
+
+RPS_PADRAO = 50
+RAJADA_PADRAO = 100
+MAX_CLIENTES_PADRAO = 10000
+MAX_CONCORRENTES_PADRAO = 64
+
+# Sondas e métricas nunca são limitadas (o balanceador precisa delas)
+ROTAS_ISENTAS = ("/api/health", "/api/health/live", "/api/health/ready", "/api/metrics")
+
+
+class TokenBuckets:
+    """Baldes de fichas por cliente, com número máximo de clientes (LRU)"""
+
+    def __init__(self, rate, burst, max_clients=MAX_CLIENTES_PADRAO, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self.clock = clock
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def acquire(self, client):
+        """Gasta uma ficha do cliente; retorna 0 se permitido, senão os segundos até a próxima"""
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = self._buckets[client] = [float(self.burst), now]
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client)
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return 0
+            return (1 - bucket[0]) / self.rate
+
+
+def _config_number(app, name, default):
+    value = os.environ.get(f"ZECA_{name}", default)
+    app.config.setdefault(name, float(value))
+    return app.config[name]
+
+
+def init_rate_limit(app):
+    """Registra o limite por cliente e o limite de concorrência na app"""
+    rate = _config_number(app, "RATE_LIMIT_RPS", RPS_PADRAO)
+    burst = _config_number(app, "RATE_LIMIT_RAJADA", RAJADA_PADRAO)
+    max_clients = int(_config_number(app, "RATE_LIMIT_MAX_CLIENTES", MAX_CLIENTES_PADRAO))
+    max_concurrent = int(_config_number(app, "MAX_CONCORRENTES", MAX_CONCORRENTES_PADRAO))
+
+    buckets = TokenBuckets(rate, max(burst, 1), max_clients) if rate > 0 else None
+    slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent > 0 else None
+    app.extensions["zeca_rate_limit"] = buckets
+
+    @app.before_request
+    def _admission():
+        if request.path in ROTAS_ISENTAS:
+            return None
+
+        if buckets is not None:
+            wait = buckets.acquire(request.remote_addr or "-")
+            if wait:
+                response = format_response({}, status="error",
+                                           message="Limite de requisições excedido; tente novamente mais tarde")
+                response.status_code = 429
+                response.headers["Retry-After"] = str(math.ceil(wait))
+                return response
+
+        if slots is not None:
+            if not slots.acquire(blocking=False):
+                response = format_response({}, status="error",
+                                           message="Servidor ocupado; tente novamente em instantes")
+                response.status_code = 503
+                response.headers["Retry-After"] = "1"
+                return response
+            g._admission_slot = True
+        return None
+
+    @app.teardown_request
+    def _release_slot(exc):
+        if g.pop("_admission_slot", False):
+            slots.release()
+
+    return buckets
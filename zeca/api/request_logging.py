@@ -0,0 +1,63 @@
+"""
+Log de Requisições - Sistema Zeca Delivery
+==========================================
+
+Atribui um ID de correlação a cada requisição e registra um evento
+estruturado ao final (método, rota, status e duração).
+
+- O ID vem do cabeçalho `X-Request-ID` quando o cliente (ou o balanceador)
+  envia um valor válido; caso contrário é gerado
+- O ID é devolvido no cabeçalho `X-Request-ID` da resposta e aparece em
+  todos os logs emitidos durante a requisição
+
+Uso:
+    from zeca.api.request_logging import init_request_logging
+    init_request_logging(app)
+
+Autor: Demonstração do artigo Zeca Delivery
+"""
+
+from flask import g, request
+import time
+import re
+
+from zeca.common.structured_logging import correlation_id, get_logger, new_correlation_id
+
+logger = get_logger("api")
+
+# IDs aceitos do cliente: evita injetar conteúdo arbitrário nos logs
+ID_VALIDO = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+def init_request_logging(app):
+    """Registra os hooks de correlação e log de acesso na app"""
+
+    @app.before_request
+    def _log_start():
+        request_id = request.headers.get("X-Request-ID", "")
+        if not ID_VALIDO.match(request_id):
+            request_id = new_correlation_id()
+        g._log_token = correlation_id.set(request_id)
+        g._log_start = time.perf_counter()
+
+    @app.after_request
+    def _log_finish(response):
+        start = g.get("_log_start")
+        if start is not None:
+            response.headers["X-Request-ID"] = correlation_id.get()
+            logger.info("Requisição atendida", extra={
+                "metodo": request.method,
+                "rota": request.url_rule.rule if request.url_rule is not None else None,
+                "caminho": request.path,
+                "status": response.status_code,
+                "duracao_ms": round((time.perf_counter() - start) * 1000, 2)
+            })
+        return response
+
+    @app.teardown_request
+    def _log_end(exc):
+        if exc is not None:
+            logger.error("Requisição falhou", exc_info=exc, extra={"caminho": request.path})
+        token = g.pop("_log_token", None)
+        if token is not None:
+            correlation_id.reset(token)
@@ -0,0 +1,30 @@
+"""
+Respostas da API - Sistema Zeca Delivery
+========================================
+
+Envelope padrão das respostas JSON da API, compartilhado pelos endpoints e
+pelos componentes que respondem antes deles (ex.: limite de requisições).
+
+Uso:
+    from zeca.api.responses import format_response
+    return format_response(entregas)
+
+Autor: Demonstração do artigo Zeca Delivery
+"""
+
+from flask import jsonify
+from datetime import datetime
+
+
+def format_response(data, status="success", message=None):
+    """Formata resposta padrão da API"""
+    response = {
+        "status": status,
+        "timestamp": datetime.now().isoformat(),
+        "data": data
+    }
+    if message:
+        response["message"] = message
+    if isinstance(data, list):
+        response["total"] = len(data)
+    return jsonify(response)
@@ -0,0 +1,39 @@
+"""
+SLA da API - Sistema Zeca Delivery
+==================================
+
+Liga o acompanhamento de tempos de entrega (zeca/data/sla.py) ao
+armazenamento da API: cada inclusão e mudança de status feita pela API
+atualiza os percentis na hora, e, com log de eventos, o histórico gravado
+é processado na inicialização para que os números sobrevivam a reinícios.
+
+Uso:
+    from zeca.api.sla import init_sla
+    sla = init_sla(app, store)
+
+Autor: Demonstração do artigo Zeca Delivery
+"""
+
+from zeca.common.structured_logging import get_logger
+from zeca.data.sla import SlaTracker
+
+logger = get_logger("sla")
+
+
+def track_sla(store):
+    """Acompanhamento de SLA de um armazenamento: histórico do log mais as novas escritas"""
+    tracker = SlaTracker()
+    if store.events is not None:
+        count = tracker.load(store.events.events(), store.get)
+        logger.info("Histórico de SLA carregado", extra={
+            "arquivo": store.events.path, "eventos_processados": count
+        })
+    store.add_listener(tracker.observe)
+    return tracker
+
+
+def init_sla(app, store):
+    """Cria o acompanhamento de SLA e o registra como ouvinte do armazenamento"""
+    tracker = track_sla(store)
+    app.extensions["zeca_sla"] = tracker
+    return tracker
@@ -0,0 +1,328 @@
+"""
+Tenants (Franquias/Cidades) - Sistema Zeca Delivery
+===================================================
+
+Particiona a API por tenant (uma cozinha/franquia, normalmente uma cidade):
+cada tenant tem a sua partição, com armazenamento, índices de busca e de
+telefone/CEP, SLA, log de eventos e snapshot próprios. Um tenant com muito
+volume não deixa as consultas dos outros mais lentas (locks, listas e
+índices separados), e cada partição é carregada e descarregada sozinha.
+
+- Roteamento: cabeçalho `X-Tenant: rio-de-janeiro` ou prefixo de URL
+  `/t/rio-de-janeiro/api/...` (o prefixo é retirado antes do roteamento do
+  Flask, então todos os endpoints existentes valem por tenant). Sem tenant,
+  a requisição usa a partição padrão ("padrao"), a mesma de antes
+- Carga sob demanda: a partição de um tenant declarado é aberta na primeira
+  requisição (snapshot + log de eventos do tenant; sem arquivos, as
+  entregas de exemplo cuja cidade corresponde ao tenant) e os índices são
+  montados em segundo plano. Cada entrega de exemplo fica em uma única
+  partição: as das cidades declaradas saem da partição padrão
+- Descarga: grava o snapshot final, fecha o log e libera a memória; a
+  próxima requisição abre a partição de novo a partir dos arquivos
+
+Endpoints:
+- GET /api/tenants                - tenants declarados e quais estão carregados
+- POST /api/tenants/<nome>/load   - carrega a partição (administradores)
+- POST /api/tenants/<nome>/unload - descarrega a partição (administradores)
+
+Os endpoints de administração exigem o cabeçalho X-Admin-Token (o mesmo do
+profiling). Descarregue tenants sem tráfego: uma escrita já em andamento na
+partição descarregada falha.
+
+Configuração (app.config ou variáveis de ambiente):
+- TENANTS      (ZECA_TENANTS, nomes separados por vírgula; ex.:
+  "sao-paulo,rio-de-janeiro"). Tenant não declarado retorna 404
+- TENANTS_DIR  (ZECA_TENANTS_DIR) - diretório com uma pasta por tenant
+  (entregas.snap e eventos.jsonl). Sem ele as partições ficam só em memória
+  e não podem ser descarregadas
+
+Uso:
+    from zeca.api.tenants import Shard, init_tenants, current_shard
+    init_tenants(app, Shard(TENANT_PADRAO, store), ENTREGAS_MOCK)
+    current_shard().store.all()
+
+Autor: Demonstração do artigo Zeca Delivery
+"""
+
+from flask import current_app, g, request
+from datetime import datetime
+import unicodedata
+import threading
+import re
+import os
+
+from zeca.api.persistence import INTERVALO_PADRAO_S, SnapshotWriter, load_store, on_shutdown
+from zeca.api.profiling import is_admin
+from zeca.api.responses import format_response
+from zeca.api.sla import track_sla
+from zeca.common.structured_logging import get_logger
+from zeca.data.events import EventLog
+from zeca.data.lookup import DeliveryLookup
+from zeca.data.search import DeliverySearch
+
+TENANT_PADRAO = "padrao"
+CABECALHO_TENANT = "X-Tenant"
+PREFIXO_TENANT = "/t/"
+ARQUIVO_SNAPSHOT = "entregas.snap"
+ARQUIVO_EVENTOS = "eventos.jsonl"
+
+_NOME_VALIDO = re.compile(r"^[a-z0-9][a-z0-9-]{0,39}$")
+_NAO_ALFANUMERICO = re.compile(r"[^a-z0-9]+")
+
+logger = get_logger("tenants")
+
+
+def tenant_slug(cidade):
+    """Nome de tenant a partir da cidade: "São Paulo" -> "sao-paulo" """
+    ascii_text = unicodedata.normalize("NFKD", cidade).encode("ascii", "ignore").decode()
+    return _NAO_ALFANUMERICO.sub("-", ascii_text.lower()).strip("-")
+
+
+class Shard:
+    """Partição de um tenant: armazenamento, índices e SLA próprios"""
+
+    def __init__(self, name, store, busca=None, consulta=None, sla=None, writer=None):
+        self.name = name
+        self.store = store
+        self.busca = busca if busca is not None else DeliverySearch(store)
+        self.consulta = consulta if consulta is not None else DeliveryLookup(store)
+        self.sla = sla if sla is not None else track_sla(store)
+        self.writer = writer
+        self.loaded_at = datetime.now()
+
+    def warm(self):
+        """Monta os índices de busca e de telefone/CEP antes das primeiras consultas"""
+        self.busca.warm()
+        self.consulta.warm()
+
+    def close(self):
+        """Grava o snapshot final (se houver mudanças) e fecha o log de eventos"""
+        if self.writer is not None:
+            self.writer.stop()
+        if self.store.events is not None:
+            self.store.events.close()
+
+    def info(self):
+        return {
+            "tenant": self.name,
+            "carregado": True,
+            "total_entregas": len(self.store),
+            "carregado_em": self.loaded_at.isoformat(),
+            "ultima_escrita": self.store.last_write.isoformat()
+        }
+
+
+class TenantRegistry:
+    """Partições carregadas por tenant, abertas sob demanda"""
+
+    def __init__(self, default, names=(), directory=None, seed=(), interval=INTERVALO_PADRAO_S):
+        for name in names:
+            if not _NOME_VALIDO.match(name) or name == default.name:
+                raise ValueError(f"Nome de tenant inválido: {name!r}")
+        self.default = default
+        self.names = tuple(sorted(set(names)))
+        self.directory = directory
+        self.seed = seed
+        self.interval = interval
+        self._shards = {default.name: default}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _name_lock(self, name):
+        with self._lock:
+            return self._locks.setdefault(name, threading.Lock())
+
+    def _check(self, name):
+        if name != self.default.name and name not in self.names:
+            raise KeyError(name)
+
+    def get(self, name=None):
+        """
+        Partição do tenant (a padrão sem nome), carregando-a se preciso.
+
+        Gera KeyError para tenant não declarado.
+        """
+        if name is None:
+            return self.default
+        shard = self._shards.get(name)
+        if shard is not None:
+            return shard
+        self._check(name)
+        # Um lock por tenant: carregar um não bloqueia as requisições dos outros
+        with self._name_lock(name):
+            shard = self._shards.get(name)
+            if shard is None:
+                shard = self._open(name)
+                self._shards[name] = shard
+        return shard
+
+    def is_loaded(self, name):
+        return name in self._shards
+
+    def unload(self, name):
+        """
+        Descarrega a partição: snapshot final, log fechado e memória liberada.
+
+        Retorna False se ela não estava carregada. Gera KeyError para tenant
+        não declarado e ValueError para a partição padrão ou sem TENANTS_DIR
+        (as entregas seriam perdidas).
+        """
+        self._check(name)
+        if name == self.default.name:
+            raise ValueError("A partição padrão não pode ser descarregada")
+        if self.directory is None:
+            raise ValueError("Sem TENANTS_DIR as entregas do tenant seriam perdidas ao descarregar")
+        # Com o lock do tenant, uma nova requisição espera o fechamento e reabre dos arquivos
+        with self._name_lock(name):
+            shard = self._shards.pop(name, None)
+            if shard is None:
+                return False
+            shard.close()
+        logger.info("Tenant descarregado", extra={"tenant": name, "total_entregas": len(shard.store)})
+        return True
+
+    def status(self):
+        """Situação de cada tenant, a partição padrão primeiro"""
+        result = []
+        for name in (self.default.name,) + self.names:
+            shard = self._shards.get(name)
+            result.append(shard.info() if shard is not None else {"tenant": name, "carregado": False})
+        return result
+
+    def close(self):
+        """Fecha as partições dos tenants (a padrão é fechada pela persistência da API)"""
+        for name in self.names:
+            shard = self._shards.pop(name, None)
+            if shard is not None:
+                shard.close()
+
+    def _open(self, name):
+        seed = [e for e in self.seed if tenant_slug(e.get("cidade", "")) == name]
+        events = snapshot_path = writer = None
+        if self.directory is not None:
+            folder = os.path.join(self.directory, name)
+            os.makedirs(folder, exist_ok=True)
+            snapshot_path = os.path.join(folder, ARQUIVO_SNAPSHOT)
+            events = EventLog(os.path.join(folder, ARQUIVO_EVENTOS))
+
+        store = load_store(snapshot_path, seed, events)
+        if snapshot_path is not None:
+            writer = SnapshotWriter(store, snapshot_path, self.interval).start()
+        shard = Shard(name, store, writer=writer)
+        threading.Thread(target=shard.warm, name=f"zeca-indices-{name}", daemon=True).start()
+        logger.info("Tenant carregado", extra={"tenant": name, "total_entregas": len(store)})
+        return shard
+
+
+class TenantPrefixMiddleware:
+    """Encaminha /t/<tenant>/api/... para /api/..., com o tenant no ambiente WSGI"""
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    def __call__(self, environ, start_response):
+        path = environ.get("PATH_INFO", "")
+        if path.startswith(PREFIXO_TENANT):
+            name, sep, rest = path[len(PREFIXO_TENANT):].partition("/")
+            if name and sep:
+                environ["PATH_INFO"] = "/" + rest
+                environ["SCRIPT_NAME"] = environ.get("SCRIPT_NAME", "") + PREFIXO_TENANT + name
+                environ["zeca.tenant"] = name
+        return self.wsgi_app(environ, start_response)
+
+
+def requested_tenant():
+    """Tenant pedido pela requisição (prefixo de URL ou cabeçalho), ou None"""
+    by_prefix = request.environ.get("zeca.tenant")
+    by_header = request.headers.get(CABECALHO_TENANT)
+    if by_prefix and by_header and by_prefix != by_header:
+        raise ValueError(f"Tenant do prefixo ({by_prefix}) difere do cabeçalho {CABECALHO_TENANT} ({by_header})")
+    return by_prefix or by_header or None
+
+
+def current_shard():
+    """Partição do tenant da requisição atual"""
+    shard = g.get("_tenant_shard")
+    if shard is None:
+        shard = current_app.extensions["zeca_tenants"].default
+    return shard
+
+
+def _error(message, status_code):
+    response = format_response({}, status="error", message=message)
+    response.status_code = status_code
+    return response
+
+
+def _names(value):
+    if isinstance(value, str):
+        value = value.split(",")
+    return [name.strip() for name in value if name.strip()]
+
+
+def tenant_names(app):
+    """Tenants declarados na configuração da app (TENANTS / ZECA_TENANTS)"""
+    app.config.setdefault("TENANTS", os.environ.get("ZECA_TENANTS", ""))
+    return _names(app.config["TENANTS"])
+
+
+def default_seed(entregas, names):
+    """Entregas de exemplo da partição padrão: as de cidades sem tenant declarado"""
+    names = set(names)
+    return [e for e in entregas if tenant_slug(e.get("cidade", "")) not in names]
+
+
+def init_tenants(app, default, seed=()):
+    """Registra o roteamento por tenant e os endpoints de administração na app"""
+    names = tenant_names(app)
+    app.config.setdefault("TENANTS_DIR", os.environ.get("ZECA_TENANTS_DIR") or None)
+    app.config.setdefault("SNAPSHOT_INTERVALO_S",
+                          float(os.environ.get("ZECA_SNAPSHOT_INTERVALO_S", INTERVALO_PADRAO_S)))
+
+    registry = TenantRegistry(default, names, app.config["TENANTS_DIR"],
+                              seed, app.config["SNAPSHOT_INTERVALO_S"])
+    app.extensions["zeca_tenants"] = registry
+    app.wsgi_app = TenantPrefixMiddleware(app.wsgi_app)
+    on_shutdown(app, registry.close)
+
+    @app.before_request
+    def _resolve_tenant():
+        registry = app.extensions["zeca_tenants"]
+        try:
+            name = requested_tenant()
+            g._tenant_shard = registry.get(name)
+        except ValueError as e:
+            return _error(str(e), 400)
+        except KeyError:
+            return _error(f"Tenant desconhecido: {name}", 404)
+        return None
+
+    @app.route("/api/tenants")
+    def get_tenants():
+        """Tenants declarados e a situação de cada partição"""
+        return format_response(app.extensions["zeca_tenants"].status())
+
+    @app.route("/api/tenants/<name>/load", methods=["POST"])
+    def load_tenant(name):
+        """Carrega a partição do tenant (apenas administradores)"""
+        if not is_admin():
+            return _error("Requer cabeçalho X-Admin-Token válido", 403)
+        try:
+            return format_response(app.extensions["zeca_tenants"].get(name).info())
+        except KeyError:
+            return _error(f"Tenant desconhecido: {name}", 404)
+
+    @app.route("/api/tenants/<name>/unload", methods=["POST"])
+    def unload_tenant(name):
+        """Descarrega a partição do tenant (apenas administradores)"""
+        if not is_admin():
+            return _error("Requer cabeçalho X-Admin-Token válido", 403)
+        try:
+            unloaded = app.extensions["zeca_tenants"].unload(name)
+            return format_response({"tenant": name, "descarregado": unloaded})
+        except KeyError:
+            return _error(f"Tenant desconhecido: {name}", 404)
+        except ValueError as e:
+            return _error(str(e), 409)
+
+    return registry
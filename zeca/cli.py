@@ -0,0 +1,131 @@
+"""
+Comandos de Linha - Sistema Zeca Delivery
+=========================================
+
+Pontos de entrada dos comandos instalados:
+- zeca-api     -> api_main
+- zeca-report  -> report_main
+- zeca-data    -> data_main
+- zeca-loadtest -> loadtest_main
+
+As dependências pesadas são importadas dentro de cada comando: `zeca-data`
+não carrega Flask, openpyxl nem requests (`zeca-data import` só carrega
+requests com --api-url), e `zeca-report history` não carrega openpyxl
+nem requests.
+
+Autor: Demonstração do artigo Zeca Delivery
+"""
+
+import argparse
+import json
+import sys
+
+COMANDOS = ("api", "report", "data", "loadtest")
+
+
+def api_main(argv=None):
+    """zeca-api: inicia a API de entregas"""
+    from zeca.api.delivery_api import main
+    return main(argv)
+
+
+def report_main(argv=None):
+    """zeca-report: gera relatórios Excel (subcomandos schedule e history)"""
+    from zeca.reports.cli import main
+    return main(argv)
+
+
+def data_main(argv=None):
+    """zeca-data: mostra os dados de exemplo e suas estatísticas (subcomando import)"""
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "import":
+        return import_main(argv[1:])
+
+    parser = argparse.ArgumentParser(prog="zeca-data", description="Dados de exemplo - Sistema Zeca Delivery")
+    parser.add_argument("--json", action="store_true", help="Entregas em JSON (para outras ferramentas)")
+    parser.add_argument("--stats", action="store_true", help="Apenas as estatísticas, em JSON")
+    args = parser.parse_args(argv)
+
+    from zeca.data.sample_data import ENTREGAS_MOCK, get_sample_stats
+
+    if args.json:
+        print(json.dumps(ENTREGAS_MOCK, ensure_ascii=False, indent=2))
+        return 0
+
+    stats = get_sample_stats()
+    if args.stats:
+        print(json.dumps(stats, ensure_ascii=False, indent=2))
+        return 0
+
+    print("📊 Dados de Exemplo - Sistema Zeca Delivery")
+    print("=" * 50)
+    print(f"Total de entregas: {len(ENTREGAS_MOCK)}")
+    print(f"Valor total: R$ {stats['valor_total']}")
+    print(f"Taxa de entrega: {stats['taxa_entrega']}%")
+    print("Distribuição por status:", stats['distribuicao_status'])
+
+    print("\n📋 Entregas:")
+    for entrega in ENTREGAS_MOCK:
+        print(f"  {entrega['id']} - {entrega['cliente']} - {entrega['produto']} - {entrega['status']}")
+    return 0
+
+
+def loadtest_main(argv=None):
+    """zeca-loadtest: teste de carga da API com um mix de requisições"""
+    from zeca.api.loadtest import main
+    return main(argv)
+
+
+def import_main(argv=None):
+    """zeca-data import: valida um arquivo CSV/JSONL ou o envia para a API"""
+    parser = argparse.ArgumentParser(prog="zeca-data import",
+                                     description="Importação em massa de entregas (CSV ou JSONL)")
+    parser.add_argument("arquivo", help="Arquivo CSV (com cabeçalho) ou JSONL")
+    parser.add_argument("--formato", choices=["csv", "jsonl"], default=None,
+                        help="Formato do arquivo (padrão: pela extensão)")
+    parser.add_argument("--lote", type=int, default=None, help="Linhas por lote gravado")
+    parser.add_argument("--max-erros", type=int, default=None, help="Máximo de linhas rejeitadas detalhadas")
+    parser.add_argument("--api-url", default=None,
+                        help="Envia o arquivo para POST /api/entregas/import (sem esta opção apenas valida)")
+    args = parser.parse_args(argv)
+
+    from zeca.data.importer import detect_format, import_file, LOTE_PADRAO, MAX_ERROS_PADRAO
+
+    formato = args.formato or detect_format(args.arquivo)
+    lote = args.lote or LOTE_PADRAO
+    max_erros = MAX_ERROS_PADRAO if args.max_erros is None else args.max_erros
+
+    try:
+        if args.api_url:
+            import requests
+            with open(args.arquivo, "rb") as arquivo:
+                response = requests.post(f"{args.api_url}/api/entregas/import", data=arquivo,
+                                         params={"formato": formato, "lote": lote, "max_erros": max_erros},
+                                         headers={"Content-Type": "text/csv" if formato == "csv"
+                                                  else "application/x-ndjson"})
+            body = response.json()
+            if response.status_code != 200:
+                print(f"❌ {body.get('message', response.status_code)}", file=sys.stderr)
+                return 1
+            resultado = body["data"]
+        else:
+            resultado = import_file(args.arquivo, formato=formato, batch_size=lote,
+                                    max_errors=max_erros).to_dict()
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    print(json.dumps(resultado, ensure_ascii=False, indent=2))
+    return 0 if resultado["rejeitadas"] == 0 else 1
+
+
+def main(argv=None):
+    """`python -m zeca <api|report|data|loadtest> ...`"""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in COMANDOS:
+        print(f"Uso: python -m zeca {{{','.join(COMANDOS)}}} [opções]", file=sys.stderr)
+        return 2
+
+    command = {"api": api_main, "report": report_main, "data": data_main,
+               "loadtest": loadtest_main}[argv[0]]
+    return command(argv[1:])
@@ -0,0 +1 @@
+"""Utilitários compartilhados entre API e relatórios"""
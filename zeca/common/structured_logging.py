@@ -0,0 +1,206 @@
+"""
+Logging Estruturado - Sistema Zeca Delivery
+===========================================
+
+Configuração de logging compartilhada pela API e pelo gerador de relatórios.
+
+- Saída em JSON, uma linha por evento (ou texto legível com ZECA_LOG_FORMAT=texto)
+- QueueHandler/QueueListener: quem registra o log apenas enfileira o evento;
+  a escrita no stream acontece na thread do listener, fora da requisição
+  ou da geração do relatório
+- ID de correlação por requisição/execução (contextvar), incluído em todos
+  os eventos registrados dentro do mesmo contexto
+- Campos extras (`extra={...}`) viram chaves do JSON, como `etapa` e
+  `duracao_ms` registrados por `log_stage`
+
+Variáveis de ambiente:
+- ZECA_LOG_LEVEL  (padrão INFO)
+- ZECA_LOG_FORMAT (json ou texto, padrão json)
+
+Uso:
+    from zeca.common.structured_logging import configure_logging, get_logger
+    configure_logging()
+    logger = get_logger("reports")
+    logger.info("Relatório salvo", extra={"arquivo": filename})
+
+Autor: Demonstração do artigo Zeca Delivery
+"""
+
+from logging.handlers import QueueHandler, QueueListener
+from contextlib import contextmanager
+from datetime import datetime
+import contextvars
+import logging
+import atexit
+import queue
+import copy
+import time
+import json
+import uuid
+import sys
+import os
+
+LOGGER_RAIZ = "zeca"
+FORMATOS = ("json", "texto")
+
+correlation_id = contextvars.ContextVar("correlation_id", default=None)
+
+# Atributos padrão do LogRecord; o restante veio de `extra`
+_ATRIBUTOS_PADRAO = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message", "asctime", "correlation_id"
+}
+
+_listener = None
+
+
+def get_logger(name):
+    """Logger filho de `zeca` (ex.: get_logger("api") -> zeca.api)"""
+    return logging.getLogger(f"{LOGGER_RAIZ}.{name}")
+
+
+def new_correlation_id():
+    """Gera um ID de correlação curto"""
+    return uuid.uuid4().hex[:16]
+
+
+@contextmanager
+def correlation(value=None):
+    """
+    Define o ID de correlação dentro do bloco.
+
+    Sem `value`, mantém o ID já ativo (ex.: job do agendador chamando o
+    gerador) ou gera um novo.
+    """
+    token = correlation_id.set(value or correlation_id.get() or new_correlation_id())
+    try:
+        yield correlation_id.get()
+    finally:
+        correlation_id.reset(token)
+
+
+def extra_fields(record):
+    """Campos adicionados ao evento via `extra`"""
+    return {key: value for key, value in vars(record).items() if key not in _ATRIBUTOS_PADRAO}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formata cada evento como um objeto JSON em uma linha"""
+
+    def format(self, record):
+        event = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "mensagem": record.getMessage(),
+        }
+        if getattr(record, "correlation_id", None):
+            event["correlation_id"] = record.correlation_id
+        event.update(extra_fields(record))
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            event["excecao"] = record.exc_text
+        return json.dumps(event, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Formato legível para terminal, com os campos extras como chave=valor"""
+
+    def format(self, record):
+        moment = datetime.fromtimestamp(record.created).strftime("%H:%M:%S")
+        line = f"{moment} {record.levelname:<7} {record.getMessage()}"
+        fields = extra_fields(record)
+        if getattr(record, "correlation_id", None):
+            fields = {"correlation_id": record.correlation_id, **fields}
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            line += "\n" + record.exc_text
+        return line
+
+
+class ContextQueueHandler(QueueHandler):
+    """QueueHandler que captura o ID de correlação na thread de origem"""
+
+    def prepare(self, record):
+        # Executado na thread de origem: resolver mensagem, exceção e contexto
+        # antes de o evento atravessar a fila
+        record = copy.copy(record)
+        record.correlation_id = correlation_id.get()
+        record.message = record.getMessage()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+def configure_logging(level=None, fmt=None, stream=None):
+    """
+    Configura o logger `zeca` com fila e listener (idempotente).
+
+    Retorna o QueueListener em execução; ele é parado automaticamente ao
+    final do processo, descarregando os eventos pendentes.
+    """
+    global _listener
+
+    level = (level or os.environ.get("ZECA_LOG_LEVEL", "INFO")).upper()
+    fmt = fmt or os.environ.get("ZECA_LOG_FORMAT", "json")
+    if fmt not in FORMATOS:
+        raise ValueError(f"Formato de log inválido. Use: {', '.join(FORMATOS)}")
+
+    root = logging.getLogger(LOGGER_RAIZ)
+    root.setLevel(level)
+    if _listener is not None:
+        return _listener
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+
+    events = queue.SimpleQueue()
+    root.addHandler(ContextQueueHandler(events))
+    root.propagate = False
+
+    _listener = QueueListener(events, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging():
+    """Para o listener, escrevendo os eventos ainda na fila"""
+    global _listener
+
+    if _listener is None:
+        return
+    _listener.stop()
+    root = logging.getLogger(LOGGER_RAIZ)
+    for handler in list(root.handlers):
+        if isinstance(handler, ContextQueueHandler):
+            root.removeHandler(handler)
+    root.propagate = True
+    _listener = None
+
+
+@contextmanager
+def log_stage(logger, etapa, **fields):
+    """
+    Mede a duração de uma etapa e registra um evento ao final.
+
+    O dicionário retornado pode receber campos adicionais durante a etapa
+    (ex.: linhas processadas), incluídos no evento.
+    """
+    inicio = time.perf_counter()
+    try:
+        yield fields
+    except Exception:
+        logger.error("Etapa falhou", exc_info=True, extra=_stage_event(etapa, inicio, fields))
+        raise
+    logger.info("Etapa concluída", extra=_stage_event(etapa, inicio, fields))
+
+
+def _stage_event(etapa, inicio, fields):
+    return {"etapa": etapa, **fields, "duracao_ms": round((time.perf_counter() - inicio) * 1000, 2)}
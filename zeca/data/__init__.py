@@ -0,0 +1 @@
+"""Dados de exemplo, coordenadas de CEP e armazenamento de entregas"""
@@ -0,0 +1,50 @@
+"""
+Coordenadas por CEP - Sistema Zeca Delivery
+==========================================
+
+Tabela local de CEP para latitude/longitude usada pelo otimizador de rotas.
+Em um sistema real, estes dados viriam de uma base de geocodificação.
+
+Estrutura das chaves:
+- 5 dígitos: coordenada do setor do CEP (ex: "01310" - Av. Paulista)
+- 3 dígitos: centro aproximado da região, usado quando o setor não existe
+"""
+
+# Localização da cozinha do Zeca (ponto de saída dos entregadores)
+ORIGEM_PADRAO = (-23.5505, -46.6333)
+
+CEP_COORDENADAS = {
+    # Setores
+    "01001": (-23.5503, -46.6339),
+    "01010": (-23.5475, -46.6340),
+    "01012": (-23.5458, -46.6362),
+    "01029": (-23.5421, -46.6335),
+    "01045": (-23.5436, -46.6421),
+    "01302": (-23.5460, -46.6445),
+    "01305": (-23.5530, -46.6522),
+    "01310": (-23.5646, -46.6527),
+    "01311": (-23.5613, -46.6560),
+    "01317": (-23.5587, -46.6393),
+    "01401": (-23.5689, -46.6591),
+    "01414": (-23.5597, -46.6629),
+    "01426": (-23.5636, -46.6697),
+    "01451": (-23.5770, -46.6850),
+    "01504": (-23.5616, -46.6312),
+    "01522": (-23.5689, -46.6287),
+    "04004": (-23.5735, -46.6437),
+    "04101": (-23.5843, -46.6355),
+    "05402": (-23.5617, -46.6828),
+    "05010": (-23.5345, -46.6712),
+
+    # Regiões
+    "010": (-23.5480, -46.6340),
+    "011": (-23.5400, -46.6380),
+    "012": (-23.5370, -46.6420),
+    "013": (-23.5560, -46.6500),
+    "014": (-23.5680, -46.6680),
+    "015": (-23.5650, -46.6300),
+    "040": (-23.5800, -46.6400),
+    "041": (-23.5900, -46.6350),
+    "050": (-23.5350, -46.6750),
+    "054": (-23.5640, -46.6850),
+}
@@ -0,0 +1,321 @@
+"""
+Log de Eventos das Entregas - Sistema Zeca Delivery
+===================================================
+
+Log somente de acréscimo (JSONL) com o ciclo de vida de cada entrega:
+
+- "criada": entrega incluída, com o status inicial (e os dados completos
+  em "dados")
+- "status": mudança de status ("anterior" -> "status")
+
+Cada evento tem um número de sequência (`seq`) e o horário em que foi
+registrado. A partir dele é possível responder "quando a 102 saiu para
+entrega" e calcular quanto tempo cada entrega passou em cada status.
+
+Commit em grupo: `submit` apenas enfileira o evento e devolve a sequência;
+`wait(seq)` bloqueia até o evento estar gravado e sincronizado (fsync).
+A primeira thread que espera grava de uma vez todos os eventos pendentes
+com um único fsync; as que chegam enquanto isso formam o próximo grupo.
+Assim várias requisições simultâneas dividem o custo do fsync.
+
+Índice por entrega: para cada ID o log guarda a posição (byte) de seus
+eventos no arquivo, e o histórico é lido direto dessas posições.
+
+Compactação: depois que o estado até `seq` foi gravado em um snapshot, os
+eventos "criada" até `seq` perdem os dados completos (que já estão no
+snapshot). O histórico continua disponível e o log deixa de crescer com
+cada importação. A cópia do arquivo é feita sem o lock do log, então
+gravações e leituras continuam durante a compactação; o lock só é retomado
+para copiar os eventos gravados no meio tempo e trocar o arquivo.
+
+Uma falha de gravação marca o log como quebrado: novas gravações geram
+OSError até a API ser reiniciada (o log é relido e a cauda incompleta
+descartada).
+
+Autor: Demonstração do artigo Zeca Delivery
+"""
+
+from datetime import datetime
+import threading
+import json
+import os
+
+TIPOS_EVENTO = ("criada", "status")
+
+
+def _add_offset(index, entrega_id, offset):
+    # Um int por entrega no caso comum (um evento); lista quando há mais
+    current = index.get(entrega_id)
+    if current is None:
+        index[entrega_id] = offset
+    elif type(current) is list:
+        current.append(offset)
+    else:
+        index[entrega_id] = [current, offset]
+
+
+def _encode(event):
+    return (json.dumps(event, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+class EventLog:
+    """Log de eventos em arquivo JSONL, com commit em grupo e índice por entrega"""
+
+    def __init__(self, path, sync=True):
+        self.path = path
+        self.sync = sync
+        self._cond = threading.Condition()
+        self._pending = []
+        self._flushing = False
+        self._compacting = False
+        self._closed = False
+        self._error = None
+        self._index = {}
+        self.last_seq = 0
+        self.durable_seq = 0
+        self.commits = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "ab+")
+        self._size = self._scan()
+        self.durable_seq = self.last_seq
+
+    def _scan(self):
+        """Relê o arquivo, montando o índice; descarta uma cauda incompleta"""
+        self._index = {}
+        self._file.seek(0)
+        offset = 0
+        for line in self._file:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                event = json.loads(line)
+            except ValueError:
+                break
+            _add_offset(self._index, event["id"], offset)
+            self.last_seq = event["seq"]
+            offset += len(line)
+
+        if offset != self._file.seek(0, os.SEEK_END):
+            self._file.truncate(offset)
+        self._file.seek(0, os.SEEK_END)
+        return offset
+
+    def __len__(self):
+        return self.last_seq
+
+    @property
+    def closed(self):
+        """True depois de `close`"""
+        return self._closed
+
+    def skip_to(self, seq):
+        """Avança a numeração (log recriado depois de um snapshot mais novo que ele)"""
+        with self._cond:
+            if seq > self.last_seq and not self._pending:
+                self.last_seq = self.durable_seq = seq
+
+    def submit(self, entrega_id, tipo, **fields):
+        """Enfileira um evento; retorna a sequência para `wait`"""
+        if tipo not in TIPOS_EVENTO:
+            raise ValueError(f"Tipo de evento inválido: {tipo}")
+        with self._cond:
+            if self._error is not None:
+                raise OSError(f"Log de eventos indisponível: {self._error}")
+            self.last_seq += 1
+            event = {"seq": self.last_seq, "ts": datetime.now().isoformat(),
+                     "id": entrega_id, "tipo": tipo, **fields}
+            self._pending.append(event)
+            return self.last_seq
+
+    def wait(self, seq):
+        """Bloqueia até o evento `seq` estar gravado (commit em grupo)"""
+        with self._cond:
+            while self.durable_seq < seq:
+                if self._error is not None:
+                    raise OSError(f"Log de eventos indisponível: {self._error}")
+                if self._flushing:
+                    self._cond.wait()
+                    continue
+                self._flush_pending()
+
+    def append(self, entrega_id, tipo, **fields):
+        """Registra um evento e espera a gravação"""
+        seq = self.submit(entrega_id, tipo, **fields)
+        self.wait(seq)
+        return seq
+
+    def _flush_pending(self):
+        """Grava o grupo pendente (chamado com o lock; libera-o durante a escrita)"""
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self._flushing = True
+        self._cond.release()
+        error = None
+        try:
+            offset = self._size
+            lines = []
+            positions = []
+            for event in batch:
+                line = _encode(event)
+                positions.append((event["id"], offset))
+                offset += len(line)
+                lines.append(line)
+
+            self._file.write(b"".join(lines))
+            self._file.flush()
+            if self.sync:
+                os.fsync(self._file.fileno())
+        except (OSError, TypeError, ValueError) as e:
+            error = e
+        finally:
+            self._cond.acquire()
+
+        self._flushing = False
+        if error is not None:
+            self._error = error
+        else:
+            for entrega_id, position in positions:
+                _add_offset(self._index, entrega_id, position)
+            self._size = offset
+            self.durable_seq = batch[-1]["seq"]
+            self.commits += 1
+        self._cond.notify_all()
+        if error is not None:
+            raise OSError(f"Log de eventos indisponível: {error}") from error
+
+    def _read_at(self, offset):
+        """Evento gravado na posição informada"""
+        fd = self._file.fileno()
+        size = 512
+        while True:
+            data = os.pread(fd, size, offset)
+            end = data.find(b"\n")
+            if end >= 0 or len(data) < size:
+                return json.loads(data[:end] if end >= 0 else data)
+            size *= 4
+
+    def history(self, entrega_id):
+        """Eventos de uma entrega, em ordem (sem os dados completos)"""
+        with self._cond:
+            offsets = self._index.get(entrega_id)
+            if offsets is None:
+                return []
+            offsets = offsets if type(offsets) is list else [offsets]
+            events = [self._read_at(offset) for offset in offsets]
+        for event in events:
+            event.pop("dados", None)
+        return events
+
+    def events(self, after_seq=0):
+        """Percorre os eventos gravados com sequência maior que `after_seq`"""
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    return
+                event = json.loads(line)
+                if event["seq"] > after_seq:
+                    yield event
+
+    def compact(self, upto_seq):
+        """
+        Remove os dados completos dos eventos "criada" até `upto_seq` (já em snapshot).
+
+        Retorna os tamanhos antes e depois, ou None se o log já foi fechado.
+        """
+        self.wait(upto_seq)
+        with self._cond:
+            while self._compacting:
+                self._cond.wait()
+            if self._closed:
+                return None
+            if self._error is not None:
+                raise OSError(f"Log de eventos indisponível: {self._error}")
+            self._compacting = True
+            prefix = self._size
+
+        tmp_path = f"{self.path}.tmp"
+        try:
+            # Eventos até `prefix`, já gravados: copiados sem o lock
+            index = {}
+            with open(self.path, "rb") as src, open(tmp_path, "wb") as out:
+                size = self._copy_compacted(src, out, prefix, upto_seq, index)
+                out.flush()
+                os.fsync(out.fileno())
+
+            with self._cond:
+                while self._flushing:
+                    self._cond.wait()
+                if self._closed:
+                    os.remove(tmp_path)
+                    return None
+                # Eventos gravados durante a cópia (poucos): copiados com o lock
+                before = self._size
+                tail = os.pread(self._file.fileno(), before - prefix, prefix)
+                with open(tmp_path, "ab") as out:
+                    for line in tail.splitlines(keepends=True):
+                        _add_offset(index, json.loads(line)["id"], size)
+                        size += len(line)
+                    out.write(tail)
+                    out.flush()
+                    os.fsync(out.fileno())
+                os.replace(tmp_path, self.path)
+                self._file.close()
+                self._file = open(self.path, "ab+")
+                self._index = index
+                self._size = size
+                return {"ate_seq": upto_seq, "bytes_antes": before, "bytes_depois": size}
+        finally:
+            with self._cond:
+                self._compacting = False
+                self._cond.notify_all()
+
+    def _copy_compacted(self, src, out, limit, upto_seq, index):
+        """Copia os primeiros `limit` bytes do log sem os dados já em snapshot; retorna o tamanho copiado"""
+        read = written = 0
+        for line in src:
+            if read >= limit:
+                break
+            read += len(line)
+            event = json.loads(line)
+            if "dados" in event and event["seq"] <= upto_seq:
+                del event["dados"]
+                line = _encode(event)
+            _add_offset(index, event["id"], written)
+            out.write(line)
+            written += len(line)
+        return written
+
+    def close(self):
+        """Grava os eventos pendentes e fecha o arquivo"""
+        with self._cond:
+            if self._closed:
+                return
+            seq = self.last_seq
+        if seq:
+            self.wait(seq)
+        with self._cond:
+            self._closed = True
+            self._file.close()
+
+
+def time_in_status(events, now=None):
+    """
+    Segundos que a entrega passou em cada status, a partir do histórico.
+
+    O status atual conta até `now` (padrão: agora).
+    """
+    now = now or datetime.now()
+    durations = {}
+    status, since = None, None
+    for event in events:
+        moment = datetime.fromisoformat(event["ts"])
+        if status is not None:
+            durations[status] = durations.get(status, 0.0) + (moment - since).total_seconds()
+        status, since = event["status"], moment
+    if status is not None:
+        durations[status] = durations.get(status, 0.0) + (now - since).total_seconds()
+    return {key: round(value, 3) for key, value in durations.items()}
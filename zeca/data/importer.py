@@ -0,0 +1,225 @@
+"""
+Importação de Entregas - Sistema Zeca Delivery
+==============================================
+
+Importação em massa de entregas a partir dos arquivos exportados pelo
+PDV (CSV) ou de arquivos JSONL (um objeto JSON por linha).
+
+O arquivo é lido em streaming, em blocos de `lote` linhas: cada bloco é
+validado contra o esquema (zeca/data/schema.py) e as entregas válidas, já
+como registros Delivery, são incluídas no armazenamento de uma só vez.
+Linhas inválidas ou com ID repetido são rejeitadas individualmente, com o
+número da linha e os erros de cada campo, sem interromper a importação.
+A inclusão de cada bloco confere os IDs com o lock do armazenamento, então
+importações simultâneas não duplicam entregas.
+
+Formato CSV:
+- primeira linha com os nomes das colunas (em qualquer ordem; colunas
+  extras são ignoradas)
+- separador vírgula ou ponto e vírgula (detectado pelo cabeçalho)
+- toda linha com o mesmo número de campos do cabeçalho (linhas com campos
+  a mais ou a menos são rejeitadas, nunca lidas desalinhadas)
+- UTF-8, com ou sem BOM
+
+Como os blocos são gravados à medida que o arquivo é lido, um erro de
+estrutura no meio do arquivo (ex.: codificação inválida) interrompe a
+importação mantendo os blocos já gravados.
+
+Uso:
+    zeca-data import pedidos.csv                  # apenas valida
+    zeca-data import pedidos.csv --api-url http://localhost:5000
+
+Autor: Demonstração do artigo Zeca Delivery
+"""
+
+from itertools import chain, islice
+from operator import itemgetter
+import json
+import time
+import csv
+import io
+
+from zeca.data.schema import CAMPOS, convert_row
+
+FORMATOS = ("csv", "jsonl")
+LOTE_PADRAO = 5000
+MAX_ERROS_PADRAO = 100
+
+TIPOS_JSONL = ("application/x-ndjson", "application/jsonl", "application/json-lines")
+
+
+class ImportResult:
+    """Contagens, erros por linha e tempo de uma importação"""
+
+    def __init__(self, formato, max_errors=MAX_ERROS_PADRAO):
+        self.formato = formato
+        self.max_errors = max_errors
+        self.lidas = 0
+        self.importadas = 0
+        self.rejeitadas = 0
+        self.lotes = 0
+        self.erros = []
+        self.duracao_s = 0.0
+
+    @property
+    def linhas_por_segundo(self):
+        return round(self.lidas / self.duracao_s) if self.duracao_s > 0 else 0
+
+    def reject(self, linha, entrega_id, erros):
+        """Registra uma linha rejeitada (detalhes limitados a max_errors)"""
+        self.rejeitadas += 1
+        if len(self.erros) < self.max_errors:
+            self.erros.append({"linha": linha, "id": entrega_id, "erros": erros})
+
+    def to_dict(self):
+        return {
+            "formato": self.formato,
+            "lidas": self.lidas,
+            "importadas": self.importadas,
+            "rejeitadas": self.rejeitadas,
+            "lotes": self.lotes,
+            "duracao_s": round(self.duracao_s, 3),
+            "linhas_por_segundo": self.linhas_por_segundo,
+            "erros": self.erros,
+            "erros_omitidos": self.rejeitadas - len(self.erros)
+        }
+
+
+def detect_format(filename=None, mimetype=None):
+    """Formato pelo nome do arquivo ou tipo de conteúdo (padrão: csv)"""
+    if filename and filename.lower().endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    if mimetype in TIPOS_JSONL:
+        return "jsonl"
+    return "csv"
+
+
+def text_stream(raw):
+    """Texto UTF-8 (com ou sem BOM) sobre um fluxo binário, sem carregá-lo inteiro"""
+    return io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+
+
+def _csv_chunks(stream, size):
+    """Blocos de linhas do CSV, com os valores na ordem de CAMPOS"""
+    first = stream.readline()
+    if not first.strip():
+        raise ValueError("Arquivo vazio: cabeçalho com os nomes das colunas não encontrado")
+    delimiter = ";" if first.count(";") > first.count(",") else ","
+    reader = csv.reader(chain([first], stream), delimiter=delimiter)
+
+    header = [name.strip() for name in next(reader)]
+    missing = [campo for campo in CAMPOS if campo not in header]
+    if missing:
+        raise ValueError(f"Colunas ausentes no cabeçalho: {', '.join(missing)}")
+
+    positions = [header.index(campo) for campo in CAMPOS]
+    if positions == list(range(len(header))):
+        # Colunas na ordem de CAMPOS: convert_row rejeita linhas de outro tamanho
+        reorder = None
+    else:
+        getter = itemgetter(*positions)
+        width = len(header)
+
+        def reorder(row):
+            if len(row) != width:
+                return f"esperados {width} campos, recebidos {len(row)}"
+            return list(getter(row))
+
+    line = 2
+    while True:
+        rows = list(islice(reader, size))
+        if not rows:
+            return
+        yield line, rows if reorder is None else [reorder(row) for row in rows]
+        line += len(rows)
+
+
+def _jsonl_chunks(stream, size):
+    """Blocos de linhas do JSONL (None para linha em branco, str para JSON inválido)"""
+    line = 1
+    while True:
+        lines = list(islice(stream, size))
+        if not lines:
+            return
+        rows = []
+        for text in lines:
+            if not text.strip():
+                rows.append(None)
+                continue
+            try:
+                obj = json.loads(text)
+            except ValueError as e:
+                rows.append(f"JSON inválido: {e}")
+                continue
+            if isinstance(obj, dict):
+                rows.append([obj.get(campo) for campo in CAMPOS])
+            else:
+                rows.append("JSON inválido: esperado um objeto por linha")
+        yield line, rows
+        line += len(lines)
+
+
+def import_stream(stream, store=None, formato="csv", batch_size=LOTE_PADRAO,
+                  max_errors=MAX_ERROS_PADRAO):
+    """
+    Importa entregas de um fluxo de texto.
+
+    Com `store=None` apenas valida (IDs repetidos são verificados dentro
+    do arquivo). Retorna um ImportResult; erros no cabeçalho ou formato
+    desconhecido geram ValueError.
+
+    Os IDs já cadastrados quando a importação começa são rejeitados na
+    leitura; os incluídos por outra escrita durante a importação são
+    rejeitados por `DeliveryStore.add_many`, ao gravar o bloco.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato inválido. Use: {', '.join(FORMATOS)}")
+    if batch_size < 1:
+        raise ValueError("Parâmetro 'lote' deve ser maior que zero")
+
+    result = ImportResult(formato, max_errors=max_errors)
+    chunks = _csv_chunks if formato == "csv" else _jsonl_chunks
+    known_ids = store.ids() if store is not None else set()
+    started = time.perf_counter()
+
+    try:
+        for line, rows in chunks(stream, batch_size):
+            batch = []
+            lines = {}
+            for offset, values in enumerate(rows):
+                if values is None:
+                    continue
+                result.lidas += 1
+                if isinstance(values, str):
+                    result.reject(line + offset, None, [values])
+                    continue
+
+                entrega, erros = convert_row(values)
+                if entrega is not None:
+                    if entrega.id not in known_ids:
+                        known_ids.add(entrega.id)
+                        batch.append(entrega)
+                        lines[entrega.id] = (line + offset, values[0])
+                        continue
+                    erros = [f"id: {entrega.id} já cadastrado"]
+                result.reject(line + offset, values[0] if values else None, erros)
+
+            recusadas = store.add_many(batch) if batch and store is not None else []
+            for entrega in recusadas:
+                result.reject(*lines[entrega.id], [f"id: {entrega.id} já cadastrado"])
+            if len(batch) > len(recusadas):
+                result.importadas += len(batch) - len(recusadas)
+                result.lotes += 1
+    finally:
+        result.duracao_s = time.perf_counter() - started
+
+    return result
+
+
+def import_file(path, store=None, formato=None, batch_size=LOTE_PADRAO,
+                max_errors=MAX_ERROS_PADRAO):
+    """Importa entregas de um arquivo CSV ou JSONL (formato pela extensão)"""
+    formato = formato or detect_format(path)
+    with open(path, encoding="utf-8-sig", newline="") as stream:
+        return import_stream(stream, store, formato=formato, batch_size=batch_size,
+                             max_errors=max_errors)
@@ -0,0 +1,149 @@
+"""
+Consulta por Telefone e CEP - Sistema Zeca Delivery
+===================================================
+
+Índices em memória para localizar entregas pelo telefone do cliente ou
+pelo CEP, como faz a integração da central de atendimento ao receber uma
+ligação.
+
+- Telefone e CEP são normalizados para apenas dígitos: "(11) 98765-4321",
+  "11987654321" e "+55 11 98765-4321" são o mesmo telefone; "01010-000" e
+  "01010000", o mesmo CEP
+- Telefone: dicionário número -> IDs, consulta O(1)
+- CEP: dicionário CEP -> IDs mais a lista ordenada dos CEPs distintos; um
+  prefixo ("01310" = uma região) vira uma faixa dessa lista (bisect)
+
+Como a busca textual (zeca/data/search.py), os índices recebem apenas as
+entregas novas a cada consulta e guardam IDs; os registros (com o status
+atual) vêm do armazenamento.
+
+Uso:
+    from zeca.data.lookup import DeliveryLookup
+    consulta = DeliveryLookup(store)
+    consulta.by_phone("(11) 98765-4321", abertas=True)
+    consulta.by_cep_prefix("01310")
+
+Autor: Demonstração do artigo Zeca Delivery
+"""
+
+from bisect import bisect_left, insort
+import heapq
+import re
+
+from zeca.data.schema import CODIGOS_STATUS
+from zeca.data.search import StoreIndex
+
+STATUS_ABERTOS = ("pendente", "em_transito")
+DIGITOS_CEP = 8
+
+_NAO_DIGITO = re.compile(r"\D")
+_CODIGOS_ABERTOS = frozenset(CODIGOS_STATUS[status] for status in STATUS_ABERTOS)
+
+
+def normalize_phone(telefone):
+    """Telefone só com dígitos, sem o código do país (55) e sem zeros à esquerda"""
+    digits = _NAO_DIGITO.sub("", telefone).lstrip("0")
+    if len(digits) > 11 and digits.startswith("55"):
+        digits = digits[2:]
+    return digits
+
+
+def normalize_cep(cep):
+    """CEP só com dígitos"""
+    return _NAO_DIGITO.sub("", cep)
+
+
+def _add_id(index, key, entrega_id):
+    # Um int por chave no caso comum (um registro); lista quando há mais
+    current = index.get(key)
+    if current is None:
+        index[key] = entrega_id
+        return True
+    if type(current) is list:
+        current.append(entrega_id)
+    else:
+        index[key] = [current, entrega_id]
+    return False
+
+
+def _ids(value):
+    if value is None:
+        return []
+    return value if type(value) is list else [value]
+
+
+class DeliveryLookup(StoreIndex):
+    """Índices por telefone e CEP mantidos em dia com um DeliveryStore"""
+
+    def _reset(self):
+        self._phones = {}
+        self._ceps = {}
+        self._cep_list = []
+
+    def _add(self, entregas):
+        phones, ceps = self._phones, self._ceps
+        new_ceps = []
+        for entrega in entregas:
+            phone = normalize_phone(entrega.telefone)
+            if phone:
+                _add_id(phones, int(phone), entrega.id)
+            cep = normalize_cep(entrega.cep)
+            if _add_id(ceps, cep, entrega.id):
+                new_ceps.append(cep)
+
+        if len(new_ceps) > 1000:
+            self._cep_list = sorted(ceps)
+        else:
+            for cep in new_ceps:
+                insort(self._cep_list, cep)
+
+    def select(self, ids, abertas=False, limit=None, offset=0):
+        """
+        Registros dos IDs, por ordem de ID (só pendentes/em trânsito com
+        `abertas`), a partir de `offset` e até `limit` registros.
+
+        Retorna (total de entregas selecionadas, página de entregas).
+        """
+        if not abertas:
+            # Sem filtro de status o total é conhecido: só a página é lida do armazenamento
+            end = len(ids) if limit is None else offset + limit
+            page = heapq.nsmallest(end, ids) if end < len(ids) else sorted(ids)
+            return len(ids), self._records(page[offset:])
+
+        entregas = [e for e in self._records(sorted(ids)) if e.status_code in _CODIGOS_ABERTOS]
+        end = len(entregas) if limit is None else offset + limit
+        return len(entregas), entregas[offset:end]
+
+    def phone_ids(self, telefone):
+        """IDs das entregas com o telefone informado"""
+        phone = normalize_phone(telefone)
+        if not phone:
+            raise ValueError("Telefone deve conter dígitos")
+        self.refresh()
+        with self._lock:
+            return set(_ids(self._phones.get(int(phone))))
+
+    def cep_prefix_ids(self, prefixo):
+        """IDs das entregas cujo CEP começa com o prefixo informado"""
+        prefix = normalize_cep(prefixo)
+        if not prefix or len(prefix) > DIGITOS_CEP:
+            raise ValueError(f"Prefixo de CEP deve ter de 1 a {DIGITOS_CEP} dígitos")
+        self.refresh()
+        with self._lock:
+            if len(prefix) == DIGITOS_CEP:
+                return set(_ids(self._ceps.get(prefix)))
+            ceps = self._cep_list
+            start = bisect_left(ceps, prefix)
+            end = bisect_left(ceps, prefix + ":", start)  # ":" vem logo depois de "9"
+            ids = set()
+            for cep in ceps[start:end]:
+                ids.update(_ids(self._ceps[cep]))
+            return ids
+
+    def by_phone(self, telefone, abertas=False):
+        """Entregas do telefone (só pendentes/em trânsito com `abertas`), por ordem de ID"""
+        return self.select(self.phone_ids(telefone), abertas)[1]
+
+    def by_cep_prefix(self, prefixo, abertas=False):
+        """Entregas da região do prefixo de CEP, por ordem de ID"""
+        return self.select(self.cep_prefix_ids(prefixo), abertas)[1]
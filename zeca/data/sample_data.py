@@ -101,39 +101,72 @@ ENTREGAS_MOCK = [
     }
 ]
 
-# Estatísticas dos dados mockados
-def get_sample_stats():
-    """Retorna estatísticas dos dados de exemplo"""
-    total_entregas = len(ENTREGAS_MOCK)
-    total_valor = sum(e['valor'] for e in ENTREGAS_MOCK)
+# Estatísticas das entregas
+class StatsAccumulator:
+    """
+    Estatísticas calculadas incrementalmente, uma entrega por vez.
     
-    status_count = {}
-    for entrega in ENTREGAS_MOCK:
-        status = entrega['status']
-        status_count[status] = status_count.get(status, 0) + 1
+    Permite calcular as estatísticas na mesma passada que percorre as
+    entregas para outra finalidade (ex.: gravar as linhas da planilha).
+    """
     
-    entregues = status_count.get('entregue', 0)
-    taxa_entrega = (entregues / total_entregas * 100) if total_entregas > 0 else 0
+    def __init__(self):
+        self.total_entregas = 0
+        self.total_valor = 0.0
+        self.status_count = {}
+        self.prioridade_count = {}
+        self.prioridade_valor = {}
     
-    return {
-        "total_entregas": total_entregas,
-        "valor_total": round(total_valor, 2),
-        "taxa_entrega": round(taxa_entrega, 1),
-        "distribuicao_status": status_count,
-        "valor_medio": round(total_valor / total_entregas, 2) if total_entregas > 0 else 0
-    }
-
-if __name__ == "__main__":
-    # Demonstração dos dados quando executado diretamente
-    print("📊 Dados de Exemplo - Sistema Zeca Delivery")
-    print("=" * 50)
-    print(f"Total de entregas: {len(ENTREGAS_MOCK)}")
+    def add(self, entrega):
+        """Inclui uma entrega nas estatísticas"""
+        self.total_entregas += 1
+        self.total_valor += entrega['valor']
+        status = entrega['status']
+        self.status_count[status] = self.status_count.get(status, 0) + 1
+        prioridade = entrega['prioridade']
+        self.prioridade_count[prioridade] = self.prioridade_count.get(prioridade, 0) + 1
+        self.prioridade_valor[prioridade] = self.prioridade_valor.get(prioridade, 0.0) + entrega['valor']
     
-    stats = get_sample_stats()
-    print(f"Valor total: R$ {stats['valor_total']}")
-    print(f"Taxa de entrega: {stats['taxa_entrega']}%")
-    print("Distribuição por status:", stats['distribuicao_status'])
+    def result(self):
+        """Estatísticas no formato de /api/stats"""
+        total_entregas = self.total_entregas
+        entregues = self.status_count.get('entregue', 0)
+        taxa_entrega = (entregues / total_entregas * 100) if total_entregas > 0 else 0
+        
+        return {
+            "total_entregas": total_entregas,
+            "valor_total": round(self.total_valor, 2),
+            "taxa_entrega": round(taxa_entrega, 1),
+            "distribuicao_status": dict(self.status_count),
+            "distribuicao_prioridade": dict(self.prioridade_count),
+            "valor_por_prioridade": {p: round(v, 2) for p, v in self.prioridade_valor.items()},
+            "valor_medio": round(self.total_valor / total_entregas, 2) if total_entregas > 0 else 0
+        }
+
+def compute_stats(entregas):
+    """Calcula estatísticas de uma lista de entregas (mesmo formato de /api/stats)"""
+    accumulator = StatsAccumulator()
+    for entrega in entregas:
+        accumulator.add(entrega)
+    return accumulator.result()
+
+def compare_stats(local, remote, tolerance=0.01):
+    """
+    Compara duas estatísticas no formato de /api/stats.
     
-    print("\n📋 Entregas:")
-    for entrega in ENTREGAS_MOCK:
-        print(f"  {entrega['id']} - {entrega['cliente']} - {entrega['produto']} - {entrega['status']}")
+    Retorna a lista de divergências (vazia quando batem); valores numéricos
+    são comparados com a tolerância informada.
+    """
+    divergencias = []
+    for key in sorted(set(local) | set(remote)):
+        a, b = local.get(key), remote.get(key)
+        if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+            if abs(a - b) > tolerance:
+                divergencias.append(f"{key}: local={a} api={b}")
+        elif a != b:
+            divergencias.append(f"{key}: local={a} api={b}")
+    return divergencias
+
+def get_sample_stats():
+    """Retorna estatísticas dos dados de exemplo"""
+    return compute_stats(ENTREGAS_MOCK)
@@ -0,0 +1,234 @@
+"""
+Esquema das Entregas - Sistema Zeca Delivery
+============================================
+
+Campos, valores aceitos e o registro `Delivery` usado pela API, pela
+importação e pelos relatórios (ver "Estrutura dos Dados" em docs/API.md).
+
+`Delivery` guarda uma entrega já validada em `__slots__` (sem o
+dicionário de cada instância): `entrega_prevista` fica convertida em
+datetime e status/prioridade como códigos inteiros. O formato JSON da API
+continua o mesmo: `to_dict()` devolve o dicionário original e `entrega[campo]`
+funciona como em um dicionário, para o código que lê os campos por nome.
+
+`convert_row` recebe os valores na ordem de CAMPOS (texto do CSV ou
+valores JSON) e devolve o registro ou a lista de erros da linha. O caminho
+sem erros faz apenas as conversões necessárias; os erros campo a campo só
+são apurados quando a conversão falha.
+
+`entrega_prevista` é guardada como horário local sem fuso: datas com
+deslocamento ("2025-08-04T19:30:00-03:00") são convertidas para o fuso do
+servidor na validação, para que todas possam ser comparadas (lotes, rotas,
+SLA).
+
+Autor: Demonstração do artigo Zeca Delivery
+"""
+
+from datetime import datetime
+
+CAMPOS = (
+    "id", "cliente", "endereco", "bairro", "cidade", "estado", "cep",
+    "produto", "quantidade", "valor", "telefone", "entrega_prevista",
+    "status", "prioridade",
+)
+
+STATUS_VALIDOS = ("pendente", "em_transito", "entregue", "cancelado")
+PRIORIDADES_VALIDAS = ("normal", "alta", "urgente")
+
+# Código inteiro de cada status/prioridade (posição nas tuplas acima)
+CODIGOS_STATUS = {status: codigo for codigo, status in enumerate(STATUS_VALIDOS)}
+CODIGOS_PRIORIDADE = {prioridade: codigo for codigo, prioridade in enumerate(PRIORIDADES_VALIDAS)}
+
+# Textos exibidos na planilha, indexados pelo código
+ROTULOS_STATUS = tuple(status.replace("_", " ").title() for status in STATUS_VALIDOS)
+ROTULOS_PRIORIDADE = tuple(prioridade.title() for prioridade in PRIORIDADES_VALIDAS)
+
+# Posição dos campos convertidos em CAMPOS
+_ID, _QUANTIDADE, _VALOR, _PREVISTA, _STATUS, _PRIORIDADE = (
+    CAMPOS.index(c) for c in ("id", "quantidade", "valor", "entrega_prevista", "status", "prioridade")
+)
+
+_fromisoformat = datetime.fromisoformat
+
+
+class Delivery:
+    """Entrega validada, com data prevista convertida e status/prioridade codificados"""
+
+    __slots__ = ("id", "cliente", "endereco", "bairro", "cidade", "estado", "cep",
+                 "produto", "quantidade", "valor", "telefone", "prevista",
+                 "status_code", "prioridade_code")
+
+    def __init__(self, id, cliente, endereco, bairro, cidade, estado, cep, produto,
+                 quantidade, valor, telefone, prevista, status_code, prioridade_code):
+        self.id = id
+        self.cliente = cliente
+        self.endereco = endereco
+        self.bairro = bairro
+        self.cidade = cidade
+        self.estado = estado
+        self.cep = cep
+        self.produto = produto
+        self.quantidade = quantidade
+        self.valor = valor
+        self.telefone = telefone
+        self.prevista = prevista
+        self.status_code = status_code
+        self.prioridade_code = prioridade_code
+
+    @property
+    def status(self):
+        return STATUS_VALIDOS[self.status_code]
+
+    @property
+    def prioridade(self):
+        return PRIORIDADES_VALIDAS[self.prioridade_code]
+
+    @property
+    def entrega_prevista(self):
+        return self.prevista.isoformat()
+
+    @classmethod
+    def from_dict(cls, data):
+        """Registro a partir do dicionário da API; ValueError se inválido"""
+        if isinstance(data, cls):
+            return data
+        entrega, erros = convert_row([data.get(campo) for campo in CAMPOS])
+        if erros:
+            raise ValueError(f"Entrega {data.get('id')} inválida: {'; '.join(erros)}")
+        return entrega
+
+    def to_dict(self):
+        """Dicionário no formato JSON da API"""
+        return {
+            "id": self.id,
+            "cliente": self.cliente,
+            "endereco": self.endereco,
+            "bairro": self.bairro,
+            "cidade": self.cidade,
+            "estado": self.estado,
+            "cep": self.cep,
+            "produto": self.produto,
+            "quantidade": self.quantidade,
+            "valor": self.valor,
+            "telefone": self.telefone,
+            "entrega_prevista": self.prevista.isoformat(),
+            "status": STATUS_VALIDOS[self.status_code],
+            "prioridade": PRIORIDADES_VALIDAS[self.prioridade_code]
+        }
+
+    def astuple(self):
+        """Valores na ordem de __slots__ (`Delivery(*tupla)` reconstrói o registro)"""
+        return (self.id, self.cliente, self.endereco, self.bairro, self.cidade, self.estado,
+                self.cep, self.produto, self.quantidade, self.valor, self.telefone,
+                self.prevista, self.status_code, self.prioridade_code)
+
+    def __getitem__(self, campo):
+        if campo not in _CAMPOS_SET:
+            raise KeyError(campo)
+        return getattr(self, campo)
+
+    def get(self, campo, default=None):
+        return getattr(self, campo) if campo in _CAMPOS_SET else default
+
+    def __eq__(self, other):
+        if isinstance(other, Delivery):
+            return self.astuple() == other.astuple()
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Delivery(id={self.id!r}, cliente={self.cliente!r}, status={self.status!r})"
+
+
+_CAMPOS_SET = frozenset(CAMPOS)
+
+
+def as_delivery(entrega):
+    """Aceita um Delivery ou um dicionário no formato da API"""
+    return entrega if type(entrega) is Delivery else Delivery.from_dict(entrega)
+
+
+def prevista_of(entrega):
+    """Data prevista como datetime, de um Delivery ou de um dicionário"""
+    if type(entrega) is Delivery:
+        return entrega.prevista
+    return parse_prevista(entrega["entrega_prevista"])
+
+
+def parse_prevista(value):
+    """Data prevista ISO 8601; com fuso, convertida para o horário local sem fuso"""
+    prevista = _fromisoformat(value)
+    if prevista.tzinfo is not None:
+        prevista = prevista.astimezone().replace(tzinfo=None)
+    return prevista
+
+
+def parse_valor(value):
+    """Valor em reais; aceita vírgula decimal ("45,90") vinda do PDV"""
+    if isinstance(value, str):
+        value = float(value.replace(",", ".")) if "," in value else float(value)
+    else:
+        value = float(value)
+    if not value >= 0:
+        raise ValueError(value)
+    return value
+
+
+def parse_quantidade(value):
+    """Quantidade inteira e positiva"""
+    value = int(value)
+    if value < 1:
+        raise ValueError(value)
+    return value
+
+
+def convert_row(values):
+    """
+    Converte os valores de uma linha (na ordem de CAMPOS) em Delivery.
+
+    Retorna (entrega, None) ou (None, [erros]).
+    """
+    if len(values) == len(CAMPOS) and "" not in values and None not in values:
+        try:
+            status = CODIGOS_STATUS.get(values[_STATUS])
+            prioridade = CODIGOS_PRIORIDADE.get(values[_PRIORIDADE])
+            if status is not None and prioridade is not None:
+                quantidade = int(values[_QUANTIDADE])
+                valor = values[_VALOR]
+                valor = float(valor.replace(",", ".") if type(valor) is str else valor)
+                if quantidade >= 1 and valor >= 0:
+                    return Delivery(int(values[_ID]), values[1], values[2], values[3], values[4],
+                                    values[5], values[6], values[7], quantidade, valor, values[10],
+                                    parse_prevista(values[_PREVISTA]), status, prioridade), None
+        except (TypeError, ValueError):
+            pass
+    return None, row_errors(values)
+
+
+def row_errors(values):
+    """Lista os erros de cada campo de uma linha inválida"""
+    if len(values) != len(CAMPOS):
+        return [f"esperados {len(CAMPOS)} campos, recebidos {len(values)}"]
+
+    erros = []
+    for campo, value in zip(CAMPOS, values):
+        if value is None or value == "":
+            erros.append(f"{campo}: obrigatório")
+            continue
+        try:
+            if campo == "id":
+                int(value)
+            elif campo == "quantidade":
+                parse_quantidade(value)
+            elif campo == "valor":
+                parse_valor(value)
+            elif campo == "entrega_prevista":
+                _fromisoformat(value)
+            elif campo == "status" and value not in CODIGOS_STATUS:
+                erros.append(f"status: '{value}' inválido (use {', '.join(STATUS_VALIDOS)})")
+            elif campo == "prioridade" and value not in CODIGOS_PRIORIDADE:
+                erros.append(f"prioridade: '{value}' inválida (use {', '.join(PRIORIDADES_VALIDAS)})")
+        except (TypeError, ValueError):
+            erros.append(f"{campo}: valor inválido '{value}'")
+    return erros
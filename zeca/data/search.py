@@ -0,0 +1,200 @@
+"""
+Busca de Entregas - Sistema Zeca Delivery
+=========================================
+
+Índice invertido em memória sobre cliente, endereço e produto, para o
+atendimento encontrar entregas por nome ou rua sem baixar a lista inteira.
+
+- Normalização: minúsculas e sem acentos ("João" = "joao",
+  "Consolação" = "consolacao"); termos são sequências de letras e dígitos
+- Prefixo: cada termo da consulta casa com os termos do índice que começam
+  com ele ("cons" encontra "consolacao"), pela faixa do vocabulário
+  ordenado (bisect); termos de um caractere só casam exatamente
+- Todos os termos da consulta precisam casar (E); a interseção começa pelo
+  termo mais seletivo
+- Atualização incremental: a cada consulta o índice inclui apenas as
+  entregas novas desde a anterior (`DeliveryStore.since`); `replace_all`
+  no armazenamento provoca uma reconstrução
+
+O índice guarda IDs; status e demais campos vêm do armazenamento no
+momento da consulta.
+
+Uso:
+    from zeca.data.search import DeliverySearch
+    busca = DeliverySearch(store)
+    busca.warm()                  # opcional: monta o índice antes da 1ª consulta
+    total, entregas = busca.search("joao consolacao", limit=20)
+
+Autor: Demonstração do artigo Zeca Delivery
+"""
+
+from bisect import bisect_left, insort
+from collections import defaultdict
+from functools import lru_cache
+from itertools import chain
+from operator import attrgetter
+import unicodedata
+import threading
+import heapq
+import re
+
+CAMPOS_BUSCA = ("cliente", "endereco", "produto")
+LIMITE_PADRAO = 50
+MIN_PREFIXO = 2
+
+_TERMO = re.compile(r"[a-z0-9]+")
+
+
+# Palavras se repetem muito mais que textos inteiros (nomes, ruas): a
+# normalização é feita e guardada por palavra
+@lru_cache(maxsize=65536)
+def _word_terms(word):
+    if not word.isascii():
+        word = unicodedata.normalize("NFKD", word).encode("ascii", "ignore").decode("ascii")
+    return tuple(_TERMO.findall(word.lower()))
+
+
+def tokenize(text):
+    """Termos normalizados (minúsculas, sem acentos) de um texto"""
+    return list(chain.from_iterable(map(_word_terms, text.split())))
+
+
+class SearchIndex:
+    """Índice invertido termo -> IDs, com vocabulário ordenado para prefixos"""
+
+    def __init__(self, fields=CAMPOS_BUSCA):
+        self.fields = fields
+        self._texts = attrgetter(*fields) if len(fields) > 1 else (lambda e: (getattr(e, fields[0]),))
+        self._postings = defaultdict(list)
+        self._vocabulary = []
+        self.documents = 0
+
+    def add(self, entregas):
+        """Indexa entregas (registros Delivery)"""
+        postings = self._postings
+        texts = self._texts
+        word_terms = _word_terms
+        new_terms = []
+        for entrega in entregas:
+            words = " ".join(texts(entrega)).split()
+            entrega_id = entrega.id
+            for term in set(chain.from_iterable(map(word_terms, words))):
+                ids = postings[term]
+                if not ids:
+                    new_terms.append(term)
+                ids.append(entrega_id)
+            self.documents += 1
+
+        # Vocabulário ordenado: poucos termos novos entram no lugar; muitos,
+        # reordenação completa
+        if len(new_terms) > 1000:
+            self._vocabulary = sorted(postings)
+        else:
+            for term in new_terms:
+                insort(self._vocabulary, term)
+
+    def _terms_for(self, token):
+        """Termos do índice que casam com um termo da consulta"""
+        if len(token) < MIN_PREFIXO:
+            return [token] if token in self._postings else []
+        vocabulary = self._vocabulary
+        start = bisect_left(vocabulary, token)
+        end = bisect_left(vocabulary, token + "\x7f", start)
+        return vocabulary[start:end]
+
+    def search(self, query):
+        """IDs que casam com todos os termos da consulta (conjunto)"""
+        tokens = set(tokenize(query))
+        if not tokens:
+            return set()
+
+        # (tamanho estimado, listas de IDs) por termo, do mais seletivo ao menos
+        candidates = []
+        for token in tokens:
+            lists = [self._postings[term] for term in self._terms_for(token)]
+            if not lists:
+                return set()
+            candidates.append((sum(map(len, lists)), lists))
+        candidates.sort(key=lambda item: item[0])
+
+        result = set()
+        for ids in candidates[0][1]:
+            result.update(ids)
+        for _, lists in candidates[1:]:
+            matched = set()
+            for ids in lists:
+                matched.update(result.intersection(ids))
+            result = matched
+            if not result:
+                break
+        return result
+
+
+class StoreIndex:
+    """
+    Base dos índices mantidos em dia com um DeliveryStore.
+
+    A cada `refresh` o índice recebe apenas as entregas incluídas desde o
+    anterior; se o armazenamento foi substituído (`replace_all`), recomeça.
+    Subclasses implementam `_reset()` e `_add(entregas)`, chamados com o lock.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        self._generation = None
+        self._position = 0
+        self._reset()
+
+    def _reset(self):
+        raise NotImplementedError
+
+    def _add(self, entregas):
+        raise NotImplementedError
+
+    def refresh(self):
+        """Indexa as entregas incluídas desde a última atualização"""
+        with self._lock:
+            generation, novas = self.store.since(self._position, self._generation)
+            if generation != self._generation:
+                self._reset()
+                self._generation = generation
+                self._position = 0
+            self._add(novas)
+            self._position += len(novas)
+
+    def warm(self):
+        """Monta o índice antes da primeira consulta (ex.: em segundo plano na inicialização)"""
+        self.refresh()
+        # As consultas buscam as entregas por ID: monta também esse índice do armazenamento
+        self.store.build_index()
+
+    def _records(self, ids):
+        """Registros atuais (status em dia) dos IDs encontrados"""
+        return self.store.get_many(ids)[0]
+
+
+class DeliverySearch(StoreIndex):
+    """Índice de busca mantido em dia com um DeliveryStore"""
+
+    def __init__(self, store, fields=CAMPOS_BUSCA):
+        self.fields = fields
+        super().__init__(store)
+
+    def _reset(self):
+        self._index = SearchIndex(self.fields)
+
+    def _add(self, entregas):
+        self._index.add(entregas)
+
+    def search(self, query, limit=LIMITE_PADRAO):
+        """
+        Entregas que casam com a consulta, por ordem de ID.
+
+        Retorna (total de entregas encontradas, até `limit` entregas).
+        """
+        self.refresh()
+        with self._lock:
+            ids = self._index.search(query)
+        selected = heapq.nsmallest(limit, ids) if limit < len(ids) else sorted(ids)
+        return len(ids), self._records(selected)
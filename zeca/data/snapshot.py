@@ -0,0 +1,310 @@
+"""
+Snapshot Binário das Entregas - Sistema Zeca Delivery
+=====================================================
+
+Formato colunar compacto para gravar as entregas do dia e reabri-las
+rapidamente quando a API reinicia.
+
+Layout do arquivo:
+- "ZECASNAP" + tamanho do cabeçalho (uint32) + cabeçalho JSON
+- colunas numéricas de largura fixa (array nativo, alinhadas em 8 bytes):
+  id, quantidade, valor, data prevista (microssegundos desde 1970, hora
+  local; as datas já chegam sem fuso, ver parse_prevista em
+  zeca/data/schema.py), status e prioridade (códigos)
+- colunas de texto como códigos uint32 + dicionário de valores distintos
+  (deslocamentos uint32 + bytes UTF-8): bairros, cidades e produtos
+  repetidos ocupam espaço uma única vez
+
+`Snapshot` abre o arquivo com mmap: as colunas são memoryviews sobre as
+páginas do arquivo (sem cópia), então abrir um snapshot custa apenas o
+cabeçalho, e processos criados por fork depois da abertura compartilham
+as mesmas páginas. Os registros Delivery só são montados quando lidos;
+filtros por status percorrem apenas a coluna de códigos.
+
+A gravação usa arquivo temporário + os.replace: quem lê nunca encontra um
+snapshot pela metade. `SnapshotColumns.extend_from` copia as colunas de um
+snapshot aberto para o próximo, sem montar os registros.
+
+Uso:
+    from zeca.data.snapshot import write_snapshot, Snapshot
+    write_snapshot("logs/entregas.snap", store.all())
+    snapshot = Snapshot("logs/entregas.snap")
+
+Autor: Demonstração do artigo Zeca Delivery
+"""
+
+from datetime import datetime, timedelta
+from array import array
+import struct
+import json
+import mmap
+import sys
+import os
+
+from zeca.data.schema import Delivery
+
+MAGICO = b"ZECASNAP"
+VERSAO = 2
+
+# Colunas numéricas: nome -> código do módulo array
+COLUNAS_NUMERICAS = (
+    ("id", "q"), ("quantidade", "q"), ("valor", "d"), ("prevista", "q"),
+    ("status", "B"), ("prioridade", "B"),
+)
+COLUNAS_TEXTO = ("cliente", "endereco", "bairro", "cidade", "estado", "cep", "produto", "telefone")
+
+_EPOCA = datetime(1970, 1, 1)
+_MICROSSEGUNDO = timedelta(microseconds=1)
+_CABECALHO = struct.Struct("<8sI")
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+def _extend_array(target, view):
+    """Copia uma coluna do snapshot para o array (cópia de bytes, sem iterar)"""
+    with view.cast("B") as raw:
+        target.frombytes(raw)
+
+
+def _micros(prevista):
+    """Data prevista em microssegundos desde 1970 (hora local)"""
+    return (prevista - _EPOCA) // _MICROSSEGUNDO
+
+
+class SnapshotColumns:
+    """
+    Colunas de um snapshot em montagem: linhas de registros Delivery
+    (`extend`) ou copiadas de outro snapshot sem montar os registros
+    (`extend_from`), gravadas com `write`.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self._numeric = {name: array(code) for name, code in COLUNAS_NUMERICAS}
+        self._codes = {name: array("I") for name in COLUNAS_TEXTO}
+        self._dictionaries = {name: {} for name in COLUNAS_TEXTO}
+
+    def extend(self, entregas):
+        """Acrescenta registros Delivery"""
+        numeric, codes, dictionaries = self._numeric, self._codes, self._dictionaries
+        for entrega in entregas:
+            numeric["id"].append(entrega.id)
+            numeric["quantidade"].append(entrega.quantidade)
+            numeric["valor"].append(entrega.valor)
+            numeric["prevista"].append(_micros(entrega.prevista))
+            numeric["status"].append(entrega.status_code)
+            numeric["prioridade"].append(entrega.prioridade_code)
+            for name in COLUNAS_TEXTO:
+                values = dictionaries[name]
+                value = getattr(entrega, name)
+                code = values.get(value)
+                if code is None:
+                    code = values[value] = len(values)
+                codes[name].append(code)
+            self.rows += 1
+
+    def extend_from(self, snapshot):
+        """Acrescenta as linhas de um snapshot aberto, copiando as colunas"""
+        for name, _ in COLUNAS_NUMERICAS:
+            _extend_array(self._numeric[name], snapshot.column(name))
+        for name in COLUNAS_TEXTO:
+            values = self._dictionaries[name]
+            if not values:
+                # Dicionário vazio: os códigos do snapshot valem como estão
+                values.update((value, code) for code, value in enumerate(snapshot.strings(name).values()))
+                _extend_array(self._codes[name], snapshot.column(name))
+                continue
+            mapping = []
+            for value in snapshot.strings(name).values():
+                code = values.get(value)
+                if code is None:
+                    code = values[value] = len(values)
+                mapping.append(code)
+            self._codes[name].extend(map(mapping.__getitem__, snapshot.column(name)))
+        self.rows += len(snapshot)
+
+    def write(self, path, meta=None):
+        """Grava o snapshot (ver write_snapshot); retorna {"linhas", "tamanho_bytes"}"""
+        # Seções (nome, bytes) na ordem em que serão gravadas
+        sections = [(name, self._numeric[name]) for name, _ in COLUNAS_NUMERICAS]
+        for name in COLUNAS_TEXTO:
+            encoded = [value.encode("utf-8") for value in self._dictionaries[name]]
+            offsets = array("I", [0])
+            for item in encoded:
+                offsets.append(offsets[-1] + len(item))
+            sections += [(name, self._codes[name]), (f"{name}.offsets", offsets),
+                         (f"{name}.dados", b"".join(encoded))]
+
+        layout = {}
+        position = 0
+        for name, data in sections:
+            position = _align(position)
+            typecode = data.typecode if isinstance(data, array) else "B"
+            layout[name] = {"offset": position, "tipo": typecode, "tamanho": len(data)}
+            position += len(data) * (data.itemsize if isinstance(data, array) else 1)
+
+        header = json.dumps({
+            "versao": VERSAO,
+            "linhas": self.rows,
+            "ordem_bytes": sys.byteorder,
+            "criado_em": datetime.now().isoformat(),
+            "meta": meta or {},
+            "secoes": layout,
+        }).encode("utf-8")
+        data_start = _align(_CABECALHO.size + len(header))
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_CABECALHO.pack(MAGICO, len(header)))
+            f.write(header)
+            for name, data in sections:
+                f.seek(data_start + layout[name]["offset"])
+                f.write(data.tobytes() if isinstance(data, array) else data)
+            f.truncate(data_start + position)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+        return {"linhas": self.rows, "tamanho_bytes": data_start + position}
+
+
+def write_snapshot(path, entregas, meta=None):
+    """
+    Grava as entregas (registros Delivery) em um snapshot.
+
+    `meta` (dicionário serializável em JSON) vai para o cabeçalho, ex.: a
+    sequência do log de eventos coberta pelo snapshot.
+
+    Retorna {"linhas", "tamanho_bytes"}.
+    """
+    columns = SnapshotColumns()
+    columns.extend(entregas)
+    return columns.write(path, meta)
+
+
+class StringDictionary:
+    """Valores distintos de uma coluna de texto, decodificados sob demanda"""
+
+    def __init__(self, offsets, data):
+        self._offsets = offsets
+        self._data = data
+        self._cache = {}
+        self._values = None
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, code):
+        if self._values is not None:
+            return self._values[code]
+        value = self._cache.get(code)
+        if value is None:
+            value = self._cache[code] = str(self._data[self._offsets[code]:self._offsets[code + 1]], "utf-8")
+        return value
+
+    def values(self):
+        """Todos os valores, na ordem dos códigos"""
+        if self._values is None:
+            data, offsets = self._data, self._offsets
+            self._values = [str(data[offsets[i]:offsets[i + 1]], "utf-8") for i in range(len(self))]
+            self._cache = None
+        return self._values
+
+
+class Snapshot:
+    """Snapshot aberto via mmap, com acesso às colunas sem cópia"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._open()
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self):
+        buffer = memoryview(self._mmap)
+        self._views = [buffer]
+        if len(buffer) < _CABECALHO.size:
+            raise ValueError(f"Snapshot inválido: {self.path}")
+        magic, header_size = _CABECALHO.unpack_from(buffer)
+        if magic != MAGICO:
+            raise ValueError(f"Snapshot inválido: {self.path}")
+        header = json.loads(bytes(buffer[_CABECALHO.size:_CABECALHO.size + header_size]))
+        if header["versao"] != VERSAO:
+            raise ValueError(f"Versão de snapshot não suportada: {header['versao']}")
+        if header["ordem_bytes"] != sys.byteorder:
+            raise ValueError("Snapshot gravado em máquina com outra ordem de bytes")
+
+        self.header = header
+        self.created_at = datetime.fromisoformat(header["criado_em"])
+        self.meta = header.get("meta", {})
+        data_start = _align(_CABECALHO.size + header_size)
+        self._columns = {}
+        for name, section in header["secoes"].items():
+            start = data_start + section["offset"]
+            view = buffer[start:start + section["tamanho"] * array(section["tipo"]).itemsize]
+            self._views.append(view)
+            if section["tipo"] != "B":
+                view = view.cast(section["tipo"])
+                self._views.append(view)
+            self._columns[name] = view
+        self._strings = {
+            name: StringDictionary(self._columns[f"{name}.offsets"], self._columns[f"{name}.dados"])
+            for name in COLUNAS_TEXTO
+        }
+
+    def __len__(self):
+        return self.header["linhas"]
+
+    def column(self, name):
+        """Coluna numérica ou de códigos (memoryview sobre o arquivo)"""
+        return self._columns[name]
+
+    def strings(self, name):
+        """Dicionário de valores de uma coluna de texto"""
+        return self._strings[name]
+
+    def indices_where(self, column, value):
+        """Posições em que a coluna tem o valor informado"""
+        view = self._columns[column]
+        return [i for i, item in enumerate(view) if item == value]
+
+    def records(self, indices=None):
+        """Monta os registros Delivery (todos ou das posições informadas)"""
+        c = self._columns
+        numeric = [c[name] for name, _ in COLUNAS_NUMERICAS]
+        if indices is None:
+            texts = [map(self._strings[name].values().__getitem__, c[name]) for name in COLUNAS_TEXTO]
+            rows = zip(*numeric, *texts)
+        else:
+            rows = ([column[i] for column in numeric]
+                    + [self._strings[name][c[name][i]] for name in COLUNAS_TEXTO]
+                    for i in indices)
+
+        # Horários previstos se repetem muito (mesmos horários de entrega):
+        # cada instante vira datetime uma única vez
+        datetimes = {}
+        records = []
+        append = records.append
+        for (id_, quantidade, valor, prevista, status, prioridade,
+             cliente, endereco, bairro, cidade, estado, cep, produto, telefone) in rows:
+            moment = datetimes.get(prevista)
+            if moment is None:
+                moment = datetimes[prevista] = _EPOCA + prevista * _MICROSSEGUNDO
+            append(Delivery(id_, cliente, endereco, bairro, cidade, estado, cep, produto,
+                            quantidade, valor, telefone, moment, status, prioridade))
+        return records
+
+    def close(self):
+        """Libera o mapeamento (as colunas deixam de ser válidas)"""
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._columns = {}
+        self._strings = {}
+        self._mmap.close()
@@ -0,0 +1,406 @@
+"""
+Armazenamento de Entregas - Sistema Zeca Delivery
+=================================================
+
+Backend em memória das entregas usado pela API. Centraliza leitura e
+escrita atrás de um lock e registra os metadados que o health check
+precisa: quantidade de registros, horário da última escrita e se o
+backend está respondendo.
+
+As entregas são guardadas como registros `Delivery` (zeca/data/schema.py),
+validados na entrada; dicionários no formato da API são convertidos ao
+serem incluídos.
+
+Com `DeliveryStore.from_snapshot(caminho)` as entregas vêm de um snapshot
+binário (zeca/data/snapshot.py) aberto via mmap: contagem, IDs, filtro por
+status, o índice por ID (`build_index`), as leituras por ID e as entregas
+entregues aos índices de busca (`since`) usam as colunas do arquivo, sem
+montar todos os registros. `all()` monta registros temporários a cada
+chamada e `save_snapshot` copia as colunas do arquivo para o novo snapshot;
+os registros só ficam montados na memória na primeira mudança de status de
+uma entrega do snapshot. Até lá as páginas do arquivo continuam
+compartilhadas entre processos.
+
+Posições: as linhas do snapshot vêm primeiro e as entregas incluídas depois
+da abertura continuam a partir de `len(snapshot)`; montar os registros não
+muda as posições.
+
+Com um log de eventos (zeca/data/events.py), inclusões e mudanças de status
+são registradas como eventos: a escrita na memória acontece com o lock, e a
+espera pela gravação do evento (commit em grupo) acontece fora dele, para
+que requisições simultâneas dividam o mesmo fsync. `apply_event` reaplica
+eventos do log na inicialização, sem registrá-los de novo.
+
+Ouvintes (`add_listener`) recebem cada inclusão e mudança de status feita
+pela API (`fn(tipo, entrega, horario)`), na ordem das escritas; são chamados
+com o lock do armazenamento e devem ser rápidos (ex.: métricas de SLA).
+
+Diário de mudanças: cada inclusão e mudança de status recebe uma versão
+crescente e entra em um diário de tamanho limitado (DIARIO_MAX_PADRAO
+entradas). Clientes que mantêm uma cópia local guardam o token de
+sincronização (`sync_token`) e pedem só o que mudou depois dele
+(`changes_since`); se o token for de outra instância do armazenamento
+(reinício, `replace_all`) ou mais antigo que o diário, a resposta pede uma
+ressincronização completa.
+
+Em um sistema real esta classe seria substituída por um acesso ao banco
+de dados com a mesma interface.
+
+Autor: Demonstração do artigo Zeca Delivery
+"""
+
+from collections import deque
+from datetime import datetime
+from itertools import islice
+import threading
+import secrets
+
+from zeca.data.schema import CODIGOS_STATUS, Delivery, as_delivery
+from zeca.data.snapshot import Snapshot, SnapshotColumns
+
+DIARIO_MAX_PADRAO = 100_000
+
+
+def _with_status(entrega, status_code):
+    """Cópia do registro com outro status (registros não são alterados no lugar)"""
+    return Delivery(*entrega.astuple()[:-2], status_code, entrega.prioridade_code)
+
+
+class DeliveryStore:
+    """Entregas em memória com lock e metadados de escrita"""
+
+    backend = "memoria"
+
+    def __init__(self, entregas=(), snapshot=None, events=None, journal_size=DIARIO_MAX_PADRAO):
+        self._lock = threading.RLock()
+        self._snapshot = snapshot
+        self._entregas = [as_delivery(e) for e in entregas]
+        self._positions = None
+        self._listeners = []
+        self.events = events
+        self.generation = 0
+        self._journal = deque(maxlen=journal_size)
+        self.epoch = secrets.token_hex(4)
+        self.version = 0
+        self.created_at = datetime.now()
+        self.last_write = snapshot.created_at if snapshot is not None else self.created_at
+        # Última sequência do log de eventos coberta pelo snapshot de abertura
+        self.snapshot_seq = snapshot.meta.get("seq", 0) if snapshot is not None else 0
+
+    @classmethod
+    def from_snapshot(cls, path, events=None):
+        """Abre as entregas gravadas em um snapshot binário"""
+        return cls(snapshot=Snapshot(path), events=events)
+
+    def __len__(self):
+        with self._lock:
+            snapshot = self._snapshot
+            return (len(snapshot) if snapshot is not None else 0) + len(self._entregas)
+
+    def _offset(self):
+        """Quantidade de linhas ainda no snapshot (com o lock)"""
+        return len(self._snapshot) if self._snapshot is not None else 0
+
+    def _record(self, position):
+        """Registro da posição, do snapshot ou da lista (com o lock)"""
+        offset = self._offset()
+        if position < offset:
+            return self._snapshot.records((position,))[0]
+        return self._entregas[position - offset]
+
+    def _materialize(self):
+        """Monta os registros do snapshot e libera o mapeamento (com o lock)"""
+        if self._snapshot is not None:
+            self._entregas = self._snapshot.records() + self._entregas
+            self._snapshot.close()
+            self._snapshot = None
+
+    def all(self):
+        """Retorna uma cópia da lista de entregas"""
+        with self._lock:
+            if self._snapshot is None:
+                return list(self._entregas)
+            # Registros montados só para a resposta; o snapshot continua mapeado
+            return self._snapshot.records() + self._entregas
+
+    def by_status(self, status):
+        """Retorna as entregas com o status informado"""
+        code = CODIGOS_STATUS.get(status)
+        with self._lock:
+            base = []
+            if self._snapshot is not None:
+                base = self._snapshot.records(self._snapshot.indices_where("status", code))
+            return base + [e for e in self._entregas if e.status_code == code]
+
+    def add_listener(self, listener):
+        """Registra `listener(tipo, entrega, horario)` para inclusões e mudanças de status"""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def _notify(self, tipo, entregas, moment):
+        for listener in self._listeners:
+            for entrega in entregas:
+                listener(tipo, entrega, moment)
+
+    def _journal_changes(self, tipo, entregas):
+        """Registra as mudanças no diário (com o lock)"""
+        version = self.version
+        self._journal.extend((version + i, e.id, tipo) for i, e in enumerate(entregas, 1))
+        self.version = version + len(entregas)
+
+    def _index(self):
+        """Índice ID -> posição, montado sob demanda (com o lock)"""
+        if self._positions is None:
+            positions = {}
+            if self._snapshot is not None:
+                positions = {entrega_id: i for i, entrega_id in enumerate(self._snapshot.column("id"))}
+            offset = self._offset()
+            positions.update((e.id, offset + i) for i, e in enumerate(self._entregas))
+            self._positions = positions
+        return self._positions
+
+    def _position(self, entrega_id):
+        """Posição da entrega (com o lock)"""
+        return self._index().get(entrega_id)
+
+    def build_index(self):
+        """Monta o índice por ID antes das primeiras consultas (sem montar os registros)"""
+        with self._lock:
+            self._index()
+
+    def _append(self, entregas):
+        """Acrescenta registros à lista e ao índice (com o lock)"""
+        start = self._offset() + len(self._entregas)
+        self._entregas.extend(entregas)
+        if self._positions is not None:
+            for offset, entrega in enumerate(entregas):
+                self._positions[entrega.id] = start + offset
+
+    def _log_created(self, entregas):
+        """Enfileira os eventos "criada" (com o lock); retorna a última sequência"""
+        seq = 0
+        for entrega in entregas:
+            seq = self.events.submit(entrega.id, "criada", status=entrega.status,
+                                     dados=entrega.to_dict())
+        return seq
+
+    def add(self, entrega):
+        """Inclui uma entrega; gera ValueError se o ID já estiver cadastrado"""
+        recusadas = self.add_many([entrega])
+        if recusadas:
+            raise ValueError(f"Entrega {recusadas[0].id} já cadastrada")
+
+    def add_many(self, entregas):
+        """
+        Inclui um lote de entregas com uma única aquisição do lock.
+
+        IDs já cadastrados ou repetidos no lote não são incluídos (a
+        verificação e a inclusão acontecem com o mesmo lock, então escritas
+        simultâneas não duplicam IDs). Retorna a lista das entregas recusadas.
+        """
+        entregas = [as_delivery(e) for e in entregas]
+        recusadas = []
+        seq = 0
+        with self._lock:
+            positions = self._index()
+            novas, ids = [], set()
+            for entrega in entregas:
+                if entrega.id in positions or entrega.id in ids:
+                    recusadas.append(entrega)
+                else:
+                    ids.add(entrega.id)
+                    novas.append(entrega)
+            if not novas:
+                return recusadas
+            entregas = novas
+            self._append(entregas)
+            self.last_write = datetime.now()
+            if self.events is not None:
+                seq = self._log_created(entregas)
+            self._journal_changes("criada", entregas)
+            self._notify("criada", entregas, self.last_write)
+        if seq:
+            self.events.wait(seq)
+        return recusadas
+
+    def get(self, entrega_id):
+        """Entrega com o ID informado, ou None"""
+        with self._lock:
+            position = self._position(entrega_id)
+            return None if position is None else self._record(position)
+
+    def get_many(self, ids):
+        """
+        Entregas dos IDs informados, na ordem pedida, com uma única aquisição
+        do lock. Retorna (encontradas, IDs não encontrados).
+        """
+        found, missing = [], []
+        with self._lock:
+            positions, record = self._index(), self._record
+            for entrega_id in ids:
+                position = positions.get(entrega_id)
+                if position is None:
+                    missing.append(entrega_id)
+                else:
+                    found.append(record(position))
+        return found, missing
+
+    def update_status(self, entrega_id, status):
+        """
+        Altera o status de uma entrega e registra o evento.
+
+        Gera ValueError para status inválido e KeyError para ID inexistente.
+        Retorna a entrega atualizada.
+        """
+        code = CODIGOS_STATUS.get(status)
+        if code is None:
+            raise ValueError(f"Status inválido: {status}")
+        seq = 0
+        with self._lock:
+            position = self._position(entrega_id)
+            if position is None:
+                raise KeyError(entrega_id)
+            # Registros não mudam no lugar: a alteração monta os do snapshot
+            self._materialize()
+            current = self._entregas[position]
+            if current.status_code == code:
+                return current
+            updated = _with_status(current, code)
+            self._entregas[position] = updated
+            self.last_write = datetime.now()
+            if self.events is not None:
+                seq = self.events.submit(entrega_id, "status", status=status,
+                                         anterior=current.status)
+            self._journal_changes("status", (updated,))
+            self._notify("status", (updated,), self.last_write)
+        if seq:
+            self.events.wait(seq)
+        return updated
+
+    def apply_event(self, event):
+        """
+        Reaplica um evento do log (sem registrá-lo de novo).
+
+        Retorna False se o evento não pôde ser aplicado (entrega desconhecida
+        ou evento "criada" compactado, sem os dados completos).
+        """
+        with self._lock:
+            if event["tipo"] == "criada":
+                if "dados" not in event or self._position(event["id"]) is not None:
+                    return False
+                self._append([Delivery.from_dict(event["dados"])])
+            else:
+                position = self._position(event["id"])
+                if position is None:
+                    return False
+                self._materialize()
+                current = self._entregas[position]
+                self._entregas[position] = _with_status(current, CODIGOS_STATUS[event["status"]])
+            self.last_write = datetime.now()
+            return True
+
+    def since(self, position, generation):
+        """
+        Entregas incluídas a partir de `position`, para índices atualizados
+        incrementalmente. Entre duas chamadas `replace_all` a lista só cresce;
+        se a geração informada não é a atual, retorna todas.
+
+        Retorna (geração atual, entregas).
+        """
+        with self._lock:
+            if generation != self.generation:
+                position = 0
+            offset = self._offset()
+            if position >= offset:
+                return self.generation, self._entregas[position - offset:]
+            # Registros montados só para a indexação; o snapshot continua mapeado
+            base = self._snapshot.records(None if position == 0 else range(position, offset))
+            return self.generation, base + self._entregas
+
+    def sync_token(self):
+        """Token que identifica o estado atual, para `changes_since`"""
+        with self._lock:
+            return f"{self.epoch}.{self.version}"
+
+    def changes_since(self, token):
+        """
+        Entregas incluídas ou alteradas depois do token.
+
+        Retorna (novo token, criadas, alteradas), com os registros atuais, ou
+        (novo token, None, None) quando é preciso ressincronizar (token de
+        outra instância ou mais antigo que o diário). Gera ValueError para
+        token malformado.
+        """
+        epoch, _, version = token.partition(".")
+        try:
+            version = int(version)
+        except ValueError:
+            raise ValueError(f"Token de sincronização inválido: {token}")
+        with self._lock:
+            current = f"{self.epoch}.{self.version}"
+            pending = self.version - version
+            if epoch != self.epoch or pending < 0 or pending > len(self._journal):
+                return current, None, None
+
+            created, changed = {}, {}
+            for _, entrega_id, tipo in reversed(list(islice(reversed(self._journal), pending))):
+                if tipo == "criada":
+                    created[entrega_id] = None
+                elif entrega_id not in created:
+                    changed[entrega_id] = None
+            criadas, _ = self.get_many(created)
+            alteradas, _ = self.get_many(changed)
+            return current, criadas, alteradas
+
+    def ids(self):
+        """Conjunto dos IDs já cadastrados"""
+        with self._lock:
+            ids = {e.id for e in self._entregas}
+            if self._snapshot is not None:
+                ids.update(self._snapshot.column("id"))
+            return ids
+
+    def replace_all(self, entregas):
+        """Substitui todas as entregas de uma vez"""
+        entregas = [as_delivery(e) for e in entregas]
+        with self._lock:
+            if self._snapshot is not None:
+                self._snapshot.close()
+                self._snapshot = None
+            self._entregas = entregas
+            self._positions = None
+            self.generation += 1
+            self._journal.clear()
+            self.epoch = secrets.token_hex(4)
+            self.version = 0
+            self.last_write = datetime.now()
+
+    def save_snapshot(self, path):
+        """
+        Grava as entregas atuais em um snapshot binário; retorna linhas e tamanho.
+
+        Com log de eventos, o snapshot guarda a última sequência que ele cobre
+        ("seq" em meta e no retorno).
+        """
+        columns = SnapshotColumns()
+        with self._lock:
+            written_at = self.last_write
+            # Linhas do snapshot aberto copiadas coluna a coluna, sem montar os registros
+            if self._snapshot is not None:
+                columns.extend_from(self._snapshot)
+            entregas = list(self._entregas)
+            meta = {"seq": self.events.last_seq} if self.events is not None else {}
+        columns.extend(entregas)
+        info = columns.write(path, meta)
+        info["ultima_escrita"] = written_at.isoformat()
+        info.update(meta)
+        return info
+
+    def ping(self, timeout=1.0):
+        """Verifica se o backend responde (lock obtido dentro do prazo)"""
+        if not self._lock.acquire(timeout=timeout):
+            return False
+        try:
+            return True
+        finally:
+            self._lock.release()
@@ -0,0 +1 @@
+"""Geração de relatórios Excel, particionamento, agendamento e instrumentação"""
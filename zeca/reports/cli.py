@@ -0,0 +1,99 @@
+"""
+Linha de Comando de Relatórios - Sistema Zeca Delivery
+======================================================
+
+Comando `zeca-report`. Os argumentos são lidos antes de importar o
+gerador: `--help` e os subcomandos do agendador não carregam openpyxl
+nem requests.
+
+Uso:
+    zeca-report --filename relatorio.xlsx
+    zeca-report --shard-by bairro --workers 4
+    zeca-report schedule --job diario="0 18 * * *"
+    zeca-report history --job diario
+
+Autor: Demonstração do artigo Zeca Delivery
+"""
+
+import argparse
+import sys
+
+from zeca.common.structured_logging import configure_logging, get_logger
+
+logger = get_logger("reports")
+
+
+def parse_args(argv=None):
+    """Lê os argumentos da linha de comando"""
+    parser = argparse.ArgumentParser(prog="zeca-report",
+                                     description="Gerador de Relatórios Excel - Sistema Zeca Delivery")
+    parser.add_argument("--api-url", default="http://localhost:5000",
+                        help="URL base da API de entregas")
+    parser.add_argument("--filename", default=None,
+                        help="Nome do arquivo gerado (padrão: relatorio_entregas_<timestamp>.xlsx)")
+    parser.add_argument("--rows-per-sheet", type=int, default=None,
+                        help="Máximo de entregas por aba antes de continuar em nova aba")
+    parser.add_argument("--sheet-by", choices=["status", "bairro"], default=None,
+                        help="Cria uma aba por status ou bairro")
+    parser.add_argument("--shard-by", choices=["dia", "bairro", "status"],
+                        help="Gera um arquivo por partição em vez de um relatório único")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Número de processos para relatórios particionados (padrão: CPUs)")
+    parser.add_argument("--output-dir", default="output",
+                        help="Diretório dos relatórios particionados")
+    parser.add_argument("--api-stats", action="store_true",
+                        help="Busca as estatísticas em /api/stats em vez de calculá-las na passada da planilha")
+    parser.add_argument("--verify-stats", action="store_true",
+                        help="Confere as estatísticas calculadas na planilha com /api/stats")
+    parser.add_argument("--run-log", default=None, metavar="ARQUIVO.jsonl",
+                        help="Acrescenta o resultado (tempo, CPU e memória por etapa) a um log JSONL")
+    parser.add_argument("--no-memory-trace", action="store_true",
+                        help="Não mede memória por etapa (tracemalloc deixa a geração mais lenta)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Grava perfil da geração (.prof do cProfile e .collapsed para flamegraph) em logs/profiles")
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers deve ser maior que zero")
+    return args
+
+
+def main(argv=None):
+    """Função principal do comando zeca-report"""
+    argv = sys.argv[1:] if argv is None else argv
+
+    # Subcomandos do agendador: schedule e history
+    if argv and argv[0] in ("schedule", "history"):
+        from zeca.reports.scheduler import main as scheduler_main
+        return scheduler_main(argv)
+
+    args = parse_args(argv)
+    configure_logging()
+
+    from zeca.reports.excel_generator import DeliveryReportGenerator
+
+    options = {"rows_per_sheet": args.rows_per_sheet} if args.rows_per_sheet else {}
+    generator = DeliveryReportGenerator(api_url=args.api_url, sheet_by=args.sheet_by,
+                                        trace_memory=not args.no_memory_trace,
+                                        run_log=args.run_log, local_stats=not args.api_stats,
+                                        verify_stats=args.verify_stats, **options)
+    if args.shard_by:
+        run, run_args = generator.generate_sharded_report, (args.shard_by, args.output_dir, args.workers)
+    else:
+        run, run_args = generator.generate_report, (args.filename,)
+
+    if args.profile:
+        from zeca.reports.profiling import profile_call
+        success, perfil = profile_call(run, *run_args)
+        logger.info("Perfil gravado", extra={key: perfil[key] for key in ("pstats", "collapsed", "resumo", "amostras")})
+    else:
+        success = run(*run_args)
+
+    if not success:
+        logger.error("Falha na geração do relatório; verifique se a API está rodando: zeca-api")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
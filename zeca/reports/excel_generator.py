@@ -0,0 +1,516 @@
+"""
+Gerador de Relatórios Excel - Sistema Zeca Delivery
+==================================================
+
+Este módulo consome a API de entregas e gera relatórios Excel formatados
+com cores condicionais e estatísticas automáticas.
+
+Funcionalidades:
+- Conecta com a API Flask
+- Gera Excel com abas de Entregas + Estatísticas
+- Geração em streaming com divisão automática em várias abas
+  (limite de linhas por aba ou uma aba por status/bairro)
+- Formatação profissional com cores por status
+- Ajuste automático de colunas
+- Tratamento de erros robusto
+- Relatórios particionados por dia, bairro ou status (--shard-by)
+- Agendamento de relatórios com histórico de execuções (schedule/history)
+- Perfil sob demanda da geração (--profile): pstats e pilhas para flamegraph
+- Tempo, CPU e pico de memória por etapa (ReportResult), com log JSONL opcional (--run-log)
+- Estatísticas calculadas na mesma passada da planilha, sem segunda chamada
+  à API, com conferência opcional contra /api/stats (--verify-stats);
+  --api-stats volta a buscá-las em /api/stats
+- Entregas validadas ao serem recebidas da API (registros Delivery): uma
+  entrega inválida é descartada com aviso, em vez de falhar no meio da planilha
+
+Autor: Demonstração do artigo Zeca Delivery
+"""
+
+import requests
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Border, Side, Alignment
+from openpyxl.utils import get_column_letter
+from datetime import datetime
+from itertools import chain, islice
+import sys
+import os
+import re
+
+from zeca.common.structured_logging import (
+    correlation, correlation_id, get_logger
+)
+from zeca.reports.timing import StageTimer, ReportResult, append_run_log
+from zeca.data.sample_data import StatsAccumulator, compare_stats
+from zeca.data.schema import (
+    Delivery, STATUS_VALIDOS, ROTULOS_STATUS, ROTULOS_PRIORIDADE, as_delivery
+)
+
+logger = get_logger("reports")
+
+# Cabeçalhos da aba de entregas
+HEADERS = [
+    "ID", "Cliente", "Endereço Completo", "Produto", 
+    "Quantidade", "Valor (R$)", "Status", "Entrega Prevista", 
+    "Telefone", "Prioridade"
+]
+
+# Limite de linhas do Excel (inclui o cabeçalho)
+MAX_LINHAS_EXCEL = 1048576
+LINHAS_POR_ABA_PADRAO = MAX_LINHAS_EXCEL - 1
+AMOSTRA_LARGURAS = 200
+LAYOUTS_ABAS = ("status", "bairro")
+
+class DeliveryReportGenerator:
+    """Classe para gerar relatórios Excel das entregas"""
+    
+    def __init__(self, api_url="http://localhost:5000", rows_per_sheet=LINHAS_POR_ABA_PADRAO,
+                 sheet_by=None, trace_memory=True, run_log=None, local_stats=True,
+                 verify_stats=False):
+        if not 1 <= rows_per_sheet <= LINHAS_POR_ABA_PADRAO:
+            raise ValueError(f"rows_per_sheet deve estar entre 1 e {LINHAS_POR_ABA_PADRAO}")
+        if sheet_by is not None and sheet_by not in LAYOUTS_ABAS:
+            raise ValueError(f"Layout de abas inválido. Use: {', '.join(LAYOUTS_ABAS)}")
+        
+        self.api_url = api_url
+        self.rows_per_sheet = rows_per_sheet
+        self.sheet_by = sheet_by
+        self.sheet_summary = []
+        self.trace_memory = trace_memory
+        self.run_log = run_log
+        self.local_stats = local_stats
+        self.verify_stats = verify_stats
+        
+    def _headers(self):
+        """Cabeçalhos das chamadas à API (propaga o ID de correlação)"""
+        current = correlation_id.get()
+        return {"X-Request-ID": current} if current else {}
+    
+    def verify_api_connection(self):
+        """Verifica se a API está online e funcionando"""
+        try:
+            logger.debug("Verificando conexão com a API", extra={"api_url": self.api_url})
+            response = requests.get(f"{self.api_url}/api/health", timeout=5, headers=self._headers())
+            
+            if response.status_code == 200:
+                health_data = response.json()
+                service_name = health_data.get('service', 'API')
+                logger.info("API está online", extra={"servico": service_name})
+                return True
+            else:
+                logger.error("API retornou erro", extra={"status": response.status_code})
+                return False
+                
+        except requests.exceptions.ConnectionError:
+            logger.error("Não foi possível conectar com a API; verifique se ela está rodando",
+                         extra={"api_url": self.api_url})
+            return False
+        except Exception as e:
+            logger.error("Erro ao conectar com a API", extra={"erro": str(e)})
+            return False
+    
+    def fetch_deliveries(self):
+        """Busca dados das entregas da API"""
+        try:
+            response = requests.get(f"{self.api_url}/api/entregas", timeout=10, headers=self._headers())
+            response.raise_for_status()
+            
+            data = response.json()
+            deliveries = []
+            invalid = 0
+            for item in data.get('data', []):
+                try:
+                    deliveries.append(Delivery.from_dict(item))
+                except ValueError as e:
+                    invalid += 1
+                    logger.warning("Entrega inválida descartada", extra={"erro": str(e)})
+            logger.info("Entregas obtidas", extra={"total_entregas": len(deliveries),
+                                                   "entregas_invalidas": invalid})
+            return deliveries
+            
+        except requests.exceptions.RequestException as e:
+            logger.error("Erro ao buscar entregas", extra={"erro": str(e)})
+            return []
+        except Exception as e:
+            logger.exception("Erro inesperado ao buscar entregas")
+            return []
+    
+    def fetch_data_version(self):
+        """
+        Token de sincronização da API (muda a cada escrita), sem baixar a
+        lista de entregas; None quando não foi possível obtê-lo.
+        """
+        try:
+            response = requests.get(f"{self.api_url}/api/entregas/changes", timeout=5,
+                                    headers=self._headers())
+            response.raise_for_status()
+            return response.json().get('data', {}).get('token')
+        except Exception as e:
+            logger.warning("Não foi possível obter a versão dos dados", extra={"erro": str(e)})
+            return None
+    
+    def fetch_statistics(self):
+        """Busca estatísticas da API"""
+        try:
+            response = requests.get(f"{self.api_url}/api/stats", timeout=10, headers=self._headers())
+            response.raise_for_status()
+            
+            data = response.json()
+            stats = data.get('data', {})
+            return stats
+            
+        except Exception as e:
+            logger.warning("Não foi possível buscar estatísticas", extra={"erro": str(e)})
+            return {}
+    
+    def create_styled_workbook(self, deliveries, stats=None):
+        """
+        Cria planilha Excel com formatação profissional.
+        
+        A planilha é gerada em modo streaming (write_only): cada linha é
+        formatada e gravada uma única vez, sem manter a grade de células
+        em memória. Ao atingir `rows_per_sheet` linhas os dados continuam
+        em nova aba, e com `sheet_by` cada status ou bairro tem a sua aba.
+        
+        Com `stats` (StatsAccumulator), as estatísticas são calculadas na
+        mesma passada que grava as linhas.
+        
+        Aceita registros Delivery ou dicionários no formato da API (que são
+        validados antes de entrar na planilha).
+        """
+        wb = Workbook(write_only=True)
+        self.sheet_summary = []
+        
+        # Larguras estimadas por amostra: no modo streaming as colunas
+        # precisam ser definidas antes da primeira linha de cada aba
+        deliveries = map(as_delivery, deliveries)
+        sample = list(islice(deliveries, AMOSTRA_LARGURAS))
+        sample_rows = [self._format_row(delivery) for delivery in sample]
+        widths = self._adjust_column_widths(sample_rows)
+        
+        # Estilos criados uma única vez e reutilizados em todas as células
+        thin_border = self._thin_border()
+        status_fills = self._status_fills()
+        fills = tuple(status_fills.get(status) for status in STATUS_VALIDOS)
+        
+        open_sheets = {}
+        for delivery in chain(sample, deliveries):
+            partition = delivery[self.sheet_by] if self.sheet_by else None
+            sheet = open_sheets.get(partition)
+            
+            # Abrir nova aba na primeira linha da partição ou ao atingir o limite
+            if sheet is None or sheet['linhas'] >= self.rows_per_sheet:
+                sheet = self._open_sheet(wb, partition, sheet, widths, thin_border)
+                open_sheets[partition] = sheet
+            
+            ws = sheet['ws']
+            fill = fills[delivery.status_code]
+            cells = []
+            for value in self._format_row(delivery):
+                cell = WriteOnlyCell(ws, value=value)
+                cell.border = thin_border
+                if fill is not None:
+                    cell.fill = fill
+                cells.append(cell)
+            ws.append(cells)
+            
+            sheet['linhas'] += 1
+            sheet['resumo']['linhas'] += 1
+            sheet['resumo']['valor_total'] += delivery.valor
+            if stats is not None:
+                stats.add(delivery)
+        
+        # Sem entregas: manter a aba principal apenas com cabeçalho
+        if not self.sheet_summary:
+            self._open_sheet(wb, None, None, widths, thin_border)
+        
+        return wb
+    
+    def _format_row(self, delivery):
+        """Converte uma entrega (Delivery) nos valores das colunas da planilha"""
+        # Formatar endereço completo
+        endereco_completo = f"{delivery.endereco}, {delivery.bairro}, {delivery.cidade} - {delivery.cep}"
+        
+        return [
+            delivery.id,
+            delivery.cliente,
+            endereco_completo,
+            delivery.produto,
+            delivery.quantidade,
+            delivery.valor,
+            ROTULOS_STATUS[delivery.status_code],
+            delivery.prevista.isoformat(' '),
+            delivery.telefone,
+            ROTULOS_PRIORIDADE[delivery.prioridade_code]
+        ]
+    
+    def _open_sheet(self, wb, partition, previous, widths, border):
+        """Cria aba (ou continuação de aba) com larguras e cabeçalho"""
+        base_title = "Entregas do Dia" if partition is None else str(partition).replace('_', ' ').title()
+        part = previous['parte'] + 1 if previous else 1
+        title = self._sheet_title(base_title, part)
+        
+        ws = wb.create_sheet(title)
+        for col_num, width in enumerate(widths, 1):
+            ws.column_dimensions[get_column_letter(col_num)].width = width
+        ws.freeze_panes = "A2"
+        
+        # Estilo dos cabeçalhos
+        header_font = Font(bold=True, color="FFFFFF", size=11)
+        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+        header_alignment = Alignment(horizontal="center", vertical="center")
+        
+        header_cells = []
+        for header in HEADERS:
+            cell = WriteOnlyCell(ws, value=header)
+            cell.font = header_font
+            cell.fill = header_fill
+            cell.alignment = header_alignment
+            cell.border = border
+            header_cells.append(cell)
+        ws.append(header_cells)
+        
+        resumo = {"aba": title, "particao": partition, "linhas": 0, "valor_total": 0.0}
+        self.sheet_summary.append(resumo)
+        return {"ws": ws, "parte": part, "linhas": 0, "resumo": resumo}
+    
+    def _sheet_title(self, base_title, part):
+        """Nome de aba válido no Excel (até 31 caracteres, sem símbolos proibidos)"""
+        base_title = re.sub(r'[\[\]:*?/\\]', '-', base_title)
+        suffix = f" ({part})" if part > 1 else ""
+        return base_title[:31 - len(suffix)] + suffix
+    
+    def _status_fills(self):
+        """Preenchimentos condicionais por status"""
+        status_colors = {
+            'pendente': 'FFE4B5',      # Bege claro
+            'em_transito': 'E6F3FF',   # Azul claro
+            'entregue': 'E8F5E8',      # Verde claro
+            'cancelado': 'FFE4E1'      # Vermelho claro
+        }
+        
+        return {
+            status: PatternFill(start_color=color, end_color=color, fill_type="solid")
+            for status, color in status_colors.items()
+        }
+    
+    def _adjust_column_widths(self, sample_rows):
+        """Calcula largura das colunas a partir do cabeçalho e da amostra"""
+        widths = []
+        for col_num, header in enumerate(HEADERS):
+            length = max([len(header)] + [len(str(row[col_num] or "")) for row in sample_rows])
+            # Limitar largura máxima e mínima
+            widths.append(min(max(length + 2, 12), 50))
+        return widths
+    
+    def _thin_border(self):
+        """Borda fina aplicada às células da tabela"""
+        return Border(
+            left=Side(style='thin'),
+            right=Side(style='thin'),
+            top=Side(style='thin'),
+            bottom=Side(style='thin')
+        )
+    
+    def add_statistics_sheet(self, wb, statistics):
+        """Adiciona aba com estatísticas (consolidando todas as abas de entregas)"""
+        if not statistics:
+            return
+            
+        ws_stats = wb.create_sheet("Estatísticas")
+        
+        # Ajustar larguras (antes da primeira linha no modo streaming)
+        ws_stats.column_dimensions['A'].width = 25
+        ws_stats.column_dimensions['B'].width = 15
+        ws_stats.column_dimensions['C'].width = 15
+        
+        # Título
+        title = WriteOnlyCell(ws_stats, value="📊 Estatísticas das Entregas")
+        title.font = Font(bold=True, size=14, color="366092")
+        ws_stats.append([title])
+        ws_stats.append([])
+        
+        # Dados estatísticos
+        stats_data = [
+            ["📦 Total de Entregas:", statistics.get('total_entregas', 0)],
+            ["💰 Valor Total:", f"R$ {statistics.get('valor_total', 0):.2f}"],
+            ["📈 Taxa de Entrega:", f"{statistics.get('taxa_entrega', 0):.1f}%"],
+            ["💸 Valor Médio:", f"R$ {statistics.get('valor_medio', 0):.2f}"],
+            ["", ""],
+            ["📋 Distribuição por Status:", ""]
+        ]
+        
+        # Adicionar distribuição por status
+        distribuicao = statistics.get('distribuicao_status', {})
+        for status, count in distribuicao.items():
+            stats_data.append([f"  {status.replace('_', ' ').title()}:", count])
+        
+        # Distribuição por prioridade (quantidade e valor)
+        prioridades = statistics.get('distribuicao_prioridade', {})
+        if prioridades:
+            valores = statistics.get('valor_por_prioridade', {})
+            stats_data.append(["", ""])
+            stats_data.append(["🚦 Distribuição por Prioridade:", "Entregas", "Valor (R$)"])
+            for prioridade, count in prioridades.items():
+                stats_data.append([f"  {prioridade.title()}:", count, valores.get(prioridade, 0)])
+        
+        # Resumo das abas quando os dados foram divididos
+        sheets = getattr(self, 'sheet_summary', [])
+        if len(sheets) > 1:
+            stats_data.append(["", ""])
+            stats_data.append(["📑 Abas de Entregas:", "Entregas", "Valor (R$)"])
+            for sheet in sheets:
+                stats_data.append([f"  {sheet['aba']}:", sheet['linhas'], round(sheet['valor_total'], 2)])
+        
+        # Inserir dados
+        bold = Font(bold=True)
+        for row in stats_data:
+            label = WriteOnlyCell(ws_stats, value=row[0])
+            
+            # Estilo para labels
+            if row[0] and not row[0].startswith("  "):
+                label.font = bold
+            ws_stats.append([label] + row[1:])
+    
+    def generate_report(self, filename=None, deliveries=None):
+        """
+        Gera o relatório completo.
+        
+        Se `deliveries` for informado (por exemplo pelo agendador, que já
+        buscou os dados para comparar a versão), a busca na API é pulada.
+        
+        Retorna um ReportResult, verdadeiro em caso de sucesso, com tempo de
+        relógio, tempo de CPU e pico de memória de cada etapa. Com `run_log`
+        o resultado também é acrescentado ao log de execuções (JSONL).
+        """
+        if filename is None:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"relatorio_entregas_{timestamp}.xlsx"
+        
+        with correlation():
+            logger.info("Iniciando geração do relatório", extra={"arquivo": filename})
+            started = datetime.now()
+            
+            with StageTimer(logger, trace_memory=self.trace_memory) as timer:
+                error, deliveries, statistics = self._run_stages(timer, filename, deliveries)
+            
+            result = ReportResult(error is None, filename, len(deliveries or ()), timer.stages,
+                                  error, started)
+            if self.run_log:
+                append_run_log(self.run_log, result)
+            
+            if result:
+                self._show_summary(result, statistics)
+            else:
+                logger.error("Falha na geração do relatório", extra={"erro": error})
+        
+        return result
+    
+    def _run_stages(self, timer, filename, deliveries):
+        """Executa as etapas do relatório; retorna (erro, entregas, estatísticas)"""
+        if deliveries is None:
+            # Verificar conexão com API
+            with timer.stage("verificacao"):
+                connected = self.verify_api_connection()
+            if not connected:
+                return "falha na conexão com a API", None, None
+            
+            # Buscar dados
+            with timer.stage("busca_entregas") as stage:
+                deliveries = self.fetch_deliveries()
+                stage["linhas"] = len(deliveries)
+        
+        if not deliveries:
+            return "nenhuma entrega encontrada", deliveries, None
+        
+        # Estatísticas: da API ou calculadas na mesma passada da planilha
+        accumulator = StatsAccumulator() if self.local_stats else None
+        if accumulator is None:
+            with timer.stage("busca_estatisticas"):
+                statistics = self.fetch_statistics()
+        
+        # Criar planilha
+        with timer.stage("planilha") as stage:
+            wb = self.create_styled_workbook(deliveries, stats=accumulator)
+            stage.update(linhas=len(deliveries), abas=len(self.sheet_summary))
+        
+        if accumulator is not None:
+            statistics = accumulator.result()
+            if self.verify_stats:
+                with timer.stage("conferencia_estatisticas") as stage:
+                    divergencias = compare_stats(statistics, self.fetch_statistics())
+                    stage["divergencias"] = len(divergencias)
+                if divergencias:
+                    logger.warning("Estatísticas locais divergem da API",
+                                   extra={"divergencias": divergencias})
+        
+        # Adicionar estatísticas
+        if statistics:
+            with timer.stage("aba_estatisticas"):
+                self.add_statistics_sheet(wb, statistics)
+        
+        # Salvar arquivo
+        try:
+            with timer.stage("gravacao") as stage:
+                wb.save(filename)
+                stage["tamanho_bytes"] = os.path.getsize(filename)
+        except Exception as e:
+            return f"erro ao salvar planilha: {e}", deliveries, statistics
+        
+        return None, deliveries, statistics
+    
+    def generate_sharded_report(self, shard_by, output_dir="output", max_workers=None):
+        """Gera um relatório por partição (dia, bairro ou status) em paralelo"""
+        from zeca.reports.sharding import generate_sharded_reports
+        
+        with correlation():
+            logger.info("Iniciando geração de relatórios particionados", extra={"particionado_por": shard_by})
+            
+            if not self.verify_api_connection():
+                logger.error("Falha na conexão com a API; geração abortada")
+                return False
+            
+            deliveries = self.fetch_deliveries()
+            if not deliveries:
+                logger.error("Nenhuma entrega encontrada")
+                return False
+            
+            try:
+                manifest = generate_sharded_reports(
+                    deliveries, shard_by, output_dir, max_workers,
+                    generator_options={"rows_per_sheet": self.rows_per_sheet, "sheet_by": self.sheet_by}
+                )
+            except Exception:
+                logger.exception("Erro ao gerar relatórios particionados")
+                return False
+            
+            for item in manifest['arquivos']:
+                logger.info("Partição gerada", extra={
+                    "particao": item['particao'], "arquivo": item['arquivo'],
+                    "linhas": item['linhas'], "duracao_ms": round(item['tempo_s'] * 1000, 1)
+                })
+            logger.info("Relatórios particionados gerados", extra={
+                "total_arquivos": manifest['total_arquivos'], "workers": manifest['workers'],
+                "duracao_ms": round(manifest['tempo_total_s'] * 1000, 1),
+                "manifesto": manifest['manifesto']
+            })
+        
+        return manifest
+    
+    def _show_summary(self, result, statistics):
+        """Registra o resumo final do relatório gerado"""
+        summary = {
+            "arquivo": result.filename,
+            "total_entregas": result.rows,
+            "wall_ms": result.wall_ms,
+            "cpu_ms": result.cpu_ms,
+            "pico_memoria_bytes": result.peak_memory
+        }
+        if statistics:
+            summary.update(valor_total=statistics.get('valor_total', 0),
+                           taxa_entrega=statistics.get('taxa_entrega', 0))
+        logger.info("Relatório gerado com sucesso", extra=summary)
+
+if __name__ == "__main__":
+    from zeca.reports.cli import main
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Profiling de Relatórios - Sistema Zeca Delivery
+===============================================
+
+Perfil sob demanda da geração de relatórios (`zeca-report --profile`).
+
+Saídas da mesma execução:
+- <prefixo>.prof: estatísticas do cProfile, para `python -m pstats` ou snakeviz
+- <prefixo>.txt: as funções mais custosas (tempo acumulado), em texto
+- <prefixo>.collapsed: pilhas amostradas no formato "collapsed" (uma pilha por
+  linha, funções separadas por ";" e a contagem no final), compatível com
+  flamegraph.pl, speedscope e inferno
+
+O amostrador roda em uma thread separada e lê a pilha da thread alvo com
+sys._current_frames() a cada intervalo, sem instrumentar as funções.
+
+Autor: Demonstração do artigo Zeca Delivery
+"""
+
+from collections import Counter
+from datetime import datetime
+import threading
+import cProfile
+import pstats
+import sys
+import io
+import os
+
+INTERVALO_AMOSTRAGEM = 0.001   # segundos
+FUNCOES_RESUMO = 15
+DIRETORIO_PERFIS = os.path.join("logs", "profiles")
+
+
+def frame_label(frame):
+    """Nome da função no formato modulo:funcao"""
+    code = frame.f_code
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{code.co_name}"
+
+
+class SamplingProfiler:
+    """Amostrador de pilhas de uma thread, usado como context manager"""
+
+    def __init__(self, interval=INTERVALO_AMOSTRAGEM, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="zeca-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame))
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def write_collapsed(self, path):
+        """Grava as pilhas no formato collapsed (raiz primeiro)"""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+
+
+def profile_call(func, *args, output_prefix=None, interval=INTERVALO_AMOSTRAGEM, **kwargs):
+    """
+    Executa `func` com cProfile e com o amostrador de pilhas.
+
+    Retorna (resultado, perfil) onde `perfil` é um dicionário com os
+    caminhos dos arquivos gerados, o número de amostras e o tempo total.
+    """
+    if output_prefix is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_prefix = os.path.join(DIRETORIO_PERFIS, f"relatorio_{timestamp}")
+    os.makedirs(os.path.dirname(output_prefix) or ".", exist_ok=True)
+
+    profiler = cProfile.Profile()
+    with SamplingProfiler(interval=interval) as sampler:
+        profiler.enable()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            profiler.disable()
+
+    pstats_path = f"{output_prefix}.prof"
+    collapsed_path = f"{output_prefix}.collapsed"
+    summary_path = f"{output_prefix}.txt"
+    profiler.dump_stats(pstats_path)
+    sampler.write_collapsed(collapsed_path)
+
+    # Resumo em texto no arquivo, não no stdout (a saída do comando é o log estruturado)
+    summary = io.StringIO()
+    stats = pstats.Stats(profiler, stream=summary)
+    stats.sort_stats("cumulative").print_stats(FUNCOES_RESUMO)
+    with open(summary_path, "w", encoding="utf-8") as f:
+        f.write(summary.getvalue())
+    return result, {
+        "pstats": pstats_path,
+        "collapsed": collapsed_path,
+        "resumo": summary_path,
+        "amostras": sampler.samples,
+        "tempo_total_s": round(stats.total_tt, 3),
+        "stats": stats
+    }
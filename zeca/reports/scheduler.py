@@ -0,0 +1,439 @@
+"""
+Agendador de Relatórios - Sistema Zeca Delivery
+===============================================
+
+Executa jobs de relatório em intervalos no estilo cron, com histórico
+persistente de execuções em SQLite.
+
+Funcionalidades:
+- Expressões cron de 5 campos (`*/15 * * * *`), apelidos (`@hourly`,
+  `@daily`, ...) e intervalos simples (`@every 10m`)
+- Jobs executados em pool de threads, com limite de jobs simultâneos
+- Execução ignorada quando a versão dos dados (token de sincronização da
+  API, obtido sem baixar a lista) não mudou desde o último relatório gerado
+  pelo job (ou quando o job anterior ainda está rodando)
+- Histórico com duração, linhas, tamanho do arquivo e pico de memória
+
+Uso:
+    zeca-report schedule --job diario="0 18 * * *"
+    zeca-report history --job diario
+
+Autor: Demonstração do artigo Zeca Delivery
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+import tracemalloc
+import threading
+import argparse
+import sqlite3
+import json
+import time
+import os
+
+from zeca.common.structured_logging import configure_logging, correlation, get_logger
+
+logger = get_logger("scheduler")
+
+HISTORICO_PADRAO = os.path.join("logs", "report_history.db")
+MAX_JOBS_SIMULTANEOS = 2
+
+
+class CronSchedule:
+    """Expressão de agendamento no estilo cron"""
+
+    # Dia da semana aceita 0-7 (domingo é 0 ou 7)
+    FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+    ALIASES = {
+        "@hourly": "0 * * * *",
+        "@daily": "0 0 * * *",
+        "@weekly": "0 0 * * 0",
+        "@monthly": "0 0 1 * *",
+    }
+    UNITS = {"s": 1, "m": 60, "h": 3600}
+
+    def __init__(self, expression):
+        self.expression = expression.strip()
+        self.interval = None
+
+        if self.expression.startswith("@every "):
+            self.interval = self._parse_interval(self.expression[len("@every "):].strip())
+            return
+
+        parts = self.ALIASES.get(self.expression, self.expression).split()
+        if len(parts) != 5:
+            raise ValueError(f"Expressão cron inválida: '{expression}' (esperados 5 campos)")
+
+        fields = [self._parse_field(part, lo, hi) for part, (lo, hi) in zip(parts, self.FIELDS)]
+        self.minutes, self.hours, self.days, self.months, self.weekdays = fields
+        if 7 in self.weekdays:
+            self.weekdays = (self.weekdays - {7}) | {0}
+        self.any_day = parts[2] == "*"
+        self.any_weekday = parts[4] == "*"
+
+    def _parse_interval(self, value):
+        """Converte '15m', '30s' ou '2h' em timedelta"""
+        unit = value[-1:]
+        if unit not in self.UNITS or not value[:-1].isdigit() or int(value[:-1]) <= 0:
+            raise ValueError(f"Intervalo inválido: '{value}'. Use por exemplo 30s, 15m ou 2h")
+        return timedelta(seconds=int(value[:-1]) * self.UNITS[unit])
+
+    def _parse_field(self, field, lo, hi):
+        """Converte um campo cron (*, */n, a-b, a-b/n, listas) em conjunto de valores"""
+        values = set()
+        for part in field.split(","):
+            step = 1
+            if "/" in part:
+                part, step_text = part.split("/", 1)
+                step = int(step_text)
+                if step <= 0:
+                    raise ValueError(f"Passo inválido no campo cron: '{field}'")
+            if part == "*":
+                start, end = lo, hi
+            elif "-" in part:
+                start, end = (int(v) for v in part.split("-", 1))
+            else:
+                start = end = int(part)
+            if start < lo or end > hi or start > end:
+                raise ValueError(f"Valor fora do intervalo {lo}-{hi} no campo cron: '{field}'")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, moment):
+        """Regra do cron: dia do mês OU dia da semana quando ambos restritos"""
+        weekday = (moment.weekday() + 1) % 7
+        day_ok = moment.day in self.days
+        weekday_ok = weekday in self.weekdays
+        if self.any_day and self.any_weekday:
+            return True
+        if self.any_day:
+            return weekday_ok
+        if self.any_weekday:
+            return day_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, moment):
+        """Próximo horário de execução estritamente após `moment`"""
+        if self.interval is not None:
+            return moment + self.interval
+
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                year = candidate.year + candidate.month // 12
+                candidate = candidate.replace(year=year, month=candidate.month % 12 + 1,
+                                              day=1, hour=0, minute=0)
+            elif not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+            elif candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Expressão cron sem próxima execução: '{self.expression}'")
+
+
+class ReportJob:
+    """Job de relatório: nome, agenda e opções do gerador"""
+
+    def __init__(self, name, schedule, generator_options=None, output_dir="output"):
+        self.name = name
+        self.schedule = schedule if isinstance(schedule, CronSchedule) else CronSchedule(schedule)
+        self.generator_options = generator_options or {}
+        self.output_dir = output_dir
+
+
+class RunHistory:
+    """Histórico de execuções em SQLite (uma conexão por operação, thread-safe)"""
+
+    COLUMNS = ("id", "job", "inicio", "fim", "status", "motivo", "duracao_s", "linhas",
+               "tamanho_bytes", "pico_memoria_bytes", "versao_dados", "arquivo")
+
+    def __init__(self, path=HISTORICO_PADRAO):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS historico_execucoes (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job TEXT NOT NULL,
+                    inicio TEXT NOT NULL,
+                    fim TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    motivo TEXT,
+                    duracao_s REAL,
+                    linhas INTEGER,
+                    tamanho_bytes INTEGER,
+                    pico_memoria_bytes INTEGER,
+                    versao_dados TEXT,
+                    arquivo TEXT
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_historico_job ON historico_execucoes (job, id)")
+
+    @contextmanager
+    def _connect(self):
+        """Conexão de curta duração: confirma a transação e fecha ao sair"""
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def record(self, run):
+        """Grava uma execução e retorna o id"""
+        columns = [c for c in self.COLUMNS if c != "id"]
+        with self._lock, self._connect() as conn:
+            cursor = conn.execute(
+                f"INSERT INTO historico_execucoes ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' for _ in columns)})",
+                [run.get(c) for c in columns]
+            )
+            return cursor.lastrowid
+
+    def query(self, job=None, limit=20):
+        """Execuções mais recentes (opcionalmente de um único job)"""
+        sql = f"SELECT {', '.join(self.COLUMNS)} FROM historico_execucoes"
+        params = []
+        if job:
+            sql += " WHERE job = ?"
+            params.append(job)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        with self._connect() as conn:
+            return [dict(zip(self.COLUMNS, row)) for row in conn.execute(sql, params)]
+
+    def last_data_version(self, job):
+        """Versão dos dados do último relatório gerado com sucesso pelo job"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT versao_dados FROM historico_execucoes "
+                "WHERE job = ? AND status = 'sucesso' ORDER BY id DESC LIMIT 1",
+                (job,)
+            ).fetchone()
+        return row[0] if row else None
+
+
+class ReportScheduler:
+    """Dispara jobs de relatório conforme a agenda, em pool de threads"""
+
+    def __init__(self, jobs, history, max_concurrent=MAX_JOBS_SIMULTANEOS,
+                 api_url="http://localhost:5000", generator_factory=None):
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent deve ser maior que zero")
+        self.jobs = list(jobs)
+        self.history = history
+        self.api_url = api_url
+        self.generator_factory = generator_factory
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent,
+                                            thread_name_prefix="zeca-report")
+        self._running = set()
+        self._lock = threading.Lock()
+        self._tracing_jobs = 0
+        self._started_tracing = False
+        self._stop = threading.Event()
+
+    def _new_generator(self, job):
+        if self.generator_factory is None:
+            from zeca.reports.excel_generator import DeliveryReportGenerator
+            self.generator_factory = DeliveryReportGenerator
+        return self.generator_factory(api_url=self.api_url, **job.generator_options)
+
+    def run_job(self, job):
+        """Executa um job uma vez e grava o resultado no histórico"""
+        started = datetime.now()
+        run = {"job": job.name, "inicio": started.isoformat(timespec="seconds")}
+        with correlation(f"{job.name}-{started.strftime('%Y%m%d%H%M%S')}"):
+            self._execute(job, run, started)
+            logger.info("Job executado", extra={key: run.get(key) for key in (
+                "job", "status", "motivo", "linhas", "duracao_s", "pico_memoria_bytes")})
+        return run
+
+    def _execute(self, job, run, started):
+        """Corpo de run_job: gera o relatório e preenche `run`"""
+        inicio = time.perf_counter()
+
+        self._start_tracing()
+
+        result = None
+        try:
+            generator = self._new_generator(job)
+            if not generator.verify_api_connection():
+                raise RuntimeError("API indisponível")
+            # Versão lida antes da lista: o que mudar no meio gera novo relatório na próxima vez
+            run["versao_dados"] = generator.fetch_data_version()
+
+            if run["versao_dados"] is not None and \
+                    run["versao_dados"] == self.history.last_data_version(job.name):
+                run.update(status="ignorado", motivo="dados sem alteração")
+            else:
+                deliveries = generator.fetch_deliveries()
+                run["linhas"] = len(deliveries)
+                os.makedirs(job.output_dir, exist_ok=True)
+                filename = os.path.join(
+                    job.output_dir, f"relatorio_{job.name}_{started.strftime('%Y%m%d_%H%M%S')}.xlsx"
+                )
+                result = generator.generate_report(filename=filename, deliveries=deliveries)
+                if not result:
+                    raise RuntimeError(getattr(result, "error", None) or "falha na geração do relatório")
+                run.update(status="sucesso", arquivo=filename,
+                           tamanho_bytes=os.path.getsize(filename))
+        except Exception as e:
+            run.update(status="erro", motivo=str(e))
+        finally:
+            # Pico de memória do processo durante a execução (compartilhado entre jobs simultâneos);
+            # as etapas do relatório reiniciam o pico, então vale o maior pico entre elas
+            peaks = [tracemalloc.get_traced_memory()[1], getattr(result, "peak_memory", None) or 0]
+            run["pico_memoria_bytes"] = max(peaks)
+            self._stop_tracing()
+        run["duracao_s"] = round(time.perf_counter() - inicio, 3)
+        run["fim"] = datetime.now().isoformat(timespec="seconds")
+        run["id"] = self.history.record(run)
+
+    def _start_tracing(self):
+        """Liga o tracemalloc no primeiro job em andamento (se ninguém o ligou antes)"""
+        with self._lock:
+            if self._tracing_jobs == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            self._tracing_jobs += 1
+            if hasattr(tracemalloc, "reset_peak"):
+                tracemalloc.reset_peak()
+
+    def _stop_tracing(self):
+        """Desliga o tracemalloc ao fim do último job, se foi o agendador que o ligou"""
+        with self._lock:
+            self._tracing_jobs -= 1
+            if self._tracing_jobs == 0 and self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+    def trigger(self, job):
+        """Envia o job ao pool, a menos que a execução anterior ainda esteja rodando"""
+        with self._lock:
+            if job.name in self._running:
+                now = datetime.now().isoformat(timespec="seconds")
+                self.history.record({"job": job.name, "inicio": now, "fim": now,
+                                     "status": "ignorado", "motivo": "execução anterior em andamento",
+                                     "duracao_s": 0.0})
+                return None
+            self._running.add(job.name)
+
+        future = self._executor.submit(self.run_job, job)
+        future.add_done_callback(lambda _: self._finish(job.name))
+        return future
+
+    def _finish(self, name):
+        with self._lock:
+            self._running.discard(name)
+
+    def run_once(self):
+        """Executa todos os jobs imediatamente e aguarda o término"""
+        futures = [self.trigger(job) for job in self.jobs]
+        return [future.result() for future in futures if future is not None]
+
+    def run_forever(self):
+        """Laço principal: dispara cada job no horário previsto até stop()"""
+        now = datetime.now()
+        next_runs = {job.name: job.schedule.next_after(now) for job in self.jobs}
+
+        while not self._stop.is_set():
+            now = datetime.now()
+            for job in self.jobs:
+                if next_runs[job.name] <= now:
+                    self.trigger(job)
+                    next_runs[job.name] = job.schedule.next_after(now)
+
+            wait = (min(next_runs.values()) - datetime.now()).total_seconds()
+            self._stop.wait(min(max(wait, 0), 60))
+
+    def stop(self):
+        """Interrompe o laço e aguarda os jobs em andamento"""
+        self._stop.set()
+        self._executor.shutdown(wait=True)
+
+    def next_runs(self, moment=None):
+        """Próximas execuções de cada job (para exibição)"""
+        moment = moment or datetime.now()
+        return {job.name: job.schedule.next_after(moment) for job in self.jobs}
+
+
+def parse_job(value):
+    """Converte 'nome=expressão' em (nome, expressão)"""
+    name, sep, expression = value.partition("=")
+    if not sep or not name.strip() or not expression.strip():
+        raise argparse.ArgumentTypeError("use o formato nome=\"expressão cron\"")
+    return name.strip(), expression.strip()
+
+
+def main(argv):
+    """Subcomandos `schedule` e `history` do gerador de relatórios"""
+    parser = argparse.ArgumentParser(prog="zeca-report", description="Agendador de relatórios Zeca Delivery")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    schedule = subparsers.add_parser("schedule", help="Executa jobs de relatório conforme a agenda")
+    schedule.add_argument("--job", action="append", type=parse_job, required=True,
+                          metavar='NOME="EXPRESSÃO"', help="Job e agenda (cron, @daily, @every 15m)")
+    schedule.add_argument("--max-concurrent", type=int, default=MAX_JOBS_SIMULTANEOS,
+                          help="Máximo de jobs executando ao mesmo tempo")
+    schedule.add_argument("--history-db", default=HISTORICO_PADRAO, help="Arquivo SQLite do histórico")
+    schedule.add_argument("--output-dir", default="output", help="Diretório dos relatórios")
+    schedule.add_argument("--api-url", default="http://localhost:5000", help="URL base da API")
+    schedule.add_argument("--rows-per-sheet", type=int, default=None, help="Máximo de entregas por aba")
+    schedule.add_argument("--sheet-by", choices=["status", "bairro"], default=None,
+                          help="Cria uma aba por status ou bairro")
+    schedule.add_argument("--once", action="store_true", help="Executa todos os jobs uma vez e sai")
+
+    history = subparsers.add_parser("history", help="Consulta o histórico de execuções")
+    history.add_argument("--job", default=None, help="Filtra por job")
+    history.add_argument("--limit", type=int, default=20, help="Número de execuções")
+    history.add_argument("--history-db", default=HISTORICO_PADRAO, help="Arquivo SQLite do histórico")
+    history.add_argument("--json", action="store_true", help="Saída em JSON")
+
+    args = parser.parse_args(argv)
+    configure_logging()
+    run_history = RunHistory(args.history_db)
+
+    if args.command == "history":
+        runs = run_history.query(job=args.job, limit=args.limit)
+        if args.json:
+            print(json.dumps(runs, ensure_ascii=False, indent=2))
+        else:
+            for run in runs:
+                print(f"{run['id']:>5} {run['job']:<15} {run['inicio']} {run['status']:<9} "
+                      f"{run['duracao_s'] or 0:>8.2f}s {run['linhas'] or 0:>8} linhas "
+                      f"{run['tamanho_bytes'] or 0:>10} bytes {run['pico_memoria_bytes'] or 0:>12} bytes mem "
+                      f"{run['motivo'] or ''}")
+        return 0
+
+    generator_options = {}
+    if args.rows_per_sheet:
+        generator_options["rows_per_sheet"] = args.rows_per_sheet
+    if args.sheet_by:
+        generator_options["sheet_by"] = args.sheet_by
+
+    jobs = [ReportJob(name, expression, generator_options, args.output_dir) for name, expression in args.job]
+    scheduler = ReportScheduler(jobs, run_history, max_concurrent=args.max_concurrent, api_url=args.api_url)
+
+    if args.once:
+        runs = scheduler.run_once()
+        scheduler.stop()
+        return 0 if all(run["status"] != "erro" for run in runs) else 1
+
+    logger.info("Agendador de relatórios iniciado", extra={"proximas_execucoes": {
+        name: moment.isoformat(timespec='minutes') for name, moment in scheduler.next_runs().items()
+    }})
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        logger.info("Agendador interrompido, aguardando jobs em andamento")
+    finally:
+        scheduler.stop()
+    return 0
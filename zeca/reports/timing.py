@@ -0,0 +1,167 @@
+"""
+Tempo por Etapa - Sistema Zeca Delivery
+=======================================
+
+Instrumentação das etapas da geração de relatórios. Para cada etapa
+(verificação, busca de entregas, busca de estatísticas, planilha, aba de
+estatísticas e gravação) são medidos:
+
+- tempo de relógio (wall)
+- tempo de CPU da thread que executa a etapa
+- pico de memória rastreada pelo tracemalloc durante a etapa e a memória
+  que continuou alocada ao final (opcional: o tracemalloc deixa as
+  alocações mais lentas)
+
+O resultado da geração é um ReportResult, verdadeiro quando o relatório
+foi gerado, que pode ser gravado como uma linha JSON em um log de
+execuções (JSONL).
+
+Observação: o tracemalloc é global ao processo; com vários relatórios
+gerados ao mesmo tempo (agendador) os picos incluem as alocações dos
+outros relatórios.
+
+Autor: Demonstração do artigo Zeca Delivery
+"""
+
+from contextlib import contextmanager
+from datetime import datetime
+import tracemalloc
+import json
+import time
+import os
+
+from zeca.common.structured_logging import correlation_id, log_stage
+
+
+class StageResult:
+    """Medições de uma etapa"""
+
+    def __init__(self, name, wall_ms, cpu_ms, peak_memory=None, net_memory=None, fields=None):
+        self.name = name
+        self.wall_ms = wall_ms
+        self.cpu_ms = cpu_ms
+        self.peak_memory = peak_memory
+        self.net_memory = net_memory
+        self.fields = fields or {}
+
+    def to_dict(self):
+        return {
+            "etapa": self.name,
+            "wall_ms": self.wall_ms,
+            "cpu_ms": self.cpu_ms,
+            "pico_memoria_bytes": self.peak_memory,
+            "memoria_liquida_bytes": self.net_memory,
+            **self.fields
+        }
+
+
+class StageTimer:
+    """Mede as etapas de uma execução; use `with timer.stage("nome"):`"""
+
+    def __init__(self, logger, trace_memory=True):
+        self.logger = logger
+        self.trace_memory = trace_memory
+        self.stages = []
+        self._started_tracing = False
+
+    def __enter__(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        return self
+
+    def __exit__(self, *exc):
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return False
+
+    @contextmanager
+    def stage(self, name, **fields):
+        """Mede uma etapa; o dicionário retornado aceita campos extras"""
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            memory_start = tracemalloc.get_traced_memory()[0]
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+
+        with log_stage(self.logger, name, **fields) as stage_fields:
+            try:
+                yield stage_fields
+            finally:
+                result = StageResult(
+                    name,
+                    wall_ms=round((time.perf_counter() - wall_start) * 1000, 2),
+                    cpu_ms=round((time.thread_time() - cpu_start) * 1000, 2)
+                )
+                if tracing:
+                    current, peak = tracemalloc.get_traced_memory()
+                    result.peak_memory = peak
+                    result.net_memory = current - memory_start
+                    stage_fields.update(pico_memoria_bytes=peak, memoria_liquida_bytes=result.net_memory)
+                stage_fields["cpu_ms"] = result.cpu_ms
+                result.fields = {key: value for key, value in stage_fields.items()
+                                 if key not in ("pico_memoria_bytes", "memoria_liquida_bytes", "cpu_ms")}
+                self.stages.append(result)
+
+
+class ReportResult:
+    """Resultado da geração de um relatório (verdadeiro em caso de sucesso)"""
+
+    def __init__(self, success, filename=None, rows=0, stages=(), error=None, started=None):
+        self.success = success
+        self.filename = filename
+        self.rows = rows
+        self.stages = list(stages)
+        self.error = error
+        self.started = started or datetime.now()
+        self.correlation_id = correlation_id.get()
+
+    def __bool__(self):
+        return self.success
+
+    def __repr__(self):
+        status = "sucesso" if self.success else f"erro: {self.error}"
+        return f"<ReportResult {status} {self.filename} {self.wall_ms}ms>"
+
+    @property
+    def wall_ms(self):
+        return round(sum(stage.wall_ms for stage in self.stages), 2)
+
+    @property
+    def cpu_ms(self):
+        return round(sum(stage.cpu_ms for stage in self.stages), 2)
+
+    @property
+    def peak_memory(self):
+        """Maior pico de memória entre as etapas (None sem tracemalloc)"""
+        peaks = [stage.peak_memory for stage in self.stages if stage.peak_memory is not None]
+        return max(peaks) if peaks else None
+
+    def stage(self, name):
+        """Medições da etapa pelo nome (ou None)"""
+        return next((stage for stage in self.stages if stage.name == name), None)
+
+    def to_dict(self):
+        return {
+            "inicio": self.started.isoformat(timespec="seconds"),
+            "correlation_id": self.correlation_id,
+            "status": "sucesso" if self.success else "erro",
+            "erro": self.error,
+            "arquivo": self.filename,
+            "linhas": self.rows,
+            "wall_ms": self.wall_ms,
+            "cpu_ms": self.cpu_ms,
+            "pico_memoria_bytes": self.peak_memory,
+            "etapas": [stage.to_dict() for stage in self.stages]
+        }
+
+
+def append_run_log(path, result):
+    """Acrescenta o resultado como uma linha JSON ao log de execuções"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(result.to_dict(), ensure_ascii=False) + "\n")
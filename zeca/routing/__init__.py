@@ -0,0 +1 @@
+"""Lotes de entregas e otimização de rotas"""
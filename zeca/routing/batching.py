@@ -0,0 +1,103 @@
+"""
+Agrupamento de Entregas em Lotes - Sistema Zeca Delivery
+========================================================
+
+Agrupa entregas pendentes em lotes do tamanho de um entregador, usando a
+região da entrega (prefixo do CEP ou bairro) e a janela de horário de
+`entrega_prevista`.
+
+Algoritmo (O(n log n), dominado pela ordenação):
+- Cada entrega é classificada em uma região em O(1)
+- Dentro de cada região as entregas são ordenadas pelo horário previsto
+- Uma única varredura fecha o lote quando ele atinge o tamanho máximo
+  ou quando a próxima entrega ultrapassaria a janela de tempo
+
+Assim o cálculo pode ser refeito a cada ciclo de despacho, mesmo com
+milhares de pedidos.
+
+Autor: Demonstração do artigo Zeca Delivery
+"""
+
+from datetime import timedelta
+
+from zeca.data.schema import prevista_of
+
+# Configurações padrão de um lote
+MAX_TAMANHO_PADRAO = 5
+JANELA_MINUTOS_PADRAO = 45
+PREFIXO_CEP_PADRAO = 3
+AGRUPAMENTOS_VALIDOS = ('cep', 'bairro')
+
+
+def region_key(entrega, agrupar_por='cep', prefixo_cep=PREFIXO_CEP_PADRAO):
+    """Retorna a chave de região de uma entrega"""
+    if agrupar_por == 'bairro':
+        return entrega['bairro']
+    return entrega['cep'].replace('-', '')[:prefixo_cep]
+
+
+def build_batches(entregas, max_tamanho=MAX_TAMANHO_PADRAO,
+                  janela_minutos=JANELA_MINUTOS_PADRAO,
+                  agrupar_por='cep', prefixo_cep=PREFIXO_CEP_PADRAO):
+    """
+    Agrupa entregas em lotes por região e janela de horário.
+
+    Retorna lista de lotes ordenada pelo horário da primeira entrega.
+    Lança ValueError para parâmetros inválidos.
+    """
+    if max_tamanho < 1:
+        raise ValueError("max_tamanho deve ser maior que zero")
+    if janela_minutos < 0:
+        raise ValueError("janela_minutos não pode ser negativo")
+    if agrupar_por not in AGRUPAMENTOS_VALIDOS:
+        raise ValueError(f"Agrupamento inválido. Use: {', '.join(AGRUPAMENTOS_VALIDOS)}")
+    if not 1 <= prefixo_cep <= 8:
+        raise ValueError("prefixo_cep deve estar entre 1 e 8")
+
+    janela = timedelta(minutes=janela_minutos)
+
+    # Classificar por região, convertendo o horário uma única vez
+    regioes = {}
+    for entrega in entregas:
+        chave = region_key(entrega, agrupar_por, prefixo_cep)
+        prevista = prevista_of(entrega)
+        regioes.setdefault(chave, []).append((prevista, entrega['id'], entrega))
+
+    lotes = []
+    for regiao, itens in regioes.items():
+        itens.sort(key=lambda item: (item[0], item[1]))
+
+        atual = []
+        inicio = None
+        for prevista, _, entrega in itens:
+            if atual and (len(atual) >= max_tamanho or prevista - inicio > janela):
+                lotes.append(_make_batch(regiao, inicio, atual))
+                atual = []
+            if not atual:
+                inicio = prevista
+            atual.append((prevista, entrega))
+
+        if atual:
+            lotes.append(_make_batch(regiao, inicio, atual))
+
+    lotes.sort(key=lambda lote: (lote['inicio'], lote['regiao']))
+    for numero, lote in enumerate(lotes, 1):
+        lote['lote'] = numero
+
+    return lotes
+
+
+def _make_batch(regiao, inicio, itens):
+    """Monta o dicionário de um lote a partir das entregas agrupadas"""
+    fim = itens[-1][0]
+    entregas = [entrega for _, entrega in itens]
+    return {
+        "lote": 0,
+        "regiao": regiao,
+        "inicio": inicio.isoformat(),
+        "fim": fim.isoformat(),
+        "janela_minutos": int((fim - inicio).total_seconds() // 60),
+        "total": len(entregas),
+        "valor_total": round(sum(e['valor'] for e in entregas), 2),
+        "entregas": entregas
+    }
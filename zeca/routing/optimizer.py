@@ -0,0 +1,288 @@
+"""
+Otimizador de Rotas - Sistema Zeca Delivery
+===========================================
+
+Define a ordem de paradas de um conjunto de entregas (normalmente um lote
+de `batching.build_batches`) a partir da cozinha do Zeca.
+
+Algoritmo:
+- Coordenadas obtidas da tabela local `zeca/data/cep_coordinates.py`
+- Matriz de tempos de deslocamento calculada uma única vez
+- Construção inicial pelo vizinho mais próximo
+- Melhoria 2-opt com penalidade por atraso em relação a `entrega_prevista`:
+  a variação do deslocamento de cada troca é calculada em O(1)
+  (d(a,c) + d(b,d) - d(a,b) - d(c,d)); o atraso só é recalculado, a partir
+  da posição trocada, quando o deslocamento mais o atraso já acumulado antes
+  dela ainda podem melhorar a rota
+- Orçamento de tempo: vale para todas as etapas. Estourado na matriz, as
+  paradas seguem a ordem dos prazos; no vizinho mais próximo, as restantes
+  seguem a ordem dos prazos; no 2-opt, fica a melhor rota encontrada até
+  ali. Em todos os casos a latência fica limitada
+
+Autor: Demonstração do artigo Zeca Delivery
+"""
+
+from datetime import timedelta
+from itertools import chain
+from math import radians, sin, cos, asin, sqrt
+import time
+
+from zeca.data.cep_coordinates import CEP_COORDENADAS, ORIGEM_PADRAO
+from zeca.data.schema import prevista_of
+
+# Parâmetros padrão da simulação de rota
+VELOCIDADE_MEDIA_KMH = 20.0
+TEMPO_PARADA_MINUTOS = 3.0
+PENALIDADE_ATRASO = 2.0       # custo por minuto de atraso (em minutos de rota)
+ORCAMENTO_MS_PADRAO = 50
+ORCAMENTO_MS_MAXIMO = 1000     # teto do orçamento pedido pela API
+RAIO_TERRA_KM = 6371.0
+
+
+def coordinates_for(cep, tabela=CEP_COORDENADAS):
+    """
+    Retorna (coordenada, precisão) para um CEP.
+
+    Procura o setor (5 dígitos) e depois a região (3 dígitos);
+    precisão é "setor", "regiao" ou None quando o CEP é desconhecido.
+    """
+    digitos = cep.replace('-', '')
+    for tamanho, precisao in ((5, "setor"), (3, "regiao")):
+        coordenada = tabela.get(digitos[:tamanho])
+        if coordenada is not None:
+            return coordenada, precisao
+    return None, None
+
+
+def haversine_km(a, b):
+    """Distância em km entre duas coordenadas (lat, lon)"""
+    lat1, lon1 = radians(a[0]), radians(a[1])
+    lat2, lon2 = radians(b[0]), radians(b[1])
+    h = sin((lat2 - lat1) / 2) ** 2 + cos(lat1) * cos(lat2) * sin((lon2 - lon1) / 2) ** 2
+    return 2 * RAIO_TERRA_KM * asin(sqrt(h))
+
+
+def build_distance_matrix(pontos, limite=None):
+    """
+    Matriz simétrica de distâncias em km entre todos os pontos.
+
+    Com `limite` (instante de time.perf_counter()), retorna None se o
+    limite passar antes do fim do cálculo.
+    """
+    n = len(pontos)
+    matriz = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        if limite is not None and time.perf_counter() > limite:
+            return None
+        for j in range(i + 1, n):
+            matriz[i][j] = matriz[j][i] = haversine_km(pontos[i], pontos[j])
+    return matriz
+
+
+def optimize_route(entregas, origem=ORIGEM_PADRAO, saida=None,
+                   velocidade_kmh=VELOCIDADE_MEDIA_KMH,
+                   tempo_parada=TEMPO_PARADA_MINUTOS,
+                   penalidade_atraso=PENALIDADE_ATRASO,
+                   orcamento_ms=ORCAMENTO_MS_PADRAO):
+    """
+    Calcula a ordem de paradas para as entregas informadas.
+
+    `saida` é o horário de saída da cozinha; se omitido, o entregador sai a
+    tempo de chegar exatamente no horário da entrega mais cedo.
+    Retorna dicionário com a ordem, as paradas estimadas e o custo da rota.
+    """
+    inicio_calculo = time.perf_counter()
+    limite = inicio_calculo + orcamento_ms / 1000.0
+
+    if not entregas:
+        return _empty_route()
+
+    # Índice 0 é a origem; entregas ocupam os índices 1..n
+    pontos = [origem]
+    precisoes = [None]
+    for entrega in entregas:
+        coordenada, precisao = coordinates_for(entrega['cep'])
+        pontos.append(coordenada or origem)
+        precisoes.append(precisao)
+
+    minutos_por_km = 60.0 / velocidade_kmh
+    distancias_km = build_distance_matrix(pontos, limite)
+    if distancias_km is None:
+        # Orçamento estourado na matriz: distâncias só dos trechos usados
+        def distancia(a, b):
+            return haversine_km(pontos[a], pontos[b])
+    else:
+        def distancia(a, b):
+            return distancias_km[a][b]
+        tempos = [[d * minutos_por_km for d in linha] for linha in distancias_km]
+
+    def tempo(a, b):
+        return distancia(a, b) * minutos_por_km
+
+    previstas = [prevista_of(e) for e in entregas]
+    if saida is None:
+        primeira = min(range(len(entregas)), key=lambda i: previstas[i])
+        saida = previstas[primeira] - timedelta(minutes=tempo(0, primeira + 1))
+    # Prazos em minutos relativos à saída, indexados como a matriz
+    prazos = [0.0] + [(p - saida).total_seconds() / 60.0 for p in previstas]
+    por_prazo = sorted(range(1, len(entregas) + 1), key=lambda j: (prazos[j], j))
+
+    iteracoes = 0
+    if distancias_km is None:
+        return _describe_route(entregas, por_prazo, distancia, tempo, prazos, precisoes, saida,
+                               tempo_parada, penalidade_atraso, iteracoes, False, inicio_calculo)
+
+    rota = _nearest_neighbour(tempos, por_prazo, limite)
+    esgotado = len(rota) < len(entregas)
+    if esgotado:
+        visitadas = set(rota)
+        rota += [j for j in por_prazo if j not in visitadas]
+
+    # Melhoria 2-opt (primeira melhoria) dentro do orçamento de tempo
+    n = len(rota)
+    partida, atraso_antes, deslocamento = _route_state(rota, tempos, prazos, tempo_parada)
+    custo = deslocamento + penalidade_atraso * atraso_antes[n]
+    melhorou = not esgotado
+    while melhorou and not esgotado:
+        melhorou = False
+        for i in range(n - 1):
+            a = rota[i - 1] if i else 0
+            b = rota[i]
+            for k in range(i + 1, n):
+                if time.perf_counter() > limite:
+                    esgotado = True
+                    break
+                iteracoes += 1
+                # Reverter rota[i..k]: a-b ... c-d vira a-c ... b-d (rota aberta, sem volta)
+                c = rota[k]
+                variacao = tempos[a][c] - tempos[a][b]
+                if k + 1 < n:
+                    d = rota[k + 1]
+                    variacao += tempos[b][d] - tempos[c][d]
+                # O atraso antes da posição i não muda: limite inferior em O(1)
+                if deslocamento + variacao + penalidade_atraso * atraso_antes[i] >= custo - 1e-9:
+                    continue
+                atraso = atraso_antes[i]
+                if penalidade_atraso:
+                    atraso += _suffix_delay(rota, i, k, a, partida[i], tempos, prazos, tempo_parada)
+                custo_candidata = deslocamento + variacao + penalidade_atraso * atraso
+                if custo_candidata < custo - 1e-9:
+                    rota[i:k + 1] = rota[i:k + 1][::-1]
+                    partida, atraso_antes, deslocamento = _route_state(rota, tempos, prazos, tempo_parada)
+                    custo = deslocamento + penalidade_atraso * atraso_antes[n]
+                    melhorou = True
+                    b = rota[i]
+            if esgotado:
+                break
+
+    return _describe_route(entregas, rota, distancia, tempo, prazos, precisoes, saida,
+                           tempo_parada, penalidade_atraso, iteracoes, not esgotado,
+                           inicio_calculo)
+
+
+def _nearest_neighbour(tempos, por_prazo, limite):
+    """
+    Rota inicial: sempre visitar a parada mais próxima ainda não visitada.
+
+    Para ao passar do `limite`; a rota devolvida pode ficar incompleta.
+    """
+    restantes = set(por_prazo)
+    rota = []
+    atual = 0
+    while restantes:
+        if time.perf_counter() > limite:
+            break
+        proxima = min(restantes, key=lambda j: (tempos[atual][j], j))
+        rota.append(proxima)
+        restantes.remove(proxima)
+        atual = proxima
+    return rota
+
+
+def _route_state(rota, tempos, prazos, tempo_parada):
+    """
+    Relógio na partida para cada posição, atraso acumulado antes de cada
+    posição (o último item é o atraso total) e deslocamento total.
+    """
+    partida = []
+    atraso_antes = []
+    relogio = deslocamento = atraso = 0.0
+    anterior = 0
+    for parada in rota:
+        partida.append(relogio)
+        atraso_antes.append(atraso)
+        trecho = tempos[anterior][parada]
+        deslocamento += trecho
+        relogio += trecho
+        if relogio > prazos[parada]:
+            atraso += relogio - prazos[parada]
+        relogio += tempo_parada
+        anterior = parada
+    atraso_antes.append(atraso)
+    return partida, atraso_antes, deslocamento
+
+
+def _suffix_delay(rota, i, k, anterior, relogio, tempos, prazos, tempo_parada):
+    """Atraso das posições i em diante com rota[i..k] revertido, sem copiar a rota"""
+    atraso = 0.0
+    for posicao in chain(range(k, i - 1, -1), range(k + 1, len(rota))):
+        parada = rota[posicao]
+        relogio += tempos[anterior][parada]
+        if relogio > prazos[parada]:
+            atraso += relogio - prazos[parada]
+        relogio += tempo_parada
+        anterior = parada
+    return atraso
+
+
+def _describe_route(entregas, rota, distancia, tempo, prazos, precisoes, saida,
+                    tempo_parada, penalidade_atraso, iteracoes, concluido, inicio_calculo):
+    """Monta o resultado com horários estimados de chegada por parada"""
+    paradas = []
+    relogio = 0.0
+    deslocamento = 0.0
+    distancia_total = 0.0
+    atraso_total = 0.0
+    anterior = 0
+    for parada in rota:
+        trecho = tempo(anterior, parada)
+        relogio += trecho
+        deslocamento += trecho
+        distancia_total += distancia(anterior, parada)
+        atraso = max(0.0, relogio - prazos[parada])
+        atraso_total += atraso
+        paradas.append({
+            "id": entregas[parada - 1]['id'],
+            "chegada_estimada": (saida + timedelta(minutes=relogio)).isoformat(timespec='seconds'),
+            "atraso_minutos": round(atraso, 1),
+            "coordenada": precisoes[parada] or "desconhecida"
+        })
+        relogio += tempo_parada
+        anterior = parada
+
+    return {
+        "ordem": [p["id"] for p in paradas],
+        "paradas": paradas,
+        "saida": saida.isoformat(timespec='seconds'),
+        "distancia_total_km": round(distancia_total, 2),
+        "atraso_total_minutos": round(atraso_total, 1),
+        "custo": round(deslocamento + penalidade_atraso * atraso_total, 2),
+        "iteracoes": iteracoes,
+        "otimizacao_completa": concluido,
+        "tempo_calculo_ms": round((time.perf_counter() - inicio_calculo) * 1000, 2)
+    }
+
+
+def _empty_route():
+    """Resultado para um conjunto vazio de entregas"""
+    return {
+        "ordem": [],
+        "paradas": [],
+        "saida": None,
+        "distancia_total_km": 0.0,
+        "atraso_total_minutos": 0.0,
+        "custo": 0.0,
+        "iteracoes": 0,
+        "otimizacao_completa": True,
+        "tempo_calculo_ms": 0.0
+    }